@@ -1,3 +1,4 @@
+import torch
 import torch.nn as nn
 
 class SimpleCNN(nn.Module):
@@ -31,7 +32,8 @@ class SimpleCNN(nn.Module):
         x = self.pool2(x)
         
         # Flatten: Turn the 3D cube (32x7x7) into a flat line for the final decision
-        x = x.view(x.size(0), -1) 
+        # (flatten rather than view: channels_last and quantized activations are not contiguous)
+        x = torch.flatten(x, 1)
         
         x = self.fc(x)
         return x
\ No newline at end of file
@@ -1,13 +1,21 @@
+import asyncio
 from fastapi import  FastAPI 
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import os
 import logging
 
-from backend.app.core.logging import setup_logging
-from backend.app.database.db import  create_db_and_tables
+from backend.app.core.logging import setup_logging, shutdown_logging
+from backend.app.database.db import  create_db_and_tables, engine
+from backend.app.routers import calibration
 from backend.app.routers import dataset
 from backend.app.routers import experiments
+from backend.app.routers import jobs
+from backend.app.routers import log_stats
+from backend.app.services.calibration_service import CALIBRATION_INTERVAL_SECS, calibration_loop
+from backend.app.services.job_service import job_manager
+from backend.app.services.prewarm import MODEL_PREWARM, parse_prewarm, submit_prewarm
+from backend.app.services.result_sink import result_sink
 
 load_dotenv()
 
@@ -20,7 +28,25 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await create_db_and_tables()
+    job_manager.start()
+    result_sink.start()
+    calibration_task = None
+    if CALIBRATION_INTERVAL_SECS > 0:
+        calibration_task = asyncio.create_task(calibration_loop(CALIBRATION_INTERVAL_SECS))
+    if MODEL_PREWARM:
+        # Opt-in: loads torch and the configured models in a worker while the API already serves
+        try:
+            submit_prewarm(parse_prewarm(MODEL_PREWARM))
+        except ValueError as e:
+            logger.error(f"Invalid MODEL_PREWARM '{MODEL_PREWARM}': {e}")
     yield
+    if calibration_task is not None:
+        calibration_task.cancel()
+    await job_manager.shutdown()
+    # After the jobs stop, so results submitted while they wind down are written too
+    await result_sink.close()
+    await engine.dispose()
+    shutdown_logging()
 
 app = FastAPI(
         title="Energy Aware Logging Mechanism",
@@ -42,3 +68,6 @@ async def status():
 
 app.include_router(dataset.router, tags=["Datasets"])
 app.include_router(experiments.router, tags=["Experiments"])
+app.include_router(jobs.router, tags=["Jobs"])
+app.include_router(calibration.router, tags=["Calibration"])
+app.include_router(log_stats.router, tags=["Logging"])
@@ -0,0 +1,147 @@
+import random
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Budget per logger in records per second (0 = no rate budget)
+LOG_BUDGET_RECORDS_PER_SEC = float(os.getenv("LOG_BUDGET_RECORDS_PER_SEC", "20"))
+# Budget per logger in estimated joules per minute (0 = no energy budget); the stricter budget wins
+LOG_BUDGET_JOULES_PER_MIN = float(os.getenv("LOG_BUDGET_JOULES_PER_MIN", "0"))
+# Estimated energy of writing one record; measure it with services.logging_benchmark
+LOG_JOULES_PER_RECORD = float(os.getenv("LOG_JOULES_PER_RECORD", "0.0001"))
+# Records a logger may emit at once before the budget applies
+LOG_BUDGET_BURST = float(os.getenv("LOG_BUDGET_BURST", "100"))
+# Share of over-budget records still kept, so floods stay visible in the log
+LOG_OVERFLOW_SAMPLE_RATE = float(os.getenv("LOG_OVERFLOW_SAMPLE_RATE", "0.01"))
+# Fixed sampling per logger, e.g. "backend.app.app=0.01,backend.app.routers.jobs=0.1"
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+
+def parse_sample_rates(text: str) -> dict[str, float]:
+    rates = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, rate = part.partition("=")
+        rate = float(rate)
+        if not 0 <= rate <= 1:
+            raise ValueError(f"Invalid sample rate for logger '{name}': {rate}")
+        rates[name.strip()] = rate
+    return rates
+
+
+@dataclass
+class LoggerCounters:
+    passed: int = 0
+    dropped_sampled: int = 0
+    dropped_over_budget: int = 0
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class EnergyBudgetFilter(logging.Filter):
+    """
+    Caps the records each logger may emit. WARNING and above always pass.
+    Below that, a logger's records first go through its fixed sample rate (if
+    configured), then a token bucket refilled at the budget rate: records
+    per second, or joules per minute divided by the estimated joules per record.
+    Over-budget records are kept with probability `overflow_sample_rate`.
+    Counts what it passes and drops per logger.
+    """
+
+    def __init__(
+        self,
+        records_per_sec: float = LOG_BUDGET_RECORDS_PER_SEC,
+        joules_per_min: float = LOG_BUDGET_JOULES_PER_MIN,
+        joules_per_record: float = LOG_JOULES_PER_RECORD,
+        burst: float = LOG_BUDGET_BURST,
+        overflow_sample_rate: float = LOG_OVERFLOW_SAMPLE_RATE,
+        sample_rates: dict[str, float] | None = None,
+        clock=time.monotonic
+    ):
+        super().__init__()
+        rates = []
+        if records_per_sec > 0:
+            rates.append(records_per_sec)
+        if joules_per_min > 0:
+            rates.append(joules_per_min / 60 / joules_per_record)
+        # None means no budget, only fixed sampling
+        self.rate = min(rates) if rates else None
+        self.burst = max(burst, 1)
+        self.joules_per_record = joules_per_record
+        self.overflow_sample_rate = overflow_sample_rate
+        self.sample_rates = parse_sample_rates(LOG_SAMPLE_RATES) if sample_rates is None else sample_rates
+        self.clock = clock
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._counters: dict[str, LoggerCounters] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        # Decided once per record, when the filter sits on several handlers
+        decision = getattr(record, "_budget_kept", None)
+        if decision is None:
+            decision = record._budget_kept = self._decide(record)
+        return decision
+
+    def _decide(self, record: logging.LogRecord) -> bool:
+        with self._lock:
+            counters = self._counters.get(record.name)
+            if counters is None:
+                counters = self._counters[record.name] = LoggerCounters()
+
+            sample_rate = self.sample_rates.get(record.name)
+            if sample_rate is not None and random.random() >= sample_rate:
+                counters.dropped_sampled += 1
+                return False
+
+            if self.rate is not None:
+                now = self.clock()
+                bucket = self._buckets.get(record.name)
+                if bucket is None:
+                    bucket = self._buckets[record.name] = _TokenBucket(self.rate, self.burst, now)
+                if not bucket.take(now) and random.random() >= self.overflow_sample_rate:
+                    counters.dropped_over_budget += 1
+                    return False
+
+            counters.passed += 1
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            loggers = {name: LoggerCounters(**vars(c)) for name, c in self._counters.items()}
+        dropped = sum(c.dropped_sampled + c.dropped_over_budget for c in loggers.values())
+        return {
+            "records_per_sec_budget": self.rate,
+            "burst": self.burst,
+            "overflow_sample_rate": self.overflow_sample_rate,
+            "sample_rates": self.sample_rates,
+            "joules_per_record": self.joules_per_record,
+            "passed": sum(c.passed for c in loggers.values()),
+            "dropped": dropped,
+            "estimated_joules_saved": dropped * self.joules_per_record,
+            "loggers": loggers,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
@@ -1,10 +1,18 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
+import queue
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
 from dotenv import load_dotenv
 import os
 
+from backend.app.core.log_sampling import EnergyBudgetFilter
+
 load_dotenv()
 
 # Define where logs will be saved
@@ -12,27 +20,200 @@ LOG_DIR = Path(os.getenv("LOG_DIR", "./logs"))
 LOG_DIR.mkdir(exist_ok=True)
 LOG_FILE = LOG_DIR / os.getenv("LOG_FILE", "app.log")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# text | json (one JSON object per line)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# size | time | none
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size").lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# Hand records to a background writer thread instead of writing on the caller's thread
+LOG_QUEUED = os.getenv("LOG_QUEUED", "true").lower() in ("1", "true", "yes")
+# Records waiting for the writer; past this, new records are dropped (0 = unbounded)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, for log shippers and structured queries."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller: when the queue is full the record is counted and dropped."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class FilteringQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener that runs every record through `record_filter` before its handlers.
+    Records from worker processes were never seen by this process's logger filters,
+    so the budget is applied, and counted, where they are written.
+    """
+
+    def __init__(self, log_queue, *handlers, record_filter: logging.Filter, respect_handler_level: bool = True):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.record_filter = record_filter
+
+    def handle(self, record: logging.LogRecord):
+        if self.record_filter.filter(record):
+            super().handle(record)
+
+
+def build_formatter(log_format: str = LOG_FORMAT) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter()
+    if log_format == "text":
+        return logging.Formatter(TEXT_FORMAT)
+    raise ValueError(f"Unknown LOG_FORMAT '{log_format}'. Choose 'text' or 'json'")
+
+
+def build_file_handler(log_file: Path = LOG_FILE, rotation: str = LOG_ROTATION) -> logging.Handler:
+    if rotation == "size":
+        return logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+        )
+    if rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_file, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT
+        )
+    if rotation == "none":
+        return logging.FileHandler(log_file)
+    raise ValueError(f"Unknown LOG_ROTATION '{rotation}'. Choose 'size', 'time' or 'none'")
+
+
+def build_handlers(log_format: str = LOG_FORMAT, rotation: str = LOG_ROTATION) -> list[logging.Handler]:
+    """The sinks: the log file and the terminal (standard output)."""
+    formatter = build_formatter(log_format)
+    handlers = [build_file_handler(rotation=rotation), logging.StreamHandler(sys.stdout)]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+# Writer state of this process, set by setup_logging
+_handlers: list[logging.Handler] = []
+_listeners: list[logging.handlers.QueueListener] = []
+_queue_handler: DroppingQueueHandler | None = None
+_worker_queue = None
+budget_filter = EnergyBudgetFilter()
+
 
-def setup_logging():
-    """
-    Configures logging to write to Console AND File.
-    """
-    # Create a custom format
-    log_format = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-    
-    # 1. Configure the Root Logger
-    logging.basicConfig(
-        level=LOG_LEVEL,
-        format=log_format,
-        handlers=[
-            # Handler 1: Write to File (rotates if it gets huge, optional but good)
-            logging.FileHandler(LOG_FILE),
-            # Handler 2: Write to Terminal (Standard Output)
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-    
-    
-    # Prevent extensive logs from libraries 
+def setup_logging(queued: bool = LOG_QUEUED):
+    """
+    Configures the root logger to write to Console AND File. Idempotent.
+    When queued, log calls only enqueue the record; a QueueListener thread
+    formats and writes it, so request handlers never wait on disk I/O.
+    """
+    global _queue_handler
+    if _handlers:
+        return
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    _handlers.extend(build_handlers())
+    if queued:
+        _queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        # Over-budget records are dropped before they are queued
+        _queue_handler.addFilter(budget_filter)
+        root.addHandler(_queue_handler)
+        _start_listener(_queue_handler.queue)
+    else:
+        for handler in _handlers:
+            handler.addFilter(budget_filter)
+            root.addHandler(handler)
+    atexit.register(shutdown_logging)
+
+    # Prevent extensive logs from libraries
     logging.getLogger("multipart").setLevel(logging.WARNING)
-    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
\ No newline at end of file
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+
+def _start_listener(log_queue, record_filter: logging.Filter | None = None):
+    if record_filter is None:
+        listener = logging.handlers.QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    else:
+        listener = FilteringQueueListener(log_queue, *_handlers, record_filter=record_filter)
+    listener.start()
+    _listeners.append(listener)
+
+
+def worker_log_queue():
+    """
+    Queue that worker processes log into (see setup_worker_logging). Its records are
+    written by this process, so only one process ever writes, and rotates, the log file,
+    and the energy budget and its counters (log_stats) cover the workers' records too.
+    """
+    global _worker_queue
+    if _worker_queue is None:
+        setup_logging()
+        _worker_queue = multiprocessing.get_context("spawn").Queue(LOG_QUEUE_SIZE)
+        _start_listener(_worker_queue, budget_filter)
+    return _worker_queue
+
+
+def setup_worker_logging(log_queue):
+    """
+    Process-pool initializer: sends every record of the worker to the parent's log
+    writer, which applies the energy budget to them.
+    """
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    logging.getLogger("multipart").setLevel(logging.WARNING)
+
+
+def dropped_records() -> int:
+    """Records this process dropped because the log queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def log_stats() -> dict:
+    """Budget and sampling counters (this process and its workers), plus records lost to a full queue."""
+    return {**budget_filter.stats(), "queue_full_dropped": dropped_records()}
+
+
+def shutdown_logging():
+    """
+    Writes out every queued record and stops the writer threads. Records logged
+    afterwards (e.g. by interpreter shutdown) are written synchronously.
+    """
+    global _queue_handler, _worker_queue
+    for listener in _listeners:
+        listener.stop()
+    _listeners.clear()
+    if _worker_queue is not None:
+        _worker_queue.close()
+        _worker_queue = None
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+        _queue_handler = None
+        for handler in _handlers:
+            handler.addFilter(budget_filter)
+            root.addHandler(handler)
+    for handler in _handlers:
+        handler.flush()
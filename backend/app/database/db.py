@@ -1,5 +1,9 @@
+import logging
+import importlib.util
 from collections.abc import AsyncGenerator
 
+from sqlalchemy import BigInteger, Enum, event, inspect, literal, text
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -9,19 +13,169 @@ import os
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Connection pool (file-backed SQLite and PostgreSQL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE_SECS = int(os.getenv("DB_POOL_RECYCLE_SECS", "1800"))
+# How long a SQLite writer waits for the lock before failing with "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# NORMAL is durable in WAL mode except for the last transactions on power loss
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+if SQLITE_SYNCHRONOUS not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+    raise ValueError(f"Invalid SQLITE_SYNCHRONOUS '{SQLITE_SYNCHRONOUS}'")
 
 class Base(DeclarativeBase):
     pass
 
-    
-engine = create_async_engine(DATABASE_URL)
+
+def _database_url(url: str) -> URL:
+    """
+    Parses DATABASE_URL. Plain postgres:// and postgresql:// URLs are mapped to the
+    async asyncpg driver, which is an optional dependency (pip install asyncpg).
+    """
+    url = make_url(url)
+    if url.drivername in ("postgres", "postgresql"):
+        url = url.set(drivername="postgresql+asyncpg")
+    if url.drivername == "postgresql+asyncpg" and importlib.util.find_spec("asyncpg") is None:
+        raise RuntimeError("DATABASE_URL points at PostgreSQL but asyncpg is not installed (pip install asyncpg)")
+    return url
+
+
+def _engine_options(url: URL) -> dict:
+    if url.get_backend_name() == "sqlite":
+        options = {"connect_args": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+        # In-memory databases live in a single connection, so they get no pool settings
+        if url.database not in (None, "", ":memory:"):
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+        return options
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE_SECS,
+        "pool_pre_ping": True,
+    }
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    # WAL lets readers run alongside a writer, and busy_timeout makes concurrent
+    # writers queue for the lock instead of failing immediately
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.close()
+
+
+_url = _database_url(DATABASE_URL)
+engine = create_async_engine(_url, **_engine_options(_url))
+if engine.dialect.name == "sqlite":
+    event.listen(engine.sync_engine, "connect", _configure_sqlite)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 
+def _sync_enum_types(conn):
+    # PostgreSQL keeps Enum columns as native types holding the values known when the
+    # type was created: create the types of columns added since, and add new values
+    # (ALTER TYPE ... ADD VALUE runs inside a transaction on PostgreSQL 12+)
+    if conn.dialect.name != "postgresql":
+        return
+    existing = {enum["name"]: set(enum["labels"]) for enum in inspect(conn).get_enums()}
+    preparer = conn.dialect.identifier_preparer
+    synced = set()
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            enum_type = column.type
+            if not isinstance(enum_type, Enum) or not enum_type.native_enum or enum_type.name in synced:
+                continue
+            synced.add(enum_type.name)
+            if enum_type.name not in existing:
+                enum_type.create(conn, checkfirst=True)
+                logger.info(f"Created enum type {enum_type.name}")
+                continue
+            for value in enum_type.enums:
+                if value not in existing[enum_type.name]:
+                    conn.execute(text(f"ALTER TYPE {preparer.format_type(enum_type)} ADD VALUE IF NOT EXISTS '{value}'"))
+                    logger.info(f"Added value {value} to enum type {enum_type.name}")
+
+
+def _add_missing_columns(conn) -> list[tuple[str, str]]:
+    # create_all never alters an existing table; add the columns introduced after it
+    # was created. Existing rows get the column's default, or NULL when it has none.
+    # Returns the (table, column) pairs added
+    added = []
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    preparer = conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            ddl = (
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}"
+            )
+            default = column.default.arg if column.default is not None and column.default.is_scalar else None
+            if default is not None:
+                value = literal(default, column.type).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+                ddl += f" DEFAULT {value}"
+            conn.execute(text(ddl))
+            added.append((table.name, column.name))
+            logger.info(f"Added column {table.name}.{column.name}")
+    return added
+
+
+def _widen_integer_columns(conn):
+    # Columns changed from Integer to BigInteger after their table was created. SQLite
+    # integers are 64-bit whatever the declared type; PostgreSQL needs the type altered
+    if conn.dialect.name != "postgresql":
+        return
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    preparer = conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_types = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            existing = existing_types.get(column.name)
+            if not isinstance(column.type, BigInteger) or existing is None or isinstance(existing, BigInteger):
+                continue
+            conn.execute(text(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ALTER COLUMN {preparer.format_column(column)} TYPE BIGINT"
+            ))
+            logger.info(f"Widened column {table.name}.{column.name} to BIGINT")
+
+
+def _create_missing_indexes(conn):
+    # create_all only builds indexes together with new tables; add any that
+    # were introduced after an existing table was created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
 async def create_db_and_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_sync_enum_types)
+        added = await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_widen_integer_columns)
+        await conn.run_sync(_create_missing_indexes)
+
+    # Summaries are derived from the experiments: a column added to them (e.g. a new part
+    # of the grouping key) only takes effect once they are regrouped from the raw runs
+    if any(table == "experiment_summaries" for table, _ in added):
+        from backend.app.services.summary_service import rebuild_summaries
+        async with async_session_maker() as session:
+            await rebuild_summaries(session)
+            await session.commit()
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -0,0 +1,23 @@
+import uuid
+from sqlalchemy import JSON, Boolean, Column, Float, ForeignKey, Integer, String
+from backend.app.database.db import Base
+
+class LatencyDistribution(Base):
+    """Per-iteration latency statistics of one experiment, from the benchmark harness."""
+    __tablename__ = "latency_distributions"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    experiment_id = Column(String(36), ForeignKey("experiments.id"), nullable=False, unique=True, index=True)
+
+    warmup_iterations = Column(Integer, nullable=False)
+    iterations = Column(Integer, nullable=False)
+    min_seconds = Column(Float, nullable=False)
+    mean_seconds = Column(Float, nullable=False)
+    p50_seconds = Column(Float, nullable=False)
+    p95_seconds = Column(Float, nullable=False)
+    p99_seconds = Column(Float, nullable=False)
+    stddev_seconds = Column(Float, nullable=False)
+    relative_standard_error = Column(Float, nullable=True)
+    converged = Column(Boolean, nullable=False)
+    # Raw per-iteration timings in nanoseconds
+    samples_ns = Column(JSON, nullable=True)
@@ -1,8 +1,8 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, Enum
+from sqlalchemy import JSON, BigInteger, Column, Integer, String, Text, DateTime, Enum
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from backend.app.database.db import Base
 from backend.app.models.enums import ModelType
@@ -14,8 +14,22 @@ class Dataset(Base):
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     filename = Column(String(255), nullable=False)
     filepath = Column(String(1024), nullable=False)
+    # SHA-256 of the file; identical uploads share one content-addressed blob
+    content_hash = Column(String(64), nullable=True, index=True)
+    size_bytes = Column(BigInteger, nullable=True)
     description = Column(Text, nullable=True)
     ai_model = Column(Enum(ModelType), nullable=False)
+    # Column holding the ground truth; NULL means auto-detect ('label', or the first of 785 CNN columns)
+    label_column = Column(String(255), nullable=True)
+    # Profile from one pass over the file at upload; NULL while a large file is still being profiled
+    num_rows = Column(BigInteger, nullable=True)
+    num_columns = Column(Integer, nullable=True)
+    num_features = Column(Integer, nullable=True)
+    # dtypes, detected label column and per-column min/max/mean/missing values;
+    # deferred so dataset lists do not carry it
+    profile = deferred(Column(JSON, nullable=True))
+    # Why a file profiled after upload cannot be used; experiments on it are refused
+    validation_error = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     experiments = relationship("Experiment", back_populates="dataset")
\ No newline at end of file
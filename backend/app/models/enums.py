@@ -6,4 +6,48 @@ class ModelType(str, enum.Enum):
 
 class PrecisionType(str, enum.Enum):
     FP32 = "FP32"
-    INT8 = "INT8"
\ No newline at end of file
+    # Dynamic quantization (weights INT8, activations quantized on the fly)
+    INT8 = "INT8"
+    # FP32 weights, matmuls/convs under CPU autocast to bfloat16
+    BF16 = "BF16"
+    # Static post-training quantization, calibrated on a sample of the dataset
+    INT8_STATIC = "INT8_STATIC"
+    # Traced, frozen and inference-optimized TorchScript graph
+    JIT_FROZEN = "JIT_FROZEN"
+    # FP32 in NHWC memory format (convolutional models only)
+    CHANNELS_LAST = "CHANNELS_LAST"
+
+class EngineType(str, enum.Enum):
+    # The PyTorch module as is
+    EAGER = "EAGER"
+    # The same model traced, frozen and inference-optimized with TorchScript
+    TORCHSCRIPT = "TORCHSCRIPT"
+    # Exported to ONNX and run by ONNX Runtime (CPU), with its own graph optimizations
+    # and quantization; needs the 'onnx' extra
+    ONNXRUNTIME = "ONNXRUNTIME"
+
+class JobStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    # Cancel requested; the in-flight worker step is still running to completion
+    CANCELLING = "CANCELLING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+class TrialOrder(str, enum.Enum):
+    # A B C A B C ...
+    INTERLEAVED = "interleaved"
+    # Every round runs the configurations in a fresh random order
+    RANDOMIZED = "randomized"
+
+class DownsampleMethod(str, enum.Enum):
+    # Largest-Triangle-Three-Buckets: keeps the visual shape
+    LTTB = "lttb"
+    # Minimum and maximum per bucket: keeps every spike and dip
+    MINMAX = "minmax"
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    # Needs pyarrow (the 'parquet' extra)
+    PARQUET = "parquet"
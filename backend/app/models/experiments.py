@@ -1,26 +1,67 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Float, ForeignKey, String, DateTime, Enum
+from sqlalchemy import JSON, BigInteger, Boolean, Column, Float, ForeignKey, Index, Integer, String, DateTime, Enum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from backend.app.database.db import Base
-from backend.app.models.enums import PrecisionType
+from backend.app.models.enums import EngineType, PrecisionType
 
 class Experiment(Base):
     __tablename__ = "experiments"
+    __table_args__ = (
+        # Latest run per precision of a dataset, and dataset-filtered pages
+        Index("ix_experiments_dataset_precision_created", "dataset_id", "precision", "created_at"),
+        Index("ix_experiments_dataset_created", "dataset_id", "created_at", "id"),
+        # Keyset pagination over all experiments, optionally by precision
+        Index("ix_experiments_created_id", "created_at", "id"),
+        Index("ix_experiments_precision_created", "precision", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     
     dataset_id = Column(String(36), ForeignKey("datasets.id"), nullable=False)
     precision = Column(Enum(PrecisionType), nullable=False)
+    # Runtime that executed the model; NULL for runs recorded before engines existed (eager)
+    engine = Column(Enum(EngineType), nullable=True)
+    # Rows per forward pass; NULL means the whole dataset in one tensor
+    batch_size = Column(Integer, nullable=True)
+    # Rows used, counted from the start of the dataset; NULL means all of them
+    num_rows = Column(BigInteger, nullable=True)
     
+    # Mean seconds per pass over the dataset; the full distribution is in latency_distributions
     latency_seconds = Column(Float, nullable=True)
+    # Samples pushed through the model while energy was measured (warmup + timed passes);
+    # rows x passes passes 2^31 on large datasets
+    num_samples = Column(BigInteger, nullable=True)
+    throughput_samples_per_sec = Column(Float, nullable=True)
     emissions_kg = Column(Float, nullable=True)
     energy_consumed_kwh = Column(Float, nullable=True)
     cpu_energy_kwh = Column(Float, nullable=True)
     ram_energy_kwh = Column(Float, nullable=True)
+    # Gross figures minus the idle baseline over the same duration (workload-attributable)
+    net_energy_kwh = Column(Float, nullable=True)
+    net_emissions_kg = Column(Float, nullable=True)
+    # Gross minus idle before flooring (negative if the run drew less than idle), and whether
+    # it is within the meter's resolution; such runs are compared on gross energy
+    net_energy_delta_kwh = Column(Float, nullable=True)
+    net_energy_below_resolution = Column(Boolean, nullable=True)
+    # Idle baseline the net figures were computed against
+    idle_power_watts = Column(Float, nullable=True)
     duration = Column(Float, nullable=True)
+    # Energy meter backend that produced the energy figures (codecarbon, rapl, fake)
+    energy_meter = Column(String(32), nullable=True)
+    # CPU configuration of the worker process: torch thread pools and the cores it may run on
+    intra_op_threads = Column(Integer, nullable=True)
+    inter_op_threads = Column(Integer, nullable=True)
+    cpu_affinity = Column(JSON, nullable=True)
+    # Whether the model came from the model cache; building it is outside the metered window either way
+    model_cache_hit = Column(Boolean, nullable=True)
+    model_load_seconds = Column(Float, nullable=True)
+    # Measured against the dataset's label column; NULL when the dataset has no labels
     accuracy = Column(Float, nullable=True)
+    top_k_accuracy = Column(Float, nullable=True)
+    # Confusion matrix, per-class accuracy and top-k settings
+    metrics = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     dataset = relationship("Dataset", back_populates="experiments")
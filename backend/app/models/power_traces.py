@@ -0,0 +1,24 @@
+import uuid
+from sqlalchemy import Column, Float, ForeignKey, Integer, LargeBinary, String
+from backend.app.database.db import Base
+
+class PowerTrace(Base):
+    """
+    Sampled CPU/RAM power of one experiment. The series are stored as compact blobs
+    (see power_trace.encode_series) rather than one row per sample.
+    """
+    __tablename__ = "power_traces"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    experiment_id = Column(String(36), ForeignKey("experiments.id"), nullable=False, unique=True, index=True)
+
+    sample_count = Column(Integer, nullable=False)
+    # Sampling interval at the end of the run (doubled each time a long trace was thinned)
+    interval_seconds = Column(Float, nullable=False)
+    encoding = Column(String(32), nullable=False)
+    mean_watts = Column(Float, nullable=True)
+    peak_watts = Column(Float, nullable=True)
+    # Seconds since the meter started, and mean watts over the interval ending there
+    timestamps = Column(LargeBinary, nullable=False)
+    cpu_watts = Column(LargeBinary, nullable=False)
+    ram_watts = Column(LargeBinary, nullable=False)
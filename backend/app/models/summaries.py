@@ -0,0 +1,77 @@
+import uuid
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Enum, Float, ForeignKey, Integer, String, UniqueConstraint
+from backend.app.database.db import Base
+from backend.app.models.enums import EngineType, ModelType, PrecisionType
+
+# Experiment columns summarized per group, and the prefix of their statistics columns
+SUMMARY_METRICS = {
+    "energy": "energy_consumed_kwh",
+    "net_energy": "net_energy_kwh",
+    "emissions": "emissions_kg",
+    "latency": "latency_seconds",
+    "accuracy": "accuracy",
+}
+
+
+class ExperimentSummary(Base):
+    """
+    Running statistics of all experiments of one (dataset, model, precision, configuration),
+    updated with Welford's algorithm on every insert.
+    For each metric: <metric>_count, _mean, _m2 (sum of squared deviations from the
+    mean; variance = m2 / (count - 1)), _min and _max. Counts are per metric, since
+    a run may lack some values (e.g. accuracy on unlabelled data).
+    """
+    __tablename__ = "experiment_summaries"
+    __table_args__ = (
+        UniqueConstraint("dataset_id", "precision", "config_key", name="uq_experiment_summaries_group"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    dataset_id = Column(String(36), ForeignKey("datasets.id"), nullable=False, index=True)
+    ai_model = Column(Enum(ModelType), nullable=False)
+    precision = Column(Enum(PrecisionType), nullable=False)
+    # Configuration the runs share besides precision, e.g. 'batch=all;intra=8;inter=1'
+    # (';rows=N' appended for runs on the first N rows only, ';engine=X' for non-eager engines),
+    # ending in ';cpus=0-7', the cores the runs were allowed on ('none' if unknown)
+    config_key = Column(String(255), nullable=False)
+    engine = Column(Enum(EngineType), nullable=True)
+    batch_size = Column(Integer, nullable=True)
+    num_rows = Column(BigInteger, nullable=True)
+    intra_op_threads = Column(Integer, nullable=True)
+    inter_op_threads = Column(Integer, nullable=True)
+    # Sorted list of core ids; None if unknown
+    cpu_affinity = Column(JSON, nullable=True)
+
+    runs = Column(Integer, nullable=False, default=0)
+    last_experiment_id = Column(String(36), nullable=True)
+    last_seen_at = Column(DateTime, nullable=True)
+
+    energy_count = Column(Integer, nullable=False, default=0)
+    energy_mean = Column(Float, nullable=True)
+    energy_m2 = Column(Float, nullable=True)
+    energy_min = Column(Float, nullable=True)
+    energy_max = Column(Float, nullable=True)
+
+    net_energy_count = Column(Integer, nullable=False, default=0)
+    net_energy_mean = Column(Float, nullable=True)
+    net_energy_m2 = Column(Float, nullable=True)
+    net_energy_min = Column(Float, nullable=True)
+    net_energy_max = Column(Float, nullable=True)
+
+    emissions_count = Column(Integer, nullable=False, default=0)
+    emissions_mean = Column(Float, nullable=True)
+    emissions_m2 = Column(Float, nullable=True)
+    emissions_min = Column(Float, nullable=True)
+    emissions_max = Column(Float, nullable=True)
+
+    latency_count = Column(Integer, nullable=False, default=0)
+    latency_mean = Column(Float, nullable=True)
+    latency_m2 = Column(Float, nullable=True)
+    latency_min = Column(Float, nullable=True)
+    latency_max = Column(Float, nullable=True)
+
+    accuracy_count = Column(Integer, nullable=False, default=0)
+    accuracy_mean = Column(Float, nullable=True)
+    accuracy_m2 = Column(Float, nullable=True)
+    accuracy_min = Column(Float, nullable=True)
+    accuracy_max = Column(Float, nullable=True)
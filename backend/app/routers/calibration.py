@@ -0,0 +1,44 @@
+import logging
+from fastapi import APIRouter, HTTPException, Query, status
+
+from backend.app.schemas.calibration import CalibrationResponse
+from backend.app.schemas.jobs import JobResponse
+from backend.app.services.calibration_service import (
+    CALIBRATION_WINDOW_SECS,
+    load_baseline,
+    submit_calibration,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/calibration", response_model=CalibrationResponse)
+async def get_calibration():
+    """The current idle-power baseline used to compute net energy."""
+    baseline = load_baseline()
+    if baseline is None:
+        raise HTTPException(status_code=404, detail="No calibration yet. POST /calibration to run one.")
+    return CalibrationResponse(
+        idle_power_watts=baseline.idle_power_watts,
+        cpu_power_watts=baseline.cpu_power_watts,
+        ram_power_watts=baseline.ram_power_watts,
+        window_seconds=baseline.window_seconds,
+        energy_meter=baseline.energy_meter,
+        measured_at=baseline.measured_at,
+        age_seconds=baseline.age_seconds,
+        is_fresh=baseline.is_fresh(),
+    )
+
+
+@router.post("/calibration", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def run_calibration(
+    window_seconds: float = Query(CALIBRATION_WINDOW_SECS, gt=0, le=600, description="Seconds of idle time to measure")
+):
+    """
+    Queues an idle-power measurement. It runs through the job queue, so it does not
+    overlap experiments when a single worker is configured.
+    """
+    logger.info(f"Queueing idle calibration over {window_seconds} s")
+    return submit_calibration(window_seconds)
@@ -1,62 +1,234 @@
+import asyncio
 import logging
-import shutil
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import undefer
 
 from dotenv import load_dotenv
 import os
 
-from backend.app.database.db import get_async_session
+from backend.app.database.db import async_session_maker, get_async_session
 from backend.app.models.datasets import Dataset
 from backend.app.models.enums import ModelType
+from backend.app.schemas.datasets import DatasetProfileResponse, UploadSessionResponse
+from backend.app.services.dataset_cache import (
+    build_dataset_cache,
+    dataset_profile_values,
+    invalidate_dataset_cache,
+    sniff_dataset,
+)
+from backend.app.services.storage_service import (
+    StoredBlob,
+    UploadBusy,
+    UploadOffsetMismatch,
+    UploadTooLarge,
+    abort_upload_session,
+    append_upload_chunk,
+    complete_upload_session,
+    create_upload_session,
+    get_upload_session,
+    iter_upload_file,
+    store_stream,
+)
 
 
 load_dotenv()
 
-UPLOAD_DIR = os.getenv("UPLOAD_DIR")
-
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Files up to this size are profiled before the upload returns; larger ones only get
+# their columns checked up front and are profiled in the background
+DATASET_PROFILE_SYNC_MB = float(os.getenv("DATASET_PROFILE_SYNC_MB", "64"))
+
+
+async def _profile_dataset(file_path: str, ai_model: ModelType, label_column: str | None, size_bytes: int) -> dict | None:
+    """
+    Checks the file's columns against the model (reads only the first rows), then
+    profiles small files in the same pass that builds their binary cache.
+    Returns the Dataset profile columns, or None if profiling is left to the background.
+    Raises ValueError for a file the model cannot use.
+    """
+    await asyncio.to_thread(sniff_dataset, file_path, ai_model, label_column)
+    if size_bytes > DATASET_PROFILE_SYNC_MB * 1024 * 1024:
+        return None
+    meta = await asyncio.to_thread(build_dataset_cache, file_path, ai_model, label_column)
+    return dataset_profile_values(meta)
+
+
+async def _profile_in_background(dataset_id: str, file_path: str, ai_model: ModelType, label_column: str | None = None):
+    try:
+        values = dataset_profile_values(await asyncio.to_thread(build_dataset_cache, file_path, ai_model, label_column))
+        logger.info(f"Dataset {dataset_id} profiled: {values['num_rows']} rows")
+    except ValueError as e:
+        logger.warning(f"Dataset {dataset_id} failed validation: {e}")
+        values = {"validation_error": str(e)}
+    except Exception as e:
+        # Not fatal: the cache is rebuilt lazily on first use
+        logger.warning(f"Could not profile dataset '{file_path}': {e}")
+        return
+    async with async_session_maker() as session:
+        await session.execute(update(Dataset).where(Dataset.id == dataset_id).values(**values))
+        await session.commit()
+
+
+async def _discard_unused_blob(session: AsyncSession, file_path: str):
+    """Removes a rejected upload, unless an existing dataset shares the blob."""
+    shared = await session.scalar(select(func.count()).select_from(Dataset).where(Dataset.filepath == file_path))
+    if not shared and os.path.exists(file_path):
+        invalidate_dataset_cache(file_path)
+        os.remove(file_path)
+
+
+async def _register_dataset(
+        session: AsyncSession,
+        background_tasks: BackgroundTasks,
+        blob: StoredBlob,
+        filename: str,
+        description: str,
+        ai_model: ModelType,
+        label_column: str | None = None
+    ) -> Dataset:
+    try:
+        profile_values = await _profile_dataset(blob.path, ai_model, label_column, blob.size)
+    except ValueError as e:
+        logger.warning(f"Rejected dataset '{filename}': {e}")
+        await _discard_unused_blob(session, blob.path)
+        raise HTTPException(status_code=422, detail=f"Invalid dataset: {e}")
+
+    new_dataset = Dataset(
+        filename=filename,
+        filepath=blob.path,
+        content_hash=blob.digest,
+        size_bytes=blob.size,
+        description=description,
+        ai_model=ai_model,
+        label_column=label_column,
+        **(profile_values or {})
+    )
+    session.add(new_dataset)
+    await session.commit()
+    await session.refresh(new_dataset)
+
+    logger.info(f"Dataset uploaded successfully. DB ID: {new_dataset.id}")
+
+    if profile_values is None:
+        # Profile and convert to the binary feature cache after responding
+        background_tasks.add_task(_profile_in_background, new_dataset.id, blob.path, ai_model, label_column)
+    return new_dataset
+
+
 @router.post("/datasets")
 async def create_dataset(
+        background_tasks: BackgroundTasks,
         file:UploadFile = File(...), 
         description: str= "", 
         ai_model: ModelType = ModelType.MLP,
+        label_column: str | None = None,
         session: AsyncSession = Depends(get_async_session)
     ):
     try:
         logger.info(f"Received upload request for file: {file.filename}")
         
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        
         try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-                logger.info(f"File '{file.filename}' saved successfully at '{file_path}'")
+            blob = await store_stream(iter_upload_file(file), file.filename)
+            logger.info(f"File '{file.filename}' saved successfully at '{blob.path}'")
+        except UploadTooLarge as e:
+            logger.warning(f"Rejected upload '{file.filename}': {e}")
+            raise HTTPException(status_code=413, detail=str(e))
         except Exception as e:
             logger.error(f"Failed to save file '{file.filename}'. Error: {e}")
             raise HTTPException(status_code=500, detail=f"Could not save file: {e}")
         
-        new_dataset = Dataset(
-            filename=file.filename,
-            filepath=file_path,
-            description=description,
-            ai_model=ai_model
-        )
-        session.add(new_dataset)
-        await session.commit()
-        await session.refresh(new_dataset)
-        
-        logger.info(f"Dataset uploaded successfully. DB ID: {new_dataset.id}")
-        
-        return new_dataset
+        return await _register_dataset(session, background_tasks, blob, file.filename, description, ai_model, label_column)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error during dataset upload: {e}")
         raise HTTPException(status_code=500, detail="Dataset upload failed")
 
+
+@router.post("/datasets/uploads", response_model=UploadSessionResponse)
+async def start_chunked_upload(filename: str, total_size: int | None = None):
+    """
+    Starts a resumable upload. Send the file with PUT /datasets/uploads/{upload_id}?offset=N
+    (raw bytes in the body), then POST /datasets/uploads/{upload_id}/complete.
+    """
+    try:
+        logger.info(f"Starting chunked upload for file: {filename}")
+        return create_upload_session(filename, total_size)
+    except UploadTooLarge as e:
+        logger.warning(f"Rejected upload '{filename}': {e}")
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+@router.get("/datasets/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_chunked_upload(upload_id: str):
+    """Returns how many bytes were received, i.e. the offset to resume from."""
+    upload = get_upload_session(upload_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+@router.put("/datasets/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def put_upload_chunk(upload_id: str, offset: int, request: Request):
+    try:
+        return await append_upload_chunk(upload_id, offset, request.stream())
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadOffsetMismatch as e:
+        logger.warning(f"Upload {upload_id}: chunk at offset {offset}, expected {e.expected}")
+        raise HTTPException(status_code=409, detail={"message": str(e), "offset": e.expected})
+    except UploadBusy as e:
+        logger.warning(f"Upload {upload_id}: chunk at offset {offset} rejected, {e}")
+        raise HTTPException(status_code=409, detail={"message": str(e)})
+    except UploadTooLarge as e:
+        logger.warning(f"Upload {upload_id} rejected: {e}")
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+@router.post("/datasets/uploads/{upload_id}/complete")
+async def complete_chunked_upload(
+        upload_id: str,
+        background_tasks: BackgroundTasks,
+        description: str = "",
+        ai_model: ModelType = ModelType.MLP,
+        label_column: str | None = None,
+        session: AsyncSession = Depends(get_async_session)
+    ):
+    try:
+        blob, filename = await complete_upload_session(upload_id)
+        logger.info(f"Chunked upload {upload_id} stored at '{blob.path}'")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadOffsetMismatch as e:
+        raise HTTPException(status_code=409, detail={"message": "Upload is incomplete", "offset": e.expected})
+    except UploadBusy as e:
+        raise HTTPException(status_code=409, detail={"message": str(e)})
+
+    try:
+        return await _register_dataset(session, background_tasks, blob, filename, description, ai_model, label_column)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during dataset upload: {e}")
+        raise HTTPException(status_code=500, detail="Dataset upload failed")
+
+
+@router.delete("/datasets/uploads/{upload_id}")
+async def abort_chunked_upload(upload_id: str):
+    try:
+        aborted = abort_upload_session(upload_id)
+    except UploadBusy as e:
+        raise HTTPException(status_code=409, detail={"message": str(e)})
+    if not aborted:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    logger.info(f"Chunked upload {upload_id} aborted")
+    return {"detail": "Upload aborted"}
+
 @router.get("/datasets")
 async def get_datasets(session: AsyncSession = Depends(get_async_session)):
     try:
@@ -69,6 +241,39 @@ async def get_datasets(session: AsyncSession = Depends(get_async_session)):
         logger.error(f"Error fetching datasets: {e}")
         raise HTTPException(status_code=500, detail="Could not fetch datasets")
     
+@router.get("/datasets/{dataset_id}/profile", response_model=DatasetProfileResponse)
+async def get_dataset_profile(dataset_id: str, session: AsyncSession = Depends(get_async_session)):
+    """Row and column counts, dtypes, label column and per-column min/max/mean/missing values."""
+    dataset = await session.get(Dataset, dataset_id, options=[undefer(Dataset.profile)])
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    if dataset.validation_error:
+        raise HTTPException(status_code=422, detail=f"Invalid dataset: {dataset.validation_error}")
+    if dataset.profile is None:
+        raise HTTPException(status_code=404, detail="Dataset has not been profiled yet")
+    return DatasetProfileResponse(
+        dataset_id=dataset.id,
+        ai_model=dataset.ai_model,
+        content_hash=dataset.content_hash,
+        size_bytes=dataset.size_bytes,
+        **dataset.profile
+    )
+
+
+@router.post("/datasets/{dataset_id}/profile", status_code=status.HTTP_202_ACCEPTED)
+async def reprofile_dataset(
+        dataset_id: str,
+        background_tasks: BackgroundTasks,
+        session: AsyncSession = Depends(get_async_session)
+    ):
+    """Profiles the file again in the background (e.g. datasets uploaded before profiling existed)."""
+    dataset = await session.get(Dataset, dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    background_tasks.add_task(_profile_in_background, dataset.id, dataset.filepath, dataset.ai_model, dataset.label_column)
+    return {"detail": "Profiling started"}
+
+
 @router.delete("/datasets/{dataset_id}")
 async def delete_dataset(dataset_id: str, session: AsyncSession = Depends(get_async_session)):
     try:
@@ -80,15 +285,25 @@ async def delete_dataset(dataset_id: str, session: AsyncSession = Depends(get_as
             logger.warning(f"Dataset with ID {dataset_id} not found for deletion")
             raise HTTPException(status_code=404, detail="Dataset not found")
         
-        if os.path.exists(dataset.filepath):
+        # Blobs are content-addressed: only remove the file once no other dataset points at it
+        shared = await session.scalar(
+            select(func.count()).select_from(Dataset)
+            .where(Dataset.filepath == dataset.filepath)
+            .where(Dataset.id != dataset.id)
+        )
+        
+        await session.delete(dataset)
+        await session.commit()
+
+        if shared:
+            logger.info(f"File at path {dataset.filepath} is shared by {shared} other dataset(s); keeping it")
+        elif os.path.exists(dataset.filepath):
+            invalidate_dataset_cache(dataset.filepath)
             os.remove(dataset.filepath)
             logger.info(f"Deleted file at path: {dataset.filepath}")
         else:
             logger.warning(f"File at path {dataset.filepath} does not exist")
         
-        await session.delete(dataset)
-        await session.commit()
-        
         logger.info(f"Dataset with ID {dataset_id} deleted successfully from database")
         
         return {"detail": "Dataset deleted successfully"}
@@ -99,8 +314,10 @@ async def delete_dataset(dataset_id: str, session: AsyncSession = Depends(get_as
 @router.patch("/datasets/{dataset_id}")
 async def update_dataset(
         dataset_id: str, 
+        background_tasks: BackgroundTasks,
         description: str = None, 
         ai_model: ModelType = None,
+        label_column: str = None,
         session: AsyncSession = Depends(get_async_session)
     ):
     try:
@@ -112,10 +329,33 @@ async def update_dataset(
             logger.warning(f"Dataset with ID {dataset_id} not found for update")
             raise HTTPException(status_code=404, detail="Dataset not found")
         
+        reprofile = (
+            (ai_model is not None and ai_model != dataset.ai_model)
+            or (label_column is not None and (label_column or None) != dataset.label_column)
+        )
         if description is not None:
             dataset.description = description
         if ai_model is not None:
             dataset.ai_model = ai_model
+        if label_column is not None:
+            # An empty string resets to auto-detection
+            dataset.label_column = label_column or None
+
+        if reprofile:
+            # The file must fit the new model / label column, like at upload
+            size_bytes = dataset.size_bytes or os.path.getsize(dataset.filepath)
+            try:
+                profile_values = await _profile_dataset(dataset.filepath, dataset.ai_model, dataset.label_column, size_bytes)
+            except ValueError as e:
+                logger.warning(f"Rejected update of dataset {dataset_id}: {e}")
+                raise HTTPException(status_code=422, detail=f"Invalid dataset: {e}")
+            if profile_values is None:
+                profile_values = {"num_rows": None, "num_columns": None, "num_features": None, "profile": None, "validation_error": None}
+                background_tasks.add_task(
+                    _profile_in_background, dataset.id, dataset.filepath, dataset.ai_model, dataset.label_column
+                )
+            for key, value in profile_values.items():
+                setattr(dataset, key, value)
         
         session.add(dataset)
         await session.commit()
@@ -124,6 +364,8 @@ async def update_dataset(
         logger.info(f"Dataset with ID {dataset_id} updated successfully")
         
         return dataset
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating dataset with ID {dataset_id}: {e}")
         raise HTTPException(status_code=500, detail="Could not update dataset")
\ No newline at end of file
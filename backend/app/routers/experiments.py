@@ -1,27 +1,86 @@
 import os
 import logging
-import pandas as pd
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import desc, select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.database.db import get_async_session
+from backend.app.models.benchmarks import LatencyDistribution
 from backend.app.models.datasets import Dataset
 from backend.app.models.experiments import Experiment
-from backend.app.schemas.experiments import ExperimentComparisonResponse, ExperimentResponse
-from backend.app.services.experiment_service import execute_experiment
+from backend.app.models.power_traces import PowerTrace
+from backend.app.models.summaries import ExperimentSummary
+from backend.app.schemas.experiments import (
+    BatchSweepPoint,
+    ComparisonResponse,
+    ExperimentComparisonResponse,
+    ExperimentPage,
+    ExperimentResponse,
+    ExperimentSummaryResponse,
+    LatencyDistributionResponse,
+    PowerTraceResponse,
+    ScalingCurveResponse,
+    ThreadSweepPoint,
+)
+from backend.app.schemas.jobs import JobResponse
+from backend.app.services.comparison_service import (
+    COMPARE_TRIALS,
+    ComparisonConfig,
+    ComparisonSpec,
+    run_comparison,
+)
+from backend.app.services.energy_meter import JOULES_PER_KWH
+from backend.app.services.experiment_export import EXPORT_MEDIA_TYPES, parquet_available, stream_export
+from backend.app.services.experiment_service import (
+    ExperimentSpec,
+    energy_basis,
+    has_net_energy,
+    run_energy_kwh,
+    run_measurement,
+)
+from backend.app.services.experiment_queries import (
+    experiment_filters,
+    latest_per_precision,
+    list_experiments_page,
+)
+from backend.app.services.inference_engine import check_engine
+from backend.app.services.job_service import JobContext, job_manager
+from backend.app.services.power_trace import decode_series, lttb_indices, minmax_indices
+from backend.app.services.result_sink import result_sink
+from backend.app.services.scaling_service import SCALING_MAX_POINTS, parse_row_counts, summarize_scaling
+from backend.app.services.summary_service import rebuild_summaries, summary_payload
+from backend.app.services.thread_sweep import (
+    THREAD_SWEEP_MAX_POINTS,
+    ThreadSetting,
+    available_cpus,
+    parse_cpu_set,
+    pareto_front,
+    run_thread_point,
+)
 from backend.app.services.model_factory import ModelFactory
-from backend.app.models.enums import PrecisionType
+from backend.app.models.enums import DownsampleMethod, EngineType, ExportFormat, ModelType, PrecisionType, TrialOrder
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+EXPERIMENT_PAGE_SIZE = int(os.getenv("EXPERIMENT_PAGE_SIZE", "100"))
+EXPERIMENT_MAX_PAGE_SIZE = int(os.getenv("EXPERIMENT_MAX_PAGE_SIZE", "1000"))
+POWER_TRACE_MAX_POINTS = int(os.getenv("POWER_TRACE_MAX_POINTS", "5000"))
 
-async def _get_dataset_and_model(session: AsyncSession, dataset_id: str):
+
+async def _get_dataset(
+    session: AsyncSession,
+    dataset_id: str,
+    precisions: List[PrecisionType] = (),
+    engines: List[EngineType] = (EngineType.EAGER,)
+) -> Dataset:
     """
-    Fetches dataset from DB, loads CSV, and instantiates the Model Service.
+    Fetches dataset from DB and checks its file, model and the requested
+    precisions and engines are usable, so bad requests fail before a job is queued.
     """
     # 1. Fetch from DB
     result = await session.execute(select(Dataset).where(Dataset.id == dataset_id))
@@ -30,17 +89,17 @@ async def _get_dataset_and_model(session: AsyncSession, dataset_id: str):
         logger.error(f"Dataset with ID {dataset_id} not found")
         raise HTTPException(status_code=404, detail="Dataset not found")
 
-    # 2. Load CSV
+    # 2. Check the file (it is loaded by the worker process)
     if not os.path.exists(dataset.filepath):
         logger.error(f"File not found at path: {dataset.filepath}")
         raise HTTPException(status_code=404, detail="File not found on disk")
-    try:
-        df = pd.read_csv(dataset.filepath)
-    except Exception as e:
-        logger.error(f"Error reading CSV file: {e}")
-        raise HTTPException(status_code=500, detail=f"Could not read CSV: {e}")
 
-    # 3. Get Model Service
+    # 3. Check the file passed validation (large files are profiled after upload)
+    if dataset.validation_error:
+        logger.error(f"Dataset {dataset_id} failed validation: {dataset.validation_error}")
+        raise HTTPException(status_code=400, detail=f"Invalid dataset: {dataset.validation_error}")
+
+    # 4. Check the Model Service exists
     service_key = dataset.ai_model.upper()
     try:
         model_service = ModelFactory.get_model_service(service_key)
@@ -48,32 +107,134 @@ async def _get_dataset_and_model(session: AsyncSession, dataset_id: str):
         logger.error(f"Model '{dataset.ai_model}' not supported")
         raise HTTPException(status_code=400, detail=f"Model '{dataset.ai_model}' not supported")
 
-    return dataset, df, model_service
+    # 5. Check the model supports every precision (e.g. CHANNELS_LAST is CNN-only)
+    unsupported = [p.value for p in precisions if p not in model_service.supported_precisions]
+    if unsupported:
+        logger.error(f"Precision(s) {unsupported} not supported for {dataset.ai_model}")
+        raise HTTPException(status_code=400, detail=f"Precision(s) {unsupported} not supported for {dataset.ai_model.value}")
+
+    # 6. Check every engine can run every precision (and is installed)
+    for engine in engines:
+        for precision in precisions:
+            try:
+                check_engine(engine, precision)
+            except ValueError as e:
+                logger.error(f"Engine check failed: {e}")
+                raise HTTPException(status_code=400, detail=str(e))
+
+    return dataset
 
 
-@router.post("/run-experiment", response_model=ExperimentResponse)
+async def _measure_and_save(ctx: JobContext, spec: ExperimentSpec) -> Experiment:
+    """Measures one run and hands it to the result sink; runners flush before they return."""
+    measurement = await ctx.run_in_worker(run_measurement, spec)
+    experiment = result_sink.submit(spec.dataset_id, measurement)
+    await ctx.step_done()
+    return experiment
+
+
+def _experiment_payload(experiment: Experiment) -> dict:
+    return ExperimentResponse.model_validate(experiment).model_dump(mode="json")
+
+
+@router.post("/run-experiment", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def run_experiment(
     dataset_id: str,
     precision: PrecisionType,
+    batch_size: int | None = Query(None, gt=0, description="Rows per forward pass; omit to run the whole dataset at once"),
+    engine: EngineType = Query(EngineType.EAGER, description="Runtime: eager PyTorch, TorchScript or ONNX Runtime"),
     session: AsyncSession = Depends(get_async_session)
 ):
+    """
+    Queues one measurement and returns the job immediately.
+    Poll /jobs/{job_id} (or stream it) for the saved experiment.
+    """
     try:
         logger.info(f"Received experiment request for dataset ID: {dataset_id}")
-        dataset, df, model_service = await _get_dataset_and_model(session, dataset_id)
-
-        experiment = await execute_experiment(
-        session=session,
-        dataset=dataset,
-        df=df,
-        model_service=model_service,
-        precision=precision.value
-    )
-        logger.info(f"Experiment completed for dataset ID: {dataset_id} with model type: {precision.value}")
-        return experiment
+        dataset = await _get_dataset(session, dataset_id, [precision], [engine])
+        spec = ExperimentSpec.from_dataset(dataset, precision, batch_size, engine=engine)
+
+        async def runner(ctx: JobContext):
+            experiment = await _measure_and_save(ctx, spec)
+            await result_sink.flush([experiment])
+            logger.info(f"Experiment completed for dataset ID: {dataset_id} with model type: {precision.value}")
+            return _experiment_payload(experiment)
+
+        return job_manager.submit("experiment", runner, dataset_id=dataset.id)
     except HTTPException as he:
         logger.error(f"HTTP error during experiment: {he.detail}")
         raise he
     
+# Registered before /experiments/{dataset_id}, which would otherwise match "summary"
+@router.get("/experiments/summary", response_model=List[ExperimentSummaryResponse])
+async def get_experiment_summaries(
+    dataset_id: str | None = None,
+    ai_model: ModelType | None = None,
+    precision: PrecisionType | None = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Count, mean, variance, min and max of energy, net energy, emissions, latency and
+    accuracy per (dataset, model, precision, configuration), maintained on every insert.
+    """
+    try:
+        logger.info("Fetching experiment summaries.")
+        query = select(ExperimentSummary).order_by(
+            ExperimentSummary.dataset_id, ExperimentSummary.precision, ExperimentSummary.config_key
+        )
+        if dataset_id is not None:
+            query = query.where(ExperimentSummary.dataset_id == dataset_id)
+        if ai_model is not None:
+            query = query.where(ExperimentSummary.ai_model == ai_model)
+        if precision is not None:
+            query = query.where(ExperimentSummary.precision == precision)
+        result = await session.execute(query)
+        return [summary_payload(summary) for summary in result.scalars()]
+    except Exception as e:
+        logger.error(f"Error fetching experiment summaries: {e}")
+        raise HTTPException(status_code=500, detail="Could not fetch experiment summaries")
+
+
+@router.post("/experiments/summary/rebuild")
+async def rebuild_experiment_summaries(
+    dataset_id: str | None = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Recomputes the summaries from the raw experiments (e.g. after bulk imports or deletions)."""
+    try:
+        groups = await rebuild_summaries(session, dataset_id)
+        await session.commit()
+        return {"detail": "Experiment summaries rebuilt", "groups": groups}
+    except Exception as e:
+        logger.error(f"Error rebuilding experiment summaries: {e}")
+        raise HTTPException(status_code=500, detail="Could not rebuild experiment summaries")
+
+
+@router.get("/experiments/export")
+async def export_experiments(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    dataset_id: str | None = None,
+    precision: PrecisionType | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None
+):
+    """
+    Streams every matching experiment, joined with its dataset's metadata, as CSV
+    or Parquet, oldest first. Rows are read from a server-side cursor in chunks
+    and sent as they are encoded, so memory stays flat however long the history.
+    """
+    if export_format == ExportFormat.PARQUET and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export needs pyarrow (install the 'parquet' extra)")
+    logger.info(f"Exporting experiments as {export_format.value}.")
+    filters = experiment_filters(dataset_id, precision, created_after, created_before)
+    filename = f"experiments-{datetime.utcnow():%Y%m%dT%H%M%S}.{export_format.value}"
+    return StreamingResponse(
+        stream_export(export_format, filters),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/experiments/{dataset_id}", response_model=ExperimentComparisonResponse)
 async def get_experiment_by_dataset(
     dataset_id: str, 
@@ -82,52 +243,105 @@ async def get_experiment_by_dataset(
     try:
         logger.info(f"Fetching experiment for dataset ID: {dataset_id}")
         
-        result_fp32 = await session.execute(
-        select(Experiment)
-        .where(Experiment.dataset_id == dataset_id)
-        .where(Experiment.precision == PrecisionType.FP32)
-        .order_by(desc(Experiment.created_at)) # Newest first
-        .limit(1)
-    )
-        exp_fp32 = result_fp32.scalar_one_or_none()
-
-        result_int8 = await session.execute(
-        select(Experiment)
-        .where(Experiment.dataset_id == dataset_id)
-        .where(Experiment.precision == PrecisionType.INT8)
-        .order_by(desc(Experiment.created_at))
-        .limit(1)
-    )
-        exp_int8 = result_int8.scalar_one_or_none()
+        # Latest run of every precision, in one window-function query
+        results = await latest_per_precision(session, dataset_id)
 
-        if not exp_fp32 or not exp_int8:
-            
-            raise HTTPException(status_code=404, detail="Incomplete experiment history. Please run a new comparison.")
+        if not results:
+            raise HTTPException(status_code=404, detail="No experiment history. Please run a new comparison.")
         logger.info(f"Fetched experiments for dataset ID: {dataset_id}")
         return ExperimentComparisonResponse(
             dataset_id=dataset_id,
-            fp32=exp_fp32,
-            int8=exp_int8,
+            results=results,
+            fp32=results.get(PrecisionType.FP32.value),
+            int8=results.get(PrecisionType.INT8.value),
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching experiment for dataset ID {dataset_id}: {e}")
         raise HTTPException(status_code=500, detail="Could not fetch experiment")
 
-@router.get("/experiments/", response_model=List[ExperimentResponse])
+@router.get("/experiments/", response_model=ExperimentPage)
 async def get_experiments(
+    limit: int = Query(EXPERIMENT_PAGE_SIZE, ge=1, le=EXPERIMENT_MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    dataset_id: str | None = None,
+    precision: PrecisionType | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
     session: AsyncSession = Depends(get_async_session)
 ):
+    """
+    Experiments newest first, one page at a time (keyset pagination).
+    Follow next_cursor until it is null to walk the whole table.
+    """
     try:
-        logger.info("Fetching all experiments from the database.")
-        result = await session.execute(select(Experiment))
-        experiments = [row[0] for row in result.all()]
-        logger.info(f"Fetched {len(experiments)} experiments.")
-        return experiments
+        logger.info("Fetching a page of experiments from the database.")
+        filters = experiment_filters(dataset_id, precision, created_after, created_before)
+        rows, next_cursor = await list_experiments_page(session, limit, cursor, filters)
+        logger.info(f"Fetched {len(rows)} experiments.")
+        return ExperimentPage(experiments=rows, next_cursor=next_cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching experiments: {e}")
         raise HTTPException(status_code=500, detail="Could not fetch experiments")
     
+@router.get("/experiments/{experiment_id}/latency", response_model=LatencyDistributionResponse)
+async def get_latency_distribution(
+    experiment_id: str,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Latency distribution (min/mean/percentiles/stddev and raw samples) of one experiment."""
+    logger.info(f"Fetching latency distribution for experiment ID: {experiment_id}")
+    result = await session.execute(
+        select(LatencyDistribution).where(LatencyDistribution.experiment_id == experiment_id)
+    )
+    distribution = result.scalar_one_or_none()
+    if not distribution:
+        raise HTTPException(status_code=404, detail="No latency distribution for this experiment")
+    return distribution
+    
+@router.get("/experiments/{experiment_id}/power", response_model=PowerTraceResponse)
+async def get_power_trace(
+    experiment_id: str,
+    points: int = Query(500, ge=4, le=POWER_TRACE_MAX_POINTS, description="Points to return after downsampling"),
+    method: DownsampleMethod = DownsampleMethod.LTTB,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    CPU/RAM power over one experiment, downsampled on total power to at most `points`
+    samples with LTTB (shape-preserving) or min-max per bucket (keeps every spike).
+    """
+    logger.info(f"Fetching power trace for experiment ID: {experiment_id}")
+    trace = await session.scalar(select(PowerTrace).where(PowerTrace.experiment_id == experiment_id))
+    if not trace:
+        raise HTTPException(status_code=404, detail="No power trace for this experiment")
+
+    timestamps = decode_series(trace.timestamps)
+    cpu_watts = decode_series(trace.cpu_watts)
+    ram_watts = decode_series(trace.ram_watts)
+    total_watts = cpu_watts + ram_watts
+    if method == DownsampleMethod.LTTB:
+        index = lttb_indices(timestamps, total_watts, points)
+    else:
+        index = minmax_indices(total_watts, points)
+
+    return PowerTraceResponse(
+        experiment_id=experiment_id,
+        sample_count=trace.sample_count,
+        points=len(index),
+        method=method,
+        interval_seconds=trace.interval_seconds,
+        mean_watts=trace.mean_watts,
+        peak_watts=trace.peak_watts,
+        timestamps=timestamps[index].tolist(),
+        cpu_watts=cpu_watts[index].tolist(),
+        ram_watts=ram_watts[index].tolist(),
+        total_watts=total_watts[index].tolist(),
+    )
+
 @router.delete("/experiments/{experiment_id}")
 async def delete_experiment(
     experiment_id: str, 
@@ -142,7 +356,14 @@ async def delete_experiment(
             logger.warning(f"Experiment with ID {experiment_id} not found for deletion")
             raise HTTPException(status_code=404, detail="Experiment not found")
         
+        await session.execute(
+            delete(LatencyDistribution).where(LatencyDistribution.experiment_id == experiment_id)
+        )
+        await session.execute(delete(PowerTrace).where(PowerTrace.experiment_id == experiment_id))
         await session.delete(experiment)
+        # Running statistics cannot drop a value, so the dataset's summaries are recomputed
+        await session.flush()
+        await rebuild_summaries(session, experiment.dataset_id)
         await session.commit()
         
         logger.info(f"Experiment with ID {experiment_id} deleted successfully from database")
@@ -152,40 +373,255 @@ async def delete_experiment(
         logger.error(f"Error deleting experiment with ID {experiment_id}: {e}")
         raise HTTPException(status_code=500, detail="Could not delete experiment")
     
-@router.get("/compare/{dataset_id}")
+@router.get("/compare/{dataset_id}", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def compare_models(
     dataset_id: str, 
+    precisions: List[PrecisionType] = Query(
+        [PrecisionType.FP32, PrecisionType.INT8],
+        description="Configurations to compare; the first is the baseline"
+    ),
+    engines: List[EngineType] = Query(
+        [EngineType.EAGER],
+        description="Runtimes to run every precision on, e.g. ?engines=EAGER&engines=ONNXRUNTIME"
+    ),
+    batch_size: int | None = Query(None, gt=0, description="Rows per forward pass for every configuration"),
+    trials: int = Query(COMPARE_TRIALS, ge=1, le=100, description="Trials per configuration"),
+    order: TrialOrder = TrialOrder.INTERLEAVED,
+    seed: int | None = Query(None, description="Seeds the randomized order and the bootstrap"),
     session: AsyncSession = Depends(get_async_session)
 ):
+    """
+    Queues a job that runs `trials` interleaved (ABAB) or randomized trials of every
+    precision on every engine and reports the savings over the first configuration
+    (first precision, first engine), with bootstrap confidence intervals and a
+    significance flag. Every trial is saved as its own Experiment row.
+    """
     try:
-        """
-        Runs BOTH fp32 and int8 sequentially and returns the difference.
-        """
-        logger.info(f"Starting model comparison for dataset ID: {dataset_id}")
-        dataset, df, model_service = await _get_dataset_and_model(session, dataset_id)
-
-
-        exp_fp32 = await execute_experiment(session, dataset, df, model_service, PrecisionType.FP32)
-        exp_int8 = await execute_experiment(session, dataset, df, model_service, PrecisionType.INT8)
-
-        # Calculate Logic
-        energy_saved_kwh = exp_fp32.energy_consumed_kwh - exp_int8.energy_consumed_kwh
-        energy_saved_pct = (energy_saved_kwh / exp_fp32.energy_consumed_kwh * 100) if exp_fp32.energy_consumed_kwh > 0 else 0
-        latency_saved_sec = exp_fp32.latency_seconds - exp_int8.latency_seconds
-        latency_saved_pct = (latency_saved_sec / exp_fp32.latency_seconds * 100) if exp_fp32.latency_seconds > 0 else 0
-        logger.info(f"Model comparison completed for dataset ID: {dataset_id}")
-        return {
-            "dataset_id": dataset.id,
-            "model_type": dataset.ai_model,
-            "fp32_results": exp_fp32, 
-            "int8_results": exp_int8,
-            "improvement": {
-                "energy_saved_kwh": energy_saved_kwh,
-                "energy_saved_percentage": round(energy_saved_pct, 2),
-                "latency_reduced_percentage": round(latency_saved_pct, 2),
-                "accuracy_loss": round(exp_fp32.accuracy - exp_int8.accuracy, 4)
-            }
-        }
+        if len(set(precisions)) != len(precisions) or len(set(engines)) != len(engines):
+            raise HTTPException(status_code=422, detail="Precisions and engines must not repeat")
+        configs = [ComparisonConfig(p.value, batch_size, e.value) for e in engines for p in precisions]
+        if len(configs) < 2:
+            raise HTTPException(status_code=422, detail="Give at least two precisions or engines to compare")
+        logger.info(f"Starting model comparison {[c.label for c in configs]} for dataset ID: {dataset_id}")
+        dataset = await _get_dataset(session, dataset_id, precisions, engines)
+        spec = ComparisonSpec(
+            dataset_id=dataset.id,
+            filepath=dataset.filepath,
+            ai_model=dataset.ai_model.value,
+            configs=configs,
+            trials=trials,
+            order=order.value,
+            label_column=dataset.label_column,
+            seed=seed,
+        )
+        model_type = dataset.ai_model
+
+        async def runner(ctx: JobContext):
+            comparison = await ctx.run_in_worker(run_comparison, spec)
+            experiments = []
+            for summary, measurements in zip(comparison["configs"], comparison.pop("measurements")):
+                for measurement in measurements:
+                    experiment = result_sink.submit(dataset_id, measurement)
+                    summary.setdefault("experiment_ids", []).append(experiment.id)
+                    experiments.append(experiment)
+            await result_sink.flush(experiments)
+            await ctx.step_done()
+            logger.info(f"Model comparison completed for dataset ID: {dataset_id}")
+            return ComparisonResponse(
+                dataset_id=dataset_id, model_type=model_type.value, **comparison
+            ).model_dump(mode="json")
+
+        return job_manager.submit("comparison", runner, dataset_id=dataset.id)
     except HTTPException as he:
         logger.error(f"HTTP error during model comparison: {he.detail}")
-        raise he
\ No newline at end of file
+        raise he
+
+
+@router.post("/batch-sweep/{dataset_id}", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def batch_size_sweep(
+    dataset_id: str,
+    precision: PrecisionType,
+    batch_sizes: List[int] = Query(..., description="Batch sizes to measure, e.g. ?batch_sizes=32&batch_sizes=256"),
+    engine: EngineType = EngineType.EAGER,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Queues one job that measures every batch size in turn (streamed, out-of-core execution)
+    and reports latency, throughput and energy per sample for each.
+    Every point is also saved as its own Experiment row.
+    """
+    try:
+        if any(size <= 0 for size in batch_sizes):
+            raise HTTPException(status_code=422, detail="Batch sizes must be positive")
+        logger.info(f"Starting batch-size sweep {batch_sizes} for dataset ID: {dataset_id}")
+        dataset = await _get_dataset(session, dataset_id, [precision], [engine])
+        specs = [ExperimentSpec.from_dataset(dataset, precision, size, engine=engine) for size in batch_sizes]
+
+        async def runner(ctx: JobContext):
+            experiments = [await _measure_and_save(ctx, spec) for spec in specs]
+            await result_sink.flush(experiments)
+            # One basis for the whole sweep, so every batch size is costed on the same footing
+            basis = energy_basis(experiments)
+            points = []
+            for spec, experiment in zip(specs, experiments):
+                energy = run_energy_kwh(experiment, basis)
+                points.append(BatchSweepPoint(
+                    batch_size=spec.batch_size,
+                    latency_seconds=experiment.latency_seconds,
+                    throughput_samples_per_sec=experiment.throughput_samples_per_sec or 0.0,
+                    energy_consumed_kwh=experiment.energy_consumed_kwh,
+                    net_energy_kwh=experiment.net_energy_kwh,
+                    energy_per_sample_joules=energy * JOULES_PER_KWH / max(experiment.num_samples, 1),
+                    experiment_id=experiment.id,
+                ).model_dump())
+            logger.info(f"Batch-size sweep completed for dataset ID: {dataset_id}")
+            return {"dataset_id": dataset_id, "precision": precision.value, "energy_basis": basis, "points": points}
+
+        return job_manager.submit("batch_sweep", runner, dataset_id=dataset.id, total_steps=len(specs))
+    except HTTPException as he:
+        logger.error(f"HTTP error during batch-size sweep: {he.detail}")
+        raise he
+
+
+@router.post("/thread-sweep/{dataset_id}", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def thread_sweep(
+    dataset_id: str,
+    precision: PrecisionType,
+    intra_op_threads: List[int] = Query(..., description="torch intra-op thread counts, e.g. ?intra_op_threads=1&intra_op_threads=4"),
+    inter_op_threads: List[int] = Query([1], description="torch inter-op thread counts"),
+    cpu_sets: List[str] = Query(["all"], description="Cores to pin each run to, e.g. ?cpu_sets=0-3&cpu_sets=0-7; 'all' for no pinning"),
+    batch_size: int | None = Query(None, gt=0, description="Rows per forward pass; omit to run the whole dataset at once"),
+    engine: EngineType = EngineType.EAGER,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Queues one job that measures every combination of intra-op threads, inter-op
+    threads and CPU set, each in a fresh worker process, and reports energy, latency
+    and samples per joule per point plus the Pareto-optimal settings
+    (lowest latency vs. most samples per joule).
+    Every point is also saved as its own Experiment row.
+    """
+    try:
+        if any(n <= 0 for n in intra_op_threads + inter_op_threads):
+            raise HTTPException(status_code=422, detail="Thread counts must be positive")
+        try:
+            cpu_choices = [parse_cpu_set(text) for text in cpu_sets]
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        allowed = available_cpus()
+        if any(cpus is not None for cpus in cpu_choices):
+            if allowed is None:
+                raise HTTPException(status_code=400, detail="CPU affinity is not supported on this platform")
+            for cpus in cpu_choices:
+                unavailable = sorted(set(cpus or ()) - allowed)
+                if unavailable:
+                    raise HTTPException(status_code=422, detail=f"CPU(s) {unavailable[:16]} are not available to this server")
+
+        settings = [
+            ThreadSetting(intra, inter, cpus)
+            for cpus in cpu_choices for intra in intra_op_threads for inter in inter_op_threads
+        ]
+        if len(settings) > THREAD_SWEEP_MAX_POINTS:
+            raise HTTPException(status_code=422, detail=f"At most {THREAD_SWEEP_MAX_POINTS} sweep points per job")
+
+        logger.info(f"Starting thread sweep with {len(settings)} points for dataset ID: {dataset_id}")
+        dataset = await _get_dataset(session, dataset_id, [precision], [engine])
+        spec = ExperimentSpec.from_dataset(dataset, precision, batch_size, engine=engine)
+
+        async def runner(ctx: JobContext):
+            points, experiments = [], []
+            for setting in settings:
+                measurement = await ctx.run_in_fresh_process(run_thread_point, spec, setting)
+                experiment = result_sink.submit(spec.dataset_id, measurement)
+                await ctx.step_done()
+
+                experiments.append(experiment)
+                net, gross = experiment.net_energy_kwh, experiment.energy_consumed_kwh
+                points.append(ThreadSweepPoint(
+                    intra_op_threads=setting.intra_op_threads,
+                    inter_op_threads=setting.inter_op_threads,
+                    cpu_affinity=setting.cpus,
+                    latency_seconds=experiment.latency_seconds,
+                    throughput_samples_per_sec=experiment.throughput_samples_per_sec or 0.0,
+                    energy_consumed_kwh=gross,
+                    net_energy_kwh=net,
+                    net_samples_per_joule=experiment.num_samples / (net * JOULES_PER_KWH) if has_net_energy(experiment) else None,
+                    gross_samples_per_joule=experiment.num_samples / (gross * JOULES_PER_KWH) if gross else None,
+                    experiment_id=experiment.id,
+                ).model_dump())
+
+            await result_sink.flush(experiments)
+            # One basis for the whole sweep, so every point is ranked on the same footing
+            use_net = energy_basis(experiments) == "net"
+            for point in points:
+                point["samples_per_joule"] = point["net_samples_per_joule" if use_net else "gross_samples_per_joule"]
+            front = pareto_front(points, minimize=("latency_seconds",), maximize=("samples_per_joule",))
+            for i in front:
+                points[i]["pareto_optimal"] = True
+            logger.info(f"Thread sweep completed for dataset ID: {dataset_id}")
+            return {
+                "dataset_id": dataset_id,
+                "precision": precision.value,
+                "energy_basis": "net" if use_net else "gross",
+                "points": points,
+                "pareto_front": [points[i] for i in front],
+            }
+
+        return job_manager.submit("thread_sweep", runner, dataset_id=dataset.id, total_steps=len(settings))
+    except HTTPException as he:
+        logger.error(f"HTTP error during thread sweep: {he.detail}")
+        raise he
+
+
+@router.post("/scaling-curve/{dataset_id}", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def scaling_curve(
+    dataset_id: str,
+    precision: PrecisionType,
+    row_counts: List[str] = Query(..., description="Row subsets to measure, e.g. ?row_counts=1k&row_counts=10k&row_counts=100k"),
+    trials: int = Query(1, ge=1, le=20, description="Trials per row count"),
+    batch_size: int | None = Query(None, gt=0, description="Rows per forward pass; omit to run each subset at once"),
+    predict_rows: List[str] = Query([], description="Row counts to extrapolate latency and energy to, e.g. ?predict_rows=10m"),
+    engine: EngineType = EngineType.EAGER,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Queues a job that measures the model on the first N rows of the dataset for
+    every row count (trials interleaved across counts) and fits latency and energy
+    per pass as fixed + per-sample cost. Every trial is saved as its own Experiment row.
+    """
+    try:
+        try:
+            counts = parse_row_counts(row_counts)
+            predictions = parse_row_counts(predict_rows)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if len(counts) < 2:
+            raise HTTPException(status_code=422, detail="Give at least two distinct row counts to fit a curve")
+        if len(counts) * trials > SCALING_MAX_POINTS:
+            raise HTTPException(status_code=422, detail=f"At most {SCALING_MAX_POINTS} row counts x trials per job")
+
+        logger.info(f"Starting scaling curve {counts} x {trials} for dataset ID: {dataset_id}")
+        dataset = await _get_dataset(session, dataset_id, [precision], [engine])
+        # Row counts of large files are only known once their background profile is done;
+        # until then the worker rejects subsets larger than the file
+        if dataset.num_rows is not None and counts[-1] > dataset.num_rows:
+            raise HTTPException(status_code=422, detail=f"The dataset has only {dataset.num_rows} rows")
+
+        async def runner(ctx: JobContext):
+            runs = {n: [] for n in counts}
+            # Every count once per round, so drift spreads over all of them
+            for _ in range(trials):
+                for n in counts:
+                    spec = ExperimentSpec.from_dataset(dataset, precision, batch_size, num_rows=n, engine=engine)
+                    runs[n].append(await _measure_and_save(ctx, spec))
+            await result_sink.flush([run for trials_of_n in runs.values() for run in trials_of_n])
+            logger.info(f"Scaling curve completed for dataset ID: {dataset_id}")
+            return ScalingCurveResponse(
+                dataset_id=dataset_id, precision=precision, engine=engine, batch_size=batch_size,
+                **summarize_scaling(runs, predictions)
+            ).model_dump(mode="json")
+
+        return job_manager.submit("scaling_curve", runner, dataset_id=dataset.id, total_steps=len(counts) * trials)
+    except HTTPException as he:
+        logger.error(f"HTTP error during scaling curve: {he.detail}")
+        raise he
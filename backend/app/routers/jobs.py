@@ -0,0 +1,56 @@
+import logging
+from typing import List
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from backend.app.models.enums import JobStatus
+from backend.app.schemas.jobs import JobResponse
+from backend.app.services.job_service import job_manager
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        logger.warning(f"Job with ID {job_id} not found")
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs", response_model=List[JobResponse])
+async def list_jobs(status: JobStatus | None = None):
+    logger.info("Listing jobs.")
+    return job_manager.list_jobs(status)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    return _get_job_or_404(job_id)
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    job = _get_job_or_404(job_id)
+    if job.is_finished or job.status == JobStatus.CANCELLING:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status.value}")
+    logger.info(f"Cancelling job {job_id}")
+    return await job_manager.cancel(job_id)
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """
+    Server-Sent Events stream of the job state, one event per change,
+    closed once the job has finished.
+    """
+    _get_job_or_404(job_id)
+
+    async def events():
+        async for job in job_manager.watch(job_id):
+            payload = JobResponse.model_validate(job).model_dump_json()
+            yield f"event: {job.status.value.lower()}\ndata: {payload}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
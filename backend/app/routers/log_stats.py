@@ -0,0 +1,25 @@
+import logging
+from fastapi import APIRouter
+
+from backend.app.core.logging import budget_filter, log_stats
+from backend.app.schemas.log_stats import LogStatsResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/logging/stats", response_model=LogStatsResponse)
+async def get_log_stats():
+    """
+    Records passed and dropped per logger by the log budget (WARNING and above are
+    never dropped), with the estimated energy the dropped records would have cost.
+    """
+    return log_stats()
+
+
+@router.post("/logging/stats/reset")
+async def reset_log_stats():
+    budget_filter.reset()
+    logger.info("Log budget counters reset")
+    return {"detail": "Log budget counters reset"}
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class CalibrationResponse(BaseModel):
+    idle_power_watts: float
+    cpu_power_watts: float
+    ram_power_watts: float
+    window_seconds: float
+    energy_meter: str
+    measured_at: float
+    age_seconds: float
+    # False once older than CALIBRATION_TTL_SECS; the next experiment re-calibrates first
+    is_fresh: bool
+
+    model_config = ConfigDict(from_attributes=True)
@@ -7,13 +7,47 @@ class DatasetCreate(BaseModel):
     filepath: str
     description: str | None = None
     ai_model: ModelType
+    label_column: str | None = None
     
 class DatasetResponse(BaseModel):
     id: str
     filename: str
     filepath: str
+    content_hash: str | None = None
+    size_bytes: int | None = None
     description: str | None = None
     ai_model: ModelType
+    label_column: str | None = None
+    num_rows: int | None = None
+    num_columns: int | None = None
+    num_features: int | None = None
+    validation_error: str | None = None
     created_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ColumnProfile(BaseModel):
+    min: float | None = None
+    max: float | None = None
+    mean: float | None = None
+    nulls: int
+
+class DatasetProfileResponse(BaseModel):
+    dataset_id: str
+    ai_model: ModelType
+    content_hash: str | None = None
+    size_bytes: int | None = None
+    rows: int
+    columns: int
+    feature_columns: int
+    label_column: str | None = None
+    ignored_columns: list[str]
+    dtypes: dict[str, str]
+    stats: dict[str, ColumnProfile]
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    filename: str
+    total_size: int | None = None
+    offset: int
+    chunk_size: int
\ No newline at end of file
@@ -1,30 +1,238 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+from typing import Any
 
-from backend.app.models.enums import PrecisionType
+from backend.app.models.enums import DownsampleMethod, EngineType, ModelType, PrecisionType, TrialOrder
 
 class ExperimentCreate(BaseModel):
     dataset_id: str
     precision: PrecisionType  
+    batch_size: int | None = None
 
 class ExperimentResponse(BaseModel):
     id: str
     dataset_id: str
     precision: PrecisionType
+    engine: EngineType | None = None
+    batch_size: int | None = None
+    num_rows: int | None = None
     latency_seconds: float |  None = None
+    num_samples: int | None = None
+    throughput_samples_per_sec: float | None = None
     emissions_kg: float |  None = None
     energy_consumed_kwh: float | None = None
     cpu_energy_kwh: float |  None = None
     ram_energy_kwh: float | None = None
+    net_energy_kwh: float | None = None
+    net_emissions_kg: float | None = None
+    net_energy_delta_kwh: float | None = None
+    net_energy_below_resolution: bool | None = None
+    idle_power_watts: float | None = None
     accuracy: float |  None = None
+    top_k_accuracy: float | None = None
+    metrics: dict[str, Any] | None = None
     duration: float |  None = None
+    energy_meter: str | None = None
+    intra_op_threads: int | None = None
+    inter_op_threads: int | None = None
+    cpu_affinity: list[int] | None = None
+    model_cache_hit: bool | None = None
+    model_load_seconds: float | None = None
     created_at: datetime |  None = None
 
     model_config = ConfigDict(from_attributes=True)
 
+class ExperimentListItem(BaseModel):
+    """Experiment row as shown in list views; the large JSON columns are left out."""
+    id: str
+    dataset_id: str
+    precision: PrecisionType
+    engine: EngineType | None = None
+    batch_size: int | None = None
+    num_rows: int | None = None
+    latency_seconds: float | None = None
+    num_samples: int | None = None
+    throughput_samples_per_sec: float | None = None
+    emissions_kg: float | None = None
+    energy_consumed_kwh: float | None = None
+    net_energy_kwh: float | None = None
+    accuracy: float | None = None
+    energy_meter: str | None = None
+    created_at: datetime | None = None
+
+class ExperimentPage(BaseModel):
+    experiments: list[ExperimentListItem]
+    # Pass as ?cursor= to get the next page; None on the last page
+    next_cursor: str | None = None
+
+class MetricSummary(BaseModel):
+    count: int
+    mean: float | None = None
+    variance: float | None = None
+    stddev: float | None = None
+    min: float | None = None
+    max: float | None = None
+
+class ExperimentSummaryResponse(BaseModel):
+    dataset_id: str
+    ai_model: ModelType
+    precision: PrecisionType
+    config_key: str
+    engine: EngineType | None = None
+    batch_size: int | None = None
+    num_rows: int | None = None
+    intra_op_threads: int | None = None
+    inter_op_threads: int | None = None
+    cpu_affinity: list[int] | None = None
+    runs: int
+    last_experiment_id: str | None = None
+    last_seen_at: datetime | None = None
+    energy: MetricSummary
+    net_energy: MetricSummary
+    emissions: MetricSummary
+    latency: MetricSummary
+    accuracy: MetricSummary
+
+class LatencyDistributionResponse(BaseModel):
+    experiment_id: str
+    warmup_iterations: int
+    iterations: int
+    min_seconds: float
+    mean_seconds: float
+    p50_seconds: float
+    p95_seconds: float
+    p99_seconds: float
+    stddev_seconds: float
+    relative_standard_error: float | None = None
+    converged: bool
+    samples_ns: list[int] | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class PowerTraceResponse(BaseModel):
+    experiment_id: str
+    # Samples stored, and points returned after downsampling
+    sample_count: int
+    points: int
+    method: DownsampleMethod
+    interval_seconds: float
+    mean_watts: float | None = None
+    peak_watts: float | None = None
+    timestamps: list[float]
+    cpu_watts: list[float]
+    ram_watts: list[float]
+    total_watts: list[float]
+
+class BatchSweepPoint(BaseModel):
+    batch_size: int
+    latency_seconds: float
+    throughput_samples_per_sec: float
+    energy_consumed_kwh: float
+    net_energy_kwh: float | None = None
+    # Energy per sample on the sweep's energy_basis (net of idle power if every point
+    # has usable net energy, else gross)
+    energy_per_sample_joules: float
+    experiment_id: str
+
+class ThreadSweepPoint(BaseModel):
+    intra_op_threads: int
+    inter_op_threads: int
+    # None means all cores the server may use
+    cpu_affinity: list[int] | None = None
+    latency_seconds: float
+    throughput_samples_per_sec: float
+    energy_consumed_kwh: float
+    net_energy_kwh: float | None = None
+    # Samples per joule on the sweep's energy_basis (net of idle power if every point
+    # has positive net energy, else gross); the Pareto front is computed on it
+    samples_per_joule: float | None = None
+    net_samples_per_joule: float | None = None
+    gross_samples_per_joule: float | None = None
+    pareto_optimal: bool = False
+    experiment_id: str
+
+class ScalingPoint(BaseModel):
+    num_rows: int
+    trials: int
+    # Means over the trials; energy is net of idle power when every trial has usable net figures
+    latency_seconds: float
+    energy_joules: float
+    latency_per_sample_seconds: float
+    energy_per_sample_joules: float
+    experiment_ids: list[str] = []
+
+class ScalingFit(BaseModel):
+    """y = fixed + per_sample * rows, least squares over every trial; exponent from log y vs. log rows."""
+    metric: str
+    fixed: float
+    per_sample: float
+    r_squared: float | None = None
+    # ~1 for linear scaling, <1 while fixed costs still dominate
+    exponent: float | None = None
+
+class ScalingPrediction(BaseModel):
+    num_rows: int
+    latency_seconds: float
+    energy_joules: float
+
+class ScalingCurveResponse(BaseModel):
+    dataset_id: str
+    precision: PrecisionType
+    engine: EngineType = EngineType.EAGER
+    batch_size: int | None = None
+    energy_basis: str
+    points: list[ScalingPoint]
+    latency: ScalingFit
+    energy: ScalingFit
+    predictions: list[ScalingPrediction] = []
+
 class ExperimentComparisonResponse(BaseModel):
     dataset_id: str
-    fp32: ExperimentResponse
-    int8: ExperimentResponse
+    # Latest run of every precision measured on the dataset, keyed by precision
+    results: dict[str, ExperimentResponse]
+    fp32: ExperimentResponse | None = None
+    int8: ExperimentResponse | None = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ConfigSummary(BaseModel):
+    label: str
+    precision: PrecisionType
+    engine: EngineType = EngineType.EAGER
+    batch_size: int | None = None
+    trials: int
+    latency_mean_seconds: float
+    latency_stddev_seconds: float
+    # Energy per pass over the dataset on the comparison's energy_basis, averaged over the trials
+    energy_per_pass_kwh: float
+    energy_per_pass_joules: float
+    accuracy: float | None = None
+    experiment_ids: list[str] = []
+
+class SavingEstimate(BaseModel):
+    # Positive means the candidate uses less than the baseline; None if the baseline is zero
+    percentage: float | None = None
+    ci_low: float | None = None
+    ci_high: float | None = None
+    # The confidence interval excludes zero
+    significant: bool
+
+class ConfigSaving(BaseModel):
+    baseline: str
+    candidate: str
+    energy: SavingEstimate
+    latency: SavingEstimate
+    accuracy_loss: float | None = None
+
+class ComparisonResponse(BaseModel):
+    dataset_id: str
+    model_type: str
+    order: TrialOrder
+    trials_per_config: int
+    confidence: float
+    # 'net' of idle power if every trial has usable net energy, else 'gross' for all
+    energy_basis: str
+    # Config labels in the order their trials ran
+    schedule: list[str]
+    configs: list[ConfigSummary]
+    savings: list[ConfigSaving]
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Any
+
+from backend.app.models.enums import JobStatus
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    dataset_id: str | None = None
+    status: JobStatus
+    total_steps: int
+    completed_steps: int
+    result: Any = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+
+
+class LoggerCountersResponse(BaseModel):
+    passed: int
+    # Dropped by the logger's fixed sample rate (LOG_SAMPLE_RATES)
+    dropped_sampled: int
+    # Dropped because the logger exceeded its records/s or joules/min budget
+    dropped_over_budget: int
+
+
+class LogStatsResponse(BaseModel):
+    # None when only fixed sampling is configured
+    records_per_sec_budget: float | None = None
+    burst: float
+    overflow_sample_rate: float
+    sample_rates: dict[str, float]
+    joules_per_record: float
+    passed: int
+    dropped: int
+    estimated_joules_saved: float
+    # Records lost because the writer queue was full
+    queue_full_dropped: int
+    loggers: dict[str, LoggerCountersResponse]
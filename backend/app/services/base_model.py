@@ -1,20 +1,284 @@
 from abc import ABC, abstractmethod
-import pandas as pd
+from dataclasses import dataclass
+
+import numpy as np
+import torch
+
+from backend.app.models.enums import EngineType, ModelType, PrecisionType
+from backend.app.services.benchmark import BenchmarkConfig, LatencyStats, run_benchmark
+from backend.app.services.dataset_cache import MODEL_INPUT_FEATURES, DatasetArrays
+from backend.app.services.inference_engine import OrtModel, check_engine, export_onnx, ort_session, quantize_onnx
+from backend.app.services.metrics import ClassificationMetrics
+from backend.app.services.model_cache import file_fingerprint, model_cache
+from backend.app.services.optimizations import (
+    JIT_TRACE_ROWS,
+    STATIC_QUANT_CALIBRATION_ROWS,
+    AutocastModule,
+    array_fingerprint,
+    freeze_jit,
+    optimize_jit,
+    quantize_static,
+    sample_rows,
+)
+
+
+@dataclass
+class InferenceResult:
+    # Mean seconds per pass over the dataset
+    latency: float
+    latency_stats: LatencyStats
+    # Rows pushed through the model, warmup included
+    processed_samples: int
+    # None when the dataset has no label column
+    accuracy: float | None = None
+    top_k_accuracy: float | None = None
+    metrics: dict | None = None
+
 
 class BaseAIModel(ABC):
     """
     The interface that all future models (MLP, CNN, Transformer) must follow.
     """
-    
+
+    model_type: ModelType
+    model_path: str
+    num_classes: int
+    # Minimum timed passes over the dataset per measurement, for measurability
+    repetitions: int = 1
+    supported_precisions: tuple[PrecisionType, ...] = (
+        PrecisionType.FP32,
+        PrecisionType.INT8,
+        PrecisionType.BF16,
+        PrecisionType.INT8_STATIC,
+        PrecisionType.JIT_FROZEN,
+    )
+
     @abstractmethod
     def load_model(self):
         """Loads the weights from disk."""
         pass
 
-    @abstractmethod
-    def run_inference(self, df: pd.DataFrame, precision: str) -> tuple[float, float]:
+    def prepare_model(self, model, precision: str, example_input: torch.Tensor | None = None):
+        """
+        Applies the precision-specific transformation (e.g. quantization).
+        Handles the model-agnostic variants; subclasses add their own and call super().
+        example_input: prepared rows of the dataset, used to calibrate static INT8
+        and to trace TorchScript graphs.
+        FP32 (and anything unhandled) runs the model as loaded.
+        """
+        if precision == PrecisionType.BF16.value:
+            return AutocastModule(model, torch.bfloat16)
+        if precision == PrecisionType.INT8_STATIC.value:
+            return quantize_static(model, example_input)
+        if precision == PrecisionType.JIT_FROZEN.value:
+            return freeze_jit(model, example_input[:JIT_TRACE_ROWS])
+        return model
+
+    def get_model(self, precision: str, data: DatasetArrays | None = None, engine: str = EngineType.EAGER.value):
+        """Returns a ready-to-run model for the given precision and engine (see resolve_model)."""
+        return self.resolve_model(precision, data, engine)[0]
+
+    def resolve_model(
+        self, precision: str, data: DatasetArrays | None = None, engine: str = EngineType.EAGER.value
+    ) -> tuple[torch.nn.Module | OrtModel, bool]:
+        """
+        Returns a ready-to-run model for the given precision and engine, and whether
+        it came from the model cache (memory or disk) rather than being built.
+        Models are served from the model cache, so the weights are only
+        deserialized, transformed and exported once per (model, weights file, engine, precision).
+        INT8_STATIC, JIT_FROZEN and the TORCHSCRIPT engine need `data`: static INT8 is
+        calibrated on a sample of it (and cached per sample, in memory only, as
+        FX-quantized modules do not survive pickling); TorchScript is traced on a few of its rows.
+        """
+        precision = PrecisionType(precision)
+        engine = EngineType(engine)
+        if precision not in self.supported_precisions:
+            raise ValueError(f"{precision.value} is not supported for {self.model_type.value}")
+        check_engine(engine, precision)
+
+        key = (self.model_type.value, file_fingerprint(self.model_path))
+        sample = example_input = None
+        if precision in (PrecisionType.INT8_STATIC, PrecisionType.JIT_FROZEN) or engine == EngineType.TORCHSCRIPT:
+            if data is None:
+                raise ValueError(f"{precision.value} on {engine.value} needs a dataset sample to calibrate/trace on")
+            sample = sample_rows(data.features, STATIC_QUANT_CALIBRATION_ROWS)
+            example_input = self.prepare_input(sample)
+            if precision == PrecisionType.INT8_STATIC:
+                key += (array_fingerprint(sample),)
+        # Eager keys carry no engine, so artifacts cached before engines existed stay valid
+        if engine != EngineType.EAGER:
+            key += (engine.value,)
+        key += (precision.value,)
+
+        if engine == EngineType.TORCHSCRIPT:
+            # Traced in the input layout of the precision (e.g. NHWC for CHANNELS_LAST)
+            trace_input = self.prepare_input(sample[:JIT_TRACE_ROWS], precision.value)
+            return model_cache.fetch(
+                key,
+                lambda: freeze_jit(self.prepare_model(self.load_model(), precision.value, example_input), trace_input),
+                finalize=optimize_jit,
+            )
+        if engine == EngineType.ONNXRUNTIME:
+            # The session is not picklable; the .onnx files are the on-disk tier
+            exported = model_cache.artifact_path(key, ".onnx").exists()
+            model, hit = model_cache.fetch(
+                key, lambda: self._build_onnx_model(key, precision, example_input), persist=False
+            )
+            return model, hit or exported
+        return model_cache.fetch(
+            key,
+            lambda: self.prepare_model(self.load_model(), precision.value, example_input),
+            finalize=optimize_jit if precision == PrecisionType.JIT_FROZEN else None,
+            persist=precision != PrecisionType.INT8_STATIC,
+        )
+
+    def _build_onnx_model(self, key: tuple, precision: PrecisionType, calibration_input: torch.Tensor | None):
+        """
+        Exports the FP32 model to ONNX (shared by all ONNX precisions of these weights),
+        quantizes it with ONNX Runtime's tools if needed and opens a session.
+        """
+        fp32_path = model_cache.artifact_path(
+            key[:2] + (EngineType.ONNXRUNTIME.value, PrecisionType.FP32.value), ".onnx"
+        )
+        if not fp32_path.exists():
+            example = np.zeros((1, MODEL_INPUT_FEATURES[self.model_type]), dtype=np.float32)
+            export_onnx(self.load_model(), self.prepare_input(example), fp32_path)
+        if precision == PrecisionType.FP32:
+            return ort_session(fp32_path)
+
+        path = model_cache.artifact_path(key, ".onnx")
+        if not path.exists():
+            calibration = calibration_input.numpy() if calibration_input is not None else None
+            quantize_onnx(fp32_path, path, precision, calibration)
+        return ort_session(path)
+
+    def prepare_input(self, features: np.ndarray, precision: str | None = None) -> torch.Tensor:
         """
-        Runs the model and returns (latency, accuracy).
-        precision: 'fp32' or 'int8'
+        Turns a slice of the float32 feature matrix into the model's input tensor.
+        The default wraps it without a copy.
         """
-        pass
\ No newline at end of file
+        return torch.from_numpy(features)
+
+    def input_variant(self, precision: str) -> str:
+        """
+        Identifies the input layout prepare_input produces for `precision`, so
+        callers can share one prepared tensor between precisions that agree.
+        """
+        return "default"
+
+    def check_input(self, data: DatasetArrays):
+        """Raises ValueError if the feature matrix does not fit the model."""
+        pass
+
+    def benchmark_config(self) -> BenchmarkConfig:
+        config = BenchmarkConfig()
+        config.min_iterations = max(config.min_iterations, self.repetitions)
+        return config
+
+    def benchmark_passes(
+        self,
+        model,
+        data: DatasetArrays,
+        batch_size: int | None = None,
+        metrics: ClassificationMetrics | None = None,
+        config: BenchmarkConfig | None = None,
+        input_tensor: torch.Tensor | None = None,
+        precision: str | None = None
+    ) -> LatencyStats:
+        """
+        Times passes over the dataset with the benchmark harness (warmup, then
+        adaptive repetition until the latency estimate is stable).
+        Without a batch size the whole dataset is one tensor, prepared before timing
+        (or passed in as `input_tensor`, so repeated runs can share one).
+        With a batch size, rows are streamed from the memory-mapped matrix in chunks,
+        so only one batch is resident at a time and datasets larger than RAM work.
+        If `metrics` is given, the logits of the first timed pass are kept (a reference
+        per batch, no copy) and scored against the labels after timing, so scoring is
+        never part of a timed iteration.
+        """
+        num_rows = data.num_samples
+        score = metrics is not None and data.labels is not None
+        # (start row, logits) of the first timed pass
+        outputs: list[tuple[int, torch.Tensor]] = []
+
+        if batch_size is None:
+            if input_tensor is None:
+                input_tensor = self.prepare_input(data.features, precision)
+
+            def step(iteration: int | None):
+                output = model(input_tensor)
+                if score and iteration == 0:
+                    outputs.append((0, output))
+        else:
+            def step(iteration: int | None):
+                for start_row in range(0, num_rows, batch_size):
+                    end_row = start_row + batch_size
+                    output = model(self.prepare_input(data.features[start_row:end_row], precision))
+                    if score and iteration == 0:
+                        outputs.append((start_row, output))
+
+        with torch.no_grad():
+            stats = run_benchmark(step, config or self.benchmark_config())
+        for start_row, output in outputs:
+            metrics.update(output, torch.from_numpy(data.labels[start_row:start_row + len(output)]))
+        return stats
+
+    def evaluate(
+        self,
+        model,
+        data: DatasetArrays,
+        batch_size: int | None = None,
+        input_tensor: torch.Tensor | None = None,
+        precision: str | None = None
+    ) -> dict:
+        """
+        Scores one untimed pass of `model` over the dataset against its labels.
+        Returns accuracy, top_k_accuracy and metrics, all None when the dataset has no labels.
+        """
+        if data.labels is None:
+            return {"accuracy": None, "top_k_accuracy": None, "metrics": None}
+        metrics = ClassificationMetrics(self.num_classes)
+        config = BenchmarkConfig(warmup_iterations=0, min_iterations=1, max_iterations=1)
+        self.benchmark_passes(model, data, batch_size, metrics, config, input_tensor, precision)
+        return {"accuracy": metrics.accuracy, "top_k_accuracy": metrics.top_k_accuracy, "metrics": metrics.result()}
+
+    def run_inference(
+        self,
+        data: DatasetArrays,
+        precision: str,
+        batch_size: int | None = None,
+        config: BenchmarkConfig | None = None,
+        input_tensor: torch.Tensor | None = None,
+        score: bool = True,
+        engine: str = EngineType.EAGER.value,
+        model=None
+    ) -> InferenceResult:
+        """
+        Runs the model over the dataset's feature matrix and returns the latency
+        distribution plus accuracy metrics measured against the label column.
+        precision: a PrecisionType value, e.g. 'FP32', 'INT8' or 'JIT_FROZEN'
+        batch_size: rows per forward pass, or None for the whole dataset at once
+        input_tensor: the already prepared whole-dataset input, if the caller has one
+        score: False skips the accuracy metrics (e.g. for repeated trials of one model)
+        engine: an EngineType value; every engine gets the same prepared input
+        model: the model from resolve_model, if the caller resolved it already
+        (e.g. before starting an energy meter, so model setup is not measured)
+        """
+        # Fail fast on a wrong shape, before the (cached) model is touched
+        self.check_input(data)
+
+        if model is None:
+            model = self.get_model(precision, data, engine)
+        metrics = ClassificationMetrics(self.num_classes) if score and data.labels is not None else None
+
+        stats = self.benchmark_passes(model, data, batch_size, metrics, config, input_tensor, precision)
+        result = InferenceResult(
+            latency=stats.mean_seconds,
+            latency_stats=stats,
+            processed_samples=data.num_samples * (stats.warmup_iterations + stats.iterations),
+        )
+        if metrics is not None:
+            result.accuracy = metrics.accuracy
+            result.top_k_accuracy = metrics.top_k_accuracy
+            result.metrics = metrics.result()
+        return result
@@ -0,0 +1,109 @@
+import os
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BENCH_WARMUP_ITERATIONS = int(os.getenv("BENCH_WARMUP_ITERATIONS", "2"))
+BENCH_MIN_ITERATIONS = int(os.getenv("BENCH_MIN_ITERATIONS", "5"))
+BENCH_MAX_ITERATIONS = int(os.getenv("BENCH_MAX_ITERATIONS", "200"))
+BENCH_TARGET_RSE = float(os.getenv("BENCH_TARGET_RSE", "0.02"))
+BENCH_MAX_SECONDS = float(os.getenv("BENCH_MAX_SECONDS", "30"))
+
+
+@dataclass
+class BenchmarkConfig:
+    """
+    warmup_iterations: untimed iterations run first (caches, allocator, lazy init).
+    min_iterations / max_iterations: bounds on timed iterations.
+    target_rse: stop once the relative standard error of the mean drops below this.
+    max_seconds: time budget for the timed iterations.
+    """
+    warmup_iterations: int = BENCH_WARMUP_ITERATIONS
+    min_iterations: int = BENCH_MIN_ITERATIONS
+    max_iterations: int = BENCH_MAX_ITERATIONS
+    target_rse: float = BENCH_TARGET_RSE
+    max_seconds: float = BENCH_MAX_SECONDS
+
+
+@dataclass
+class LatencyStats:
+    """Per-iteration latency distribution, in seconds."""
+    warmup_iterations: int
+    iterations: int
+    min_seconds: float
+    mean_seconds: float
+    p50_seconds: float
+    p95_seconds: float
+    p99_seconds: float
+    stddev_seconds: float
+    relative_standard_error: float
+    # False if the iteration or time budget ran out before reaching target_rse
+    converged: bool
+    samples_ns: list[int] = field(repr=False, default_factory=list)
+
+    @classmethod
+    def from_samples(cls, samples_ns: list[int], warmup_iterations: int, target_rse: float) -> "LatencyStats":
+        seconds = np.asarray(samples_ns, dtype=np.float64) / 1e9
+        mean = float(seconds.mean())
+        stddev = float(seconds.std(ddof=1)) if len(seconds) > 1 else 0.0
+        rse = _relative_standard_error(seconds)
+        p50, p95, p99 = np.percentile(seconds, [50, 95, 99])
+        return cls(
+            warmup_iterations=warmup_iterations,
+            iterations=len(samples_ns),
+            min_seconds=float(seconds.min()),
+            mean_seconds=mean,
+            p50_seconds=float(p50),
+            p95_seconds=float(p95),
+            p99_seconds=float(p99),
+            stddev_seconds=stddev,
+            relative_standard_error=rse,
+            converged=rse <= target_rse,
+            samples_ns=list(samples_ns),
+        )
+
+
+def _relative_standard_error(seconds: np.ndarray) -> float:
+    if len(seconds) < 2:
+        return math.inf
+    mean = seconds.mean()
+    if mean <= 0:
+        return math.inf
+    return float(seconds.std(ddof=1) / math.sqrt(len(seconds)) / mean)
+
+
+def run_benchmark(step: Callable[[int | None], None], config: BenchmarkConfig | None = None) -> LatencyStats:
+    """
+    Times `step` with perf_counter_ns.
+    step(None) is a warmup call; timed calls get their 0-based iteration index,
+    so the caller can act on exactly one timed iteration (e.g. keep its outputs for scoring).
+    Timed iterations repeat until the relative standard error of the mean is
+    below target_rse (after min_iterations), or the iteration/time budget is spent.
+    """
+    config = config or BenchmarkConfig()
+
+    for _ in range(config.warmup_iterations):
+        step(None)
+
+    samples_ns: list[int] = []
+    budget_ns = config.max_seconds * 1e9
+    started = time.perf_counter_ns()
+    while True:
+        t0 = time.perf_counter_ns()
+        step(len(samples_ns))
+        samples_ns.append(time.perf_counter_ns() - t0)
+
+        n = len(samples_ns)
+        if n >= config.min_iterations:
+            if _relative_standard_error(np.asarray(samples_ns, dtype=np.float64)) <= config.target_rse:
+                break
+            if n >= config.max_iterations or time.perf_counter_ns() - started >= budget_ns:
+                break
+
+    return LatencyStats.from_samples(samples_ns, config.warmup_iterations, config.target_rse)
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+
+from dotenv import load_dotenv
+
+from backend.app.services.energy_meter import JOULES_PER_KWH, EnergyReading, get_energy_meter
+from backend.app.services.job_service import Job, JobContext, job_manager
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_FILE = os.getenv("CALIBRATION_FILE", "./calibration.json")
+# Seconds of idle time measured per calibration
+CALIBRATION_WINDOW_SECS = float(os.getenv("CALIBRATION_WINDOW_SECS", "5"))
+# A baseline older than this is stale and is re-measured before the next experiment
+CALIBRATION_TTL_SECS = float(os.getenv("CALIBRATION_TTL_SECS", "3600"))
+# How often the server re-calibrates in the background; 0 disables it
+CALIBRATION_INTERVAL_SECS = float(os.getenv("CALIBRATION_INTERVAL_SECS", "1800"))
+
+
+@dataclass
+class IdleBaseline:
+    """Average power drawn by the host while no workload runs."""
+    idle_power_watts: float
+    cpu_power_watts: float
+    ram_power_watts: float
+    window_seconds: float
+    # Meter backend that measured it; a baseline only applies to readings of the same meter
+    energy_meter: str
+    # Unix timestamp
+    measured_at: float
+
+    @property
+    def age_seconds(self) -> float:
+        return max(time.time() - self.measured_at, 0.0)
+
+    def is_fresh(self, ttl_seconds: float = CALIBRATION_TTL_SECS) -> bool:
+        return self.age_seconds <= ttl_seconds
+
+
+# (file mtime_ns, baseline) of the last read, so every experiment does not re-parse the file
+_cached: tuple[int, IdleBaseline] | None = None
+
+
+def load_baseline() -> IdleBaseline | None:
+    """Returns the last saved baseline, fresh or not, or None if there is none."""
+    global _cached
+    try:
+        mtime_ns = os.stat(CALIBRATION_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _cached is not None and _cached[0] == mtime_ns:
+        return _cached[1]
+    try:
+        with open(CALIBRATION_FILE) as f:
+            baseline = IdleBaseline(**json.load(f))
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable calibration file {CALIBRATION_FILE}: {e}")
+        return None
+    _cached = (mtime_ns, baseline)
+    return baseline
+
+
+def save_baseline(baseline: IdleBaseline):
+    directory = os.path.dirname(os.path.abspath(CALIBRATION_FILE))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{CALIBRATION_FILE}.{uuid.uuid4().hex[:12]}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(asdict(baseline), f)
+    # Atomic, so experiments in other worker processes never read a partial file
+    os.replace(tmp_path, CALIBRATION_FILE)
+
+
+def measure_idle_baseline(window_seconds: float = CALIBRATION_WINDOW_SECS) -> IdleBaseline:
+    """
+    Measures the host's idle and background power by running the energy meter
+    over `window_seconds` of sleep. Blocking: run it in a worker.
+    """
+    meter = get_energy_meter()
+    meter.start("thesis_calibration")
+    time.sleep(window_seconds)
+    reading = meter.stop()
+
+    duration = reading.duration if reading.duration > 0 else window_seconds
+    baseline = IdleBaseline(
+        idle_power_watts=reading.energy_kwh * JOULES_PER_KWH / duration,
+        cpu_power_watts=reading.cpu_energy_kwh * JOULES_PER_KWH / duration,
+        ram_power_watts=reading.ram_energy_kwh * JOULES_PER_KWH / duration,
+        window_seconds=duration,
+        energy_meter=meter.name,
+        measured_at=time.time(),
+    )
+    logger.info(f"Idle baseline measured with {meter.name}: {baseline.idle_power_watts:.2f} W over {duration:.1f} s")
+    return baseline
+
+
+def calibrate(window_seconds: float = CALIBRATION_WINDOW_SECS) -> dict:
+    """Worker-process entry point: measures and saves a new baseline."""
+    baseline = measure_idle_baseline(window_seconds)
+    save_baseline(baseline)
+    return asdict(baseline)
+
+
+def get_idle_baseline(meter_name: str) -> IdleBaseline:
+    """
+    Returns a fresh baseline for `meter_name`, measuring (and saving) a new one
+    first if the saved one is missing, stale or from another meter.
+    """
+    baseline = load_baseline()
+    if baseline is None or not baseline.is_fresh() or baseline.energy_meter != meter_name:
+        logger.info("No fresh idle baseline, calibrating before the experiment")
+        baseline = measure_idle_baseline()
+        save_baseline(baseline)
+    return baseline
+
+
+@dataclass
+class NetEnergy:
+    # Gross reading minus what the host would have drawn idle over the same duration;
+    # negative when the run drew less than the baseline
+    delta_kwh: float
+    # The difference floored at zero, and emissions scaled by the same factor as energy
+    energy_kwh: float
+    emissions_kg: float
+    # The difference is within the meter's resolution: the workload's own energy was not resolved
+    below_resolution: bool
+
+
+def net_energy(reading: EnergyReading, baseline: IdleBaseline, resolution_joules: float = 0.0) -> NetEnergy:
+    """Workload-attributable energy and emissions of a reading."""
+    idle_kwh = baseline.idle_power_watts * reading.duration / JOULES_PER_KWH
+    delta_kwh = reading.energy_kwh - idle_kwh
+    net_kwh = max(delta_kwh, 0.0)
+    net_emissions = reading.emissions_kg * net_kwh / reading.energy_kwh if reading.energy_kwh > 0 else 0.0
+    return NetEnergy(
+        delta_kwh=delta_kwh,
+        energy_kwh=net_kwh,
+        emissions_kg=net_emissions,
+        below_resolution=delta_kwh * JOULES_PER_KWH <= resolution_joules,
+    )
+
+
+async def calibration_loop(interval_seconds: float = CALIBRATION_INTERVAL_SECS):
+    """
+    Re-calibrates every `interval_seconds` by queueing a calibration job, so it
+    never overlaps an experiment when JOB_WORKERS is 1. Started from the app lifespan.
+    """
+    while True:
+        baseline = load_baseline()
+        if baseline is None or baseline.age_seconds >= interval_seconds:
+            submit_calibration()
+            wait = interval_seconds
+        else:
+            wait = interval_seconds - baseline.age_seconds
+        await asyncio.sleep(wait)
+
+
+def submit_calibration(window_seconds: float = CALIBRATION_WINDOW_SECS) -> Job:
+    async def runner(ctx: JobContext):
+        result = await ctx.run_in_worker(calibrate, window_seconds)
+        await ctx.step_done()
+        return result
+
+    return job_manager.submit("calibration", runner)
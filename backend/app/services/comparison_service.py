@@ -0,0 +1,206 @@
+import os
+import random
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+from dotenv import load_dotenv
+
+from backend.app.models.enums import EngineType, TrialOrder
+from backend.app.services.dataset_cache import load_dataset_arrays
+from backend.app.services.energy_meter import JOULES_PER_KWH
+from backend.app.services.experiment_service import energy_basis, measure_experiment, run_energy_kwh
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+COMPARE_TRIALS = int(os.getenv("COMPARE_TRIALS", "5"))
+COMPARE_BOOTSTRAP_SAMPLES = int(os.getenv("COMPARE_BOOTSTRAP_SAMPLES", "2000"))
+COMPARE_CONFIDENCE = float(os.getenv("COMPARE_CONFIDENCE", "0.95"))
+
+
+@dataclass
+class ComparisonConfig:
+    precision: str
+    batch_size: int | None = None
+    engine: str = EngineType.EAGER.value
+
+    @property
+    def label(self) -> str:
+        label = self.precision if self.batch_size is None else f"{self.precision}@{self.batch_size}"
+        return label if self.engine == EngineType.EAGER.value else f"{self.engine}:{label}"
+
+
+@dataclass
+class ComparisonSpec:
+    """
+    A comparison of several configurations on one dataset, run in one worker process.
+    The first configuration is the baseline the others are compared against.
+    Plain values only, so it can be pickled into the job worker pool.
+    """
+    dataset_id: str
+    filepath: str
+    ai_model: str
+    configs: list[ComparisonConfig]
+    trials: int = COMPARE_TRIALS
+    order: str = TrialOrder.INTERLEAVED.value
+    label_column: str | None = None
+    confidence: float = COMPARE_CONFIDENCE
+    seed: int | None = None
+    bootstrap_samples: int = COMPARE_BOOTSTRAP_SAMPLES
+
+
+def trial_schedule(num_configs: int, trials: int, order: TrialOrder, rng: random.Random) -> list[int]:
+    """
+    Config indices in run order: `trials` rounds, each running every configuration once.
+    Interleaving spreads thermal drift and turbo state evenly over the configurations
+    instead of favouring whichever runs last.
+    """
+    schedule = []
+    for _ in range(trials):
+        round_order = list(range(num_configs))
+        if TrialOrder(order) == TrialOrder.RANDOMIZED:
+            rng.shuffle(round_order)
+        schedule.extend(round_order)
+    return schedule
+
+
+def bootstrap_saving(
+    baseline: np.ndarray,
+    candidate: np.ndarray,
+    confidence: float,
+    samples: int,
+    rng: np.random.Generator
+) -> dict:
+    """
+    Percentage saving of `candidate` over `baseline` (positive = candidate uses less),
+    with a percentile bootstrap confidence interval over the trials of each side.
+    Significant when the interval excludes zero. A side whose trials are all zero or
+    all identical (e.g. below the meter's resolution) gives a degenerate interval, so
+    it is never significant.
+    """
+    baseline_mean = float(baseline.mean())
+    if baseline_mean <= 0:
+        return {"percentage": None, "ci_low": None, "ci_high": None, "significant": False}
+    degenerate = any(not side.any() or np.ptp(side) == 0 for side in (baseline, candidate))
+
+    baseline_means = baseline[rng.integers(0, len(baseline), (samples, len(baseline)))].mean(axis=1)
+    candidate_means = candidate[rng.integers(0, len(candidate), (samples, len(candidate)))].mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        savings = (baseline_means - candidate_means) / baseline_means * 100
+    savings = savings[np.isfinite(savings)]
+
+    tail = (1 - confidence) / 2 * 100
+    ci_low, ci_high = np.percentile(savings, [tail, 100 - tail])
+    return {
+        "percentage": round((baseline_mean - float(candidate.mean())) / baseline_mean * 100, 2),
+        "ci_low": round(float(ci_low), 2),
+        "ci_high": round(float(ci_high), 2),
+        "significant": not degenerate and bool(ci_low > 0 or ci_high < 0),
+    }
+
+
+def _energy_per_pass_kwh(measurement: dict, basis: str) -> float:
+    distribution = measurement["latency_distribution"]
+    passes = distribution["warmup_iterations"] + distribution["iterations"]
+    return run_energy_kwh(measurement, basis) / max(passes, 1)
+
+
+def run_comparison(spec: ComparisonSpec) -> dict:
+    """
+    Worker-process entry point: runs `spec.trials` trials of every configuration in
+    interleaved or randomized order and summarizes them.
+    The dataset is loaded, and the whole-dataset input tensor prepared, once for all
+    trials; every configuration is built and scored before the first trial.
+    Returns every trial's measurement (to be saved as Experiment rows) plus per-config
+    means and bootstrap confidence intervals on the savings over the first config.
+    """
+    # Imported here so spawned workers do not pull the factory in at import time
+    from backend.app.services.model_factory import ModelFactory
+
+    logger.info(f"Starting comparison of {[c.label for c in spec.configs]} for Dataset ID {spec.dataset_id}")
+    data = load_dataset_arrays(spec.filepath, spec.ai_model, spec.label_column)
+    model_service = ModelFactory.get_model_service(spec.ai_model)
+    model_service.check_input(data)
+    # One prepared tensor per input layout (e.g. CHANNELS_LAST needs its own);
+    # batched configs stream from the memory-mapped matrix instead
+    inputs = {}
+    for config in spec.configs:
+        variant = model_service.input_variant(config.precision)
+        if config.batch_size is None and variant not in inputs:
+            inputs[variant] = model_service.prepare_input(data.features, config.precision)
+
+    # Warm every configuration before the first trial: its model is built (or loaded)
+    # and scored in one untimed, unmetered pass. Accuracy is the same every trial, and
+    # no trial pays for scoring or a cold model, so the trials stay exchangeable
+    scores = []
+    for config in spec.configs:
+        model = model_service.get_model(config.precision, data, config.engine)
+        scores.append(model_service.evaluate(
+            model, data, config.batch_size,
+            inputs.get(model_service.input_variant(config.precision)), config.precision
+        ))
+
+    schedule = trial_schedule(len(spec.configs), spec.trials, spec.order, random.Random(spec.seed))
+    trials: list[list[dict]] = [[] for _ in spec.configs]
+    for index in schedule:
+        config = spec.configs[index]
+        measurement = measure_experiment(
+            data, model_service, config.precision,
+            project_name=f"thesis_{spec.ai_model}_{config.label}",
+            batch_size=config.batch_size,
+            # Every engine gets the same prepared tensor
+            input_tensor=inputs.get(model_service.input_variant(config.precision)),
+            score=False,
+            engine=config.engine,
+        )
+        measurement.update(scores[index])
+        trials[index].append(measurement)
+
+    rng = np.random.default_rng(spec.seed)
+    # One basis for every trial of every configuration: net only if all of them have
+    # usable net energy, so no configuration is compared on a floored net figure
+    basis = energy_basis([m for runs in trials for m in runs])
+    energy = [np.array([_energy_per_pass_kwh(m, basis) for m in runs]) for runs in trials]
+    latency = [np.array([m["latency_seconds"] for m in runs]) for runs in trials]
+
+    summaries = []
+    for config, runs, config_energy, config_latency in zip(spec.configs, trials, energy, latency):
+        summaries.append({
+            "label": config.label,
+            "precision": config.precision,
+            "engine": config.engine,
+            "batch_size": config.batch_size,
+            "trials": len(runs),
+            "latency_mean_seconds": float(config_latency.mean()),
+            "latency_stddev_seconds": float(config_latency.std(ddof=1)) if len(runs) > 1 else 0.0,
+            "energy_per_pass_kwh": float(config_energy.mean()),
+            "energy_per_pass_joules": float(config_energy.mean()) * JOULES_PER_KWH,
+            "accuracy": runs[0]["accuracy"],
+        })
+
+    savings = []
+    baseline = spec.configs[0]
+    for i in range(1, len(spec.configs)):
+        accuracy_loss = None
+        if trials[0][0]["accuracy"] is not None and trials[i][0]["accuracy"] is not None:
+            accuracy_loss = round(trials[0][0]["accuracy"] - trials[i][0]["accuracy"], 4)
+        savings.append({
+            "baseline": baseline.label,
+            "candidate": spec.configs[i].label,
+            "energy": bootstrap_saving(energy[0], energy[i], spec.confidence, spec.bootstrap_samples, rng),
+            "latency": bootstrap_saving(latency[0], latency[i], spec.confidence, spec.bootstrap_samples, rng),
+            "accuracy_loss": accuracy_loss,
+        })
+
+    return {
+        "order": TrialOrder(spec.order).value,
+        "trials_per_config": spec.trials,
+        "confidence": spec.confidence,
+        "energy_basis": basis,
+        "schedule": [spec.configs[i].label for i in schedule],
+        "configs": summaries,
+        "savings": savings,
+        "measurements": trials,
+    }
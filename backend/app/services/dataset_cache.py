@@ -0,0 +1,440 @@
+import os
+import re
+import json
+import uuid
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+from backend.app.models.enums import ModelType
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes so stale caches are rebuilt
+CACHE_VERSION = 3
+CSV_CHUNK_ROWS = int(os.getenv("DATASET_CSV_CHUNK_ROWS", "50000"))
+# Rows read to check a file's columns before accepting it
+DATASET_SNIFF_ROWS = int(os.getenv("DATASET_SNIFF_ROWS", "100"))
+CNN_INPUT_COLUMNS = 784
+# Features per row each model takes (MaintenanceMLP: 512, SimpleCNN: 28x28 pixels)
+MODEL_INPUT_FEATURES = {
+    ModelType.MLP: 512,
+    ModelType.CNN: CNN_INPUT_COLUMNS,
+}
+# Used when a dataset does not name its label column explicitly
+DEFAULT_LABEL_COLUMN = os.getenv("DEFAULT_LABEL_COLUMN", "label")
+
+
+@dataclass
+class DatasetArrays:
+    """
+    Numeric view of a dataset, backed by memory-mapped .npy files.
+    features: float32 matrix of shape (rows, columns), label column removed.
+    labels: int64 vector of shape (rows,), or None if the dataset has no label column.
+    """
+    features: np.ndarray
+    labels: np.ndarray | None
+    label_column: str | None = None
+
+    @property
+    def num_samples(self) -> int:
+        return self.features.shape[0]
+
+    def head(self, rows: int) -> "DatasetArrays":
+        """The first `rows` rows, as views of the same maps. Raises ValueError if there are fewer."""
+        if rows <= 0 or rows > self.num_samples:
+            raise ValueError(f"Cannot take {rows} rows of a dataset with {self.num_samples}")
+        labels = self.labels[:rows] if self.labels is not None else None
+        return DatasetArrays(self.features[:rows], labels, self.label_column)
+
+
+CACHE_FILE_SUFFIXES = (".features.npy", ".labels.npy", ".cache.json")
+
+
+def _cache_paths(filepath: str, ai_model: ModelType, label_column: str | None) -> tuple[Path, Path, Path]:
+    """
+    Cache files of one (file, model, label column) view of a dataset. Deduplicated
+    blobs are shared by datasets with different models or label columns, so each
+    view gets its own files instead of evicting the others on every load.
+    """
+    base = Path(filepath)
+    variant = hashlib.sha256(json.dumps([ModelType(ai_model).value, label_column]).encode()).hexdigest()[:12]
+    name = f"{base.name}.{ModelType(ai_model).value.lower()}-{variant}"
+    return tuple(base.with_name(name + suffix) for suffix in CACHE_FILE_SUFFIXES)
+
+
+def _source_signature(filepath: str, ai_model: ModelType, label_column: str | None) -> dict:
+    stat = os.stat(filepath)
+    return {
+        "version": CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "ai_model": ModelType(ai_model).value,
+        "requested_label_column": label_column,
+    }
+
+
+def _detect_label_column(numeric_columns: list[str], ai_model: ModelType, label_column: str | None = None) -> str | None:
+    """
+    An explicitly configured label column must exist.
+    Otherwise a column named DEFAULT_LABEL_COLUMN ('label') is the label, and
+    for CNN datasets with 785 numeric columns the first one is (MNIST CSV layout).
+    """
+    if label_column is not None:
+        if label_column not in numeric_columns:
+            raise ValueError(f"Label column '{label_column}' not found among the numeric columns")
+        return label_column
+    for column in numeric_columns:
+        if str(column).strip().lower() == DEFAULT_LABEL_COLUMN.lower():
+            return column
+    if ai_model == ModelType.CNN and len(numeric_columns) == CNN_INPUT_COLUMNS + 1:
+        return numeric_columns[0]
+    return None
+
+
+def check_feature_count(
+    ai_model: ModelType,
+    feature_count: int,
+    label_column: str | None = None,
+    ignored_columns: list[str] = ()
+):
+    """Raises ValueError if rows of `feature_count` features cannot feed the model."""
+    expected = MODEL_INPUT_FEATURES[ModelType(ai_model)]
+    if feature_count != expected:
+        details = [f"label column '{label_column}'" if label_column is not None else "no label column"]
+        if ignored_columns:
+            details.append(f"non-numeric columns ignored: {[str(c) for c in ignored_columns[:5]]}")
+        raise ValueError(
+            f"{ModelType(ai_model).value} expects {expected} numeric feature columns, "
+            f"the file has {feature_count} ({'; '.join(details)})"
+        )
+
+
+def sniff_dataset(filepath: str, ai_model: ModelType, label_column: str | None = None) -> dict:
+    """
+    Checks the columns of a CSV against the model from its first DATASET_SNIFF_ROWS
+    rows (of a .npy, from its header), so a file of the wrong shape is rejected
+    without reading all of it.
+    Raises ValueError.
+    """
+    if is_npy_dataset(filepath):
+        columns = _npy_columns(_open_npy(filepath))
+        detected = _detect_label_column(columns, ai_model, label_column)
+        feature_count = len(columns) - (detected is not None)
+        check_feature_count(ai_model, feature_count, detected)
+        return {"columns": len(columns), "feature_columns": feature_count, "label_column": detected}
+
+    import pandas as pd
+
+    head = pd.read_csv(filepath, nrows=DATASET_SNIFF_ROWS)
+    numeric_columns = list(head.select_dtypes(include=[np.number]).columns)
+    detected = _detect_label_column(numeric_columns, ai_model, label_column)
+    feature_count = len(numeric_columns) - (detected is not None)
+    ignored = [c for c in head.columns if c not in numeric_columns]
+    check_feature_count(ai_model, feature_count, detected, ignored)
+    return {"columns": len(head.columns), "feature_columns": feature_count, "label_column": detected}
+
+
+class _ColumnStats:
+    """Per-column count, missing values, min, max and sum, accumulated chunk by chunk."""
+
+    def __init__(self, width: int):
+        self.count = np.zeros(width, dtype=np.int64)
+        self.nulls = np.zeros(width, dtype=np.int64)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        self.sum = np.zeros(width)
+
+    def add(self, values: np.ndarray):
+        if not len(values):
+            return
+        missing = np.isnan(values).sum(axis=0)
+        self.nulls += missing
+        self.count += len(values) - missing
+        # fmin/fmax skip NaN
+        self.min = np.fmin(self.min, np.fmin.reduce(values, axis=0))
+        self.max = np.fmax(self.max, np.fmax.reduce(values, axis=0))
+        self.sum += np.nansum(values, axis=0, dtype=np.float64)
+
+    def column(self, i: int) -> dict:
+        if not self.count[i]:
+            return {"min": None, "max": None, "mean": None, "nulls": int(self.nulls[i])}
+        return {
+            "min": float(self.min[i]),
+            "max": float(self.max[i]),
+            "mean": float(self.sum[i] / self.count[i]),
+            "nulls": int(self.nulls[i]),
+        }
+
+
+def _merge_dtype(seen: np.dtype | None, dtype: np.dtype) -> np.dtype:
+    # pandas infers dtypes per chunk: int becomes float once a value is missing, anything becomes object on text
+    if seen is None or seen == dtype:
+        return dtype
+    if seen.kind in "biuf" and dtype.kind in "biuf":
+        return np.promote_types(seen, dtype)
+    return np.dtype(object)
+
+
+def _write_npy_from_raw(raw_path: Path, npy_path: Path, dtype: np.dtype, shape: tuple):
+    """Prepends an .npy header to a raw little-endian buffer without loading it into memory."""
+    with open(npy_path, "wb") as out, open(raw_path, "rb") as raw:
+        np.lib.format.write_array_header_1_0(
+            out, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape}
+        )
+        for chunk in iter(lambda: raw.read(8 * 1024 * 1024), b""):
+            out.write(chunk)
+
+
+def is_npy_dataset(filepath: str) -> bool:
+    return Path(filepath).suffix.lower() == ".npy"
+
+
+def _open_npy(filepath: str) -> np.ndarray:
+    """Maps a .npy dataset read-only. Raises ValueError unless it is a numeric matrix."""
+    # No pickles: a dataset is data, never code
+    array = np.load(filepath, mmap_mode="r", allow_pickle=False)
+    if array.ndim != 2:
+        raise ValueError(f"A .npy dataset must be a 2-D matrix (rows x columns), got shape {array.shape}")
+    if array.dtype.kind not in "biuf":
+        raise ValueError(f"A .npy dataset must be numeric, got dtype {array.dtype}")
+    return array
+
+
+def _npy_columns(array: np.ndarray) -> list[str]:
+    # .npy files have no header: columns are named by position, so label_column="0" is the first one
+    return [str(i) for i in range(array.shape[1])]
+
+
+def _profile(
+    rows: int,
+    dtypes: dict,
+    feature_columns: list,
+    detected,
+    feature_stats: _ColumnStats,
+    label_stats: _ColumnStats
+) -> dict:
+    stats = {str(c): feature_stats.column(i) for i, c in enumerate(feature_columns)}
+    if detected is not None:
+        stats[str(detected)] = label_stats.column(0)
+    return {
+        "rows": rows,
+        "columns": len(dtypes),
+        "feature_columns": len(feature_columns),
+        "label_column": None if detected is None else str(detected),
+        # Non-numeric columns are not fed to the model
+        "ignored_columns": [str(c) for c in dtypes if str(c) not in stats],
+        "dtypes": {str(c): str(dtype) for c, dtype in dtypes.items()},
+        "stats": stats,
+    }
+
+
+def _write_labels(labels_path: Path, suffix: str, label_chunks: list[np.ndarray] | None):
+    if label_chunks is None:
+        labels_path.unlink(missing_ok=True)
+        return
+    tmp_labels = labels_path.with_name(labels_path.name + suffix)
+    with open(tmp_labels, "wb") as f:
+        np.save(f, np.concatenate(label_chunks) if label_chunks else np.empty(0, dtype=np.int64))
+    os.replace(tmp_labels, labels_path)
+
+
+def _convert_csv(filepath: str, ai_model: ModelType, label_column: str | None, suffix: str) -> dict:
+    # Imported here: only uploads and cache misses need pandas
+    import pandas as pd
+
+    features_path, labels_path, _ = _cache_paths(filepath, ai_model, label_column)
+    raw_path = features_path.with_name(features_path.name + suffix + ".raw")
+    rows = 0
+    feature_columns: list[str] | None = None
+    detected = None
+    label_chunks = []
+    dtypes: dict[str, np.dtype] = {}
+    feature_stats = label_stats = None
+    try:
+        with open(raw_path, "wb") as raw:
+            for chunk in pd.read_csv(filepath, chunksize=CSV_CHUNK_ROWS):
+                if feature_columns is None:
+                    numeric_columns = list(chunk.select_dtypes(include=[np.number]).columns)
+                    detected = _detect_label_column(numeric_columns, ai_model, label_column)
+                    feature_columns = [c for c in numeric_columns if c != detected]
+                    ignored = [c for c in chunk.columns if c not in numeric_columns]
+                    check_feature_count(ai_model, len(feature_columns), detected, ignored)
+                    feature_stats = _ColumnStats(len(feature_columns))
+                    label_stats = _ColumnStats(1)
+
+                for column, dtype in chunk.dtypes.items():
+                    dtypes[column] = _merge_dtype(dtypes.get(column), dtype)
+                used = feature_columns + ([detected] if detected is not None else [])
+                non_numeric = [str(c) for c in used if dtypes[c].kind not in "biuf"]
+                if non_numeric:
+                    raise ValueError(f"Non-numeric values in column(s) {non_numeric[:5]} after row {rows}")
+
+                values = chunk[feature_columns].to_numpy(dtype="<f4")
+                feature_stats.add(values)
+                raw.write(np.ascontiguousarray(values).tobytes())
+                if detected is not None:
+                    labels = chunk[detected].to_numpy(dtype=np.float64)
+                    label_stats.add(labels[:, None])
+                    if np.isnan(labels).any():
+                        raise ValueError(f"Label column '{detected}' has missing values after row {rows}")
+                    label_chunks.append(labels.astype(np.int64))
+                rows += len(chunk)
+        if feature_columns is None:
+            raise ValueError("The file has a header but no rows")
+
+        tmp_features = features_path.with_name(features_path.name + suffix)
+        _write_npy_from_raw(raw_path, tmp_features, np.dtype("<f4"), (rows, len(feature_columns)))
+        os.replace(tmp_features, features_path)
+        _write_labels(labels_path, suffix, label_chunks if detected is not None else None)
+    finally:
+        raw_path.unlink(missing_ok=True)
+
+    return {
+        "rows": rows,
+        "feature_columns": [str(c) for c in feature_columns],
+        "label_column": None if detected is None else str(detected),
+        "profile": _profile(rows, dtypes, feature_columns, detected, feature_stats, label_stats),
+    }
+
+
+def _convert_npy(filepath: str, ai_model: ModelType, label_column: str | None, suffix: str) -> dict:
+    """
+    A .npy dataset is already binary. A float32 C-order matrix without a label
+    column is used in place (features_file points at it); otherwise the label
+    column is split out and the features converted, chunk by chunk.
+    """
+    features_path, labels_path, _ = _cache_paths(filepath, ai_model, label_column)
+    source = _open_npy(filepath)
+    rows, width = source.shape
+    columns = _npy_columns(source)
+    detected = _detect_label_column(columns, ai_model, label_column)
+    feature_index = [i for i, c in enumerate(columns) if c != detected]
+    check_feature_count(ai_model, len(feature_index), detected)
+    in_place = detected is None and source.dtype == np.dtype("<f4") and source.flags.c_contiguous
+
+    feature_stats = _ColumnStats(len(feature_index))
+    label_stats = _ColumnStats(1)
+    label_chunks = [] if detected is not None else None
+    raw_path = features_path.with_name(features_path.name + suffix + ".raw")
+    try:
+        with open(raw_path, "wb") if not in_place else open(os.devnull, "wb") as raw:
+            for start in range(0, rows, CSV_CHUNK_ROWS):
+                block = np.asarray(source[start:start + CSV_CHUNK_ROWS])
+                values = block if in_place else block[:, feature_index].astype("<f4")
+                feature_stats.add(values)
+                if not in_place:
+                    raw.write(np.ascontiguousarray(values).tobytes())
+                if detected is not None:
+                    labels = block[:, int(detected)].astype(np.float64)
+                    label_stats.add(labels[:, None])
+                    if np.isnan(labels).any():
+                        raise ValueError(f"Label column '{detected}' has missing values after row {start}")
+                    label_chunks.append(labels.astype(np.int64))
+
+        if in_place:
+            features_path.unlink(missing_ok=True)
+        else:
+            tmp_features = features_path.with_name(features_path.name + suffix)
+            _write_npy_from_raw(raw_path, tmp_features, np.dtype("<f4"), (rows, len(feature_index)))
+            os.replace(tmp_features, features_path)
+        _write_labels(labels_path, suffix, label_chunks)
+    finally:
+        raw_path.unlink(missing_ok=True)
+
+    dtypes = {column: source.dtype for column in columns}
+    return {
+        "rows": rows,
+        "feature_columns": [columns[i] for i in feature_index],
+        "label_column": detected,
+        "features_file": str(filepath) if in_place else None,
+        "profile": _profile(rows, dtypes, [columns[i] for i in feature_index], detected, feature_stats, label_stats),
+    }
+
+
+def build_dataset_cache(filepath: str, ai_model: ModelType, label_column: str | None = None) -> dict:
+    """
+    Converts a CSV dataset into float32 feature and int64 label .npy files
+    stored next to the CSV. The CSV is parsed once, chunk by chunk, so
+    datasets larger than memory can be converted. The same pass profiles the
+    file (row and column counts, dtypes, per-column min/max/mean and missing
+    values) and checks it fits the model; raises ValueError if it does not.
+    .npy datasets go through the same steps without parsing (see _convert_npy).
+    """
+    _, _, meta_path = _cache_paths(filepath, ai_model, label_column)
+    signature = _source_signature(filepath, ai_model, label_column)
+    # Unique per build: concurrent builds of a shared blob must not share temp files
+    suffix = f".{uuid.uuid4().hex[:12]}.tmp"
+
+    logger.info(f"Building binary cache for dataset '{filepath}'")
+    convert = _convert_npy if is_npy_dataset(filepath) else _convert_csv
+    meta = {**signature, **convert(filepath, ai_model, label_column, suffix)}
+    tmp_meta = meta_path.with_name(meta_path.name + suffix)
+    tmp_meta.write_text(json.dumps(meta))
+    os.replace(tmp_meta, meta_path)
+
+    logger.info(f"Binary cache built for '{filepath}': {meta['rows']} rows, {len(meta['feature_columns'])} features")
+    return meta
+
+
+def dataset_profile_values(meta: dict) -> dict:
+    """The Dataset columns filled from a cache build's profile."""
+    profile = meta["profile"]
+    return {
+        "num_rows": profile["rows"],
+        "num_columns": profile["columns"],
+        "num_features": profile["feature_columns"],
+        "profile": profile,
+        "validation_error": None,
+    }
+
+
+def _read_valid_meta(filepath: str, ai_model: ModelType, label_column: str | None) -> dict | None:
+    features_path, labels_path, meta_path = _cache_paths(filepath, ai_model, label_column)
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+    signature = _source_signature(filepath, ai_model, label_column)
+    if any(meta.get(k) != v for k, v in signature.items()):
+        return None
+    if meta.get("features_file") is None and not features_path.exists():
+        return None
+    if meta["label_column"] is not None and not labels_path.exists():
+        return None
+    return meta
+
+
+def load_dataset_arrays(filepath: str, ai_model: ModelType, label_column: str | None = None) -> DatasetArrays:
+    """
+    Returns the dataset as memory-mapped arrays, converting the file on first use
+    and rebuilding the cache whenever the source file, model type or label column changed.
+    """
+    meta = _read_valid_meta(filepath, ai_model, label_column)
+    if meta is None:
+        meta = build_dataset_cache(filepath, ai_model, label_column)
+
+    features_path, labels_path, _ = _cache_paths(filepath, ai_model, label_column)
+    # Copy-on-write maps are writable, so torch.from_numpy can wrap them without a copy
+    features = np.load(meta.get("features_file") or features_path, mmap_mode="c")
+    labels = np.load(labels_path, mmap_mode="c") if meta["label_column"] is not None else None
+    return DatasetArrays(features=features, labels=labels, label_column=meta["label_column"])
+
+
+def invalidate_dataset_cache(filepath: str):
+    """Removes the cache files of every view of the file (and of the older, unkeyed layout)."""
+    base = Path(filepath)
+    if not base.parent.exists():
+        return
+    pattern = re.compile(
+        re.escape(base.name) + r"(\.[a-z0-9_]+-[0-9a-f]{12})?(" + "|".join(map(re.escape, CACHE_FILE_SUFFIXES)) + ")"
+    )
+    for path in base.parent.iterdir():
+        if pattern.fullmatch(path.name):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,254 @@
+import os
+import time
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# codecarbon | rapl | fake
+ENERGY_METER = os.getenv("ENERGY_METER", "codecarbon").lower()
+# Used by meters that only measure energy (RAPL, fake); CodeCarbon uses its own regional data
+CARBON_INTENSITY_KG_PER_KWH = float(os.getenv("CARBON_INTENSITY_KG_PER_KWH", "0.475"))
+CODECARBON_MEASURE_POWER_SECS = float(os.getenv("CODECARBON_MEASURE_POWER_SECS", "0.1"))
+RAPL_ROOT = Path(os.getenv("RAPL_ROOT", "/sys/class/powercap"))
+FAKE_METER_CPU_WATTS = float(os.getenv("FAKE_METER_CPU_WATTS", "40"))
+FAKE_METER_RAM_WATTS = float(os.getenv("FAKE_METER_RAM_WATTS", "5"))
+
+JOULES_PER_KWH = 3.6e6
+
+
+@dataclass
+class EnergyReading:
+    energy_kwh: float
+    cpu_energy_kwh: float
+    ram_energy_kwh: float
+    emissions_kg: float
+    duration: float
+
+
+class EnergyMeter(ABC):
+    """
+    Measures the energy used between start() and stop().
+    Implementations must keep start()/stop() cheap: they bracket the measured work.
+    """
+
+    name: str
+    # Smallest energy difference (J) the meter resolves; net energy within it is noise
+    resolution_joules: float = 1e-6
+
+    @abstractmethod
+    def start(self, project_name: str = "thesis"):
+        pass
+
+    @abstractmethod
+    def stop(self) -> EnergyReading:
+        pass
+
+    def cumulative_joules(self) -> tuple[float, float] | None:
+        """
+        CPU and RAM energy (J) used since start(), for power tracing while the meter
+        runs. Must be safe to call from another thread. None if unsupported.
+        """
+        return None
+
+
+class CodeCarbonMeter(EnergyMeter):
+    """CodeCarbon EmissionsTracker, sampling power in a background thread."""
+
+    name = "codecarbon"
+
+    def __init__(self, measure_power_secs: float = CODECARBON_MEASURE_POWER_SECS):
+        self.measure_power_secs = measure_power_secs
+        # Power is estimated once per interval, so about 1 W over one interval is not resolved
+        self.resolution_joules = measure_power_secs
+        self._tracker = None
+
+    def start(self, project_name: str = "thesis"):
+        # Imported lazily: hardware detection makes the import itself slow
+        from codecarbon import EmissionsTracker
+
+        self._tracker = EmissionsTracker(
+            project_name=project_name,
+            measure_power_secs=self.measure_power_secs,
+            save_to_file=False
+        )
+        self._tracker.start()
+
+    def cumulative_joules(self) -> tuple[float, float] | None:
+        # The tracker's running totals are private and only advance every
+        # measure_power_secs; give up on tracing if a codecarbon release renames them
+        tracker = self._tracker
+        cpu_kwh = getattr(getattr(tracker, "_total_cpu_energy", None), "kWh", None)
+        ram_kwh = getattr(getattr(tracker, "_total_ram_energy", None), "kWh", None)
+        if cpu_kwh is None or ram_kwh is None:
+            return None
+        return cpu_kwh * JOULES_PER_KWH, ram_kwh * JOULES_PER_KWH
+
+    def stop(self) -> EnergyReading:
+        self._tracker.stop()
+        data = self._tracker.final_emissions_data
+        self._tracker = None
+        return EnergyReading(
+            energy_kwh=data.energy_consumed,
+            cpu_energy_kwh=data.cpu_energy,
+            ram_energy_kwh=data.ram_energy,
+            emissions_kg=data.emissions,
+            duration=data.duration,
+        )
+
+
+@dataclass
+class _RaplZone:
+    path: Path
+    name: str
+    max_energy_uj: int
+    is_dram: bool
+
+    def read_uj(self) -> int:
+        return int((self.path / "energy_uj").read_text())
+
+
+class RaplMeter(EnergyMeter):
+    """
+    Reads the Intel/AMD RAPL energy counters under /sys/class/powercap directly:
+    one read per zone at start and one at stop, no polling thread.
+
+    Package zones count as CPU energy and 'dram' subzones as RAM energy; 'psys'
+    (whole platform) is skipped since it overlaps the others. Counters wrap at
+    max_energy_range_uj, which is corrected for once per run, so a single run must
+    stay shorter than one wrap period (tens of minutes at typical package power).
+    """
+
+    name = "rapl"
+    # Counters are in µJ, but the hardware energy unit is coarser (15-61 µJ on common CPUs)
+    resolution_joules = 1e-4
+
+    def __init__(self, root: Path = RAPL_ROOT, carbon_intensity: float = CARBON_INTENSITY_KG_PER_KWH):
+        self.carbon_intensity = carbon_intensity
+        self.zones = self._discover(root)
+        if not self.zones:
+            raise RuntimeError(f"No readable RAPL zones found under {root}")
+        self._start_uj: list[int] = []
+        self._start_time = 0.0
+
+    @staticmethod
+    def _discover(root: Path) -> list[_RaplZone]:
+        zones = []
+        for path in sorted(root.glob("intel-rapl:*")):
+            try:
+                name = (path / "name").read_text().strip()
+                max_energy = int((path / "max_energy_range_uj").read_text())
+                (path / "energy_uj").read_text()
+            except (OSError, ValueError) as e:
+                # energy_uj is root-only on many kernels
+                logger.warning(f"Skipping RAPL zone {path}: {e}")
+                continue
+            # Top-level zones are intel-rapl:N, subzones intel-rapl:N:M
+            is_subzone = path.name.count(":") > 1
+            if name.startswith("psys"):
+                continue
+            if is_subzone and name != "dram":
+                # core/uncore are already included in their package
+                continue
+            zones.append(_RaplZone(path=path, name=name, max_energy_uj=max_energy, is_dram=name == "dram"))
+        return zones
+
+    def start(self, project_name: str = "thesis"):
+        self._start_time = time.perf_counter()
+        self._start_uj = [zone.read_uj() for zone in self.zones]
+
+    def _used_uj(self) -> tuple[int, int]:
+        cpu_uj = ram_uj = 0
+        for zone, start in zip(self.zones, self._start_uj):
+            delta = zone.read_uj() - start
+            if delta < 0:
+                # Counter wrapped around
+                delta += zone.max_energy_uj
+            if zone.is_dram:
+                ram_uj += delta
+            else:
+                cpu_uj += delta
+        return cpu_uj, ram_uj
+
+    def cumulative_joules(self) -> tuple[float, float] | None:
+        cpu_uj, ram_uj = self._used_uj()
+        return cpu_uj / 1e6, ram_uj / 1e6
+
+    def stop(self) -> EnergyReading:
+        cpu_uj, ram_uj = self._used_uj()
+        duration = time.perf_counter() - self._start_time
+
+        cpu_kwh = cpu_uj / 1e6 / JOULES_PER_KWH
+        ram_kwh = ram_uj / 1e6 / JOULES_PER_KWH
+        return EnergyReading(
+            energy_kwh=cpu_kwh + ram_kwh,
+            cpu_energy_kwh=cpu_kwh,
+            ram_energy_kwh=ram_kwh,
+            emissions_kg=(cpu_kwh + ram_kwh) * self.carbon_intensity,
+            duration=duration,
+        )
+
+
+class FakeMeter(EnergyMeter):
+    """
+    Deterministic meter for tests: constant power over the elapsed time.
+    Pass a fake `clock` to make durations (and so energy) fully reproducible.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        cpu_watts: float = FAKE_METER_CPU_WATTS,
+        ram_watts: float = FAKE_METER_RAM_WATTS,
+        carbon_intensity: float = CARBON_INTENSITY_KG_PER_KWH,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        self.cpu_watts = cpu_watts
+        self.ram_watts = ram_watts
+        self.carbon_intensity = carbon_intensity
+        self.clock = clock
+        self._start_time = 0.0
+
+    def start(self, project_name: str = "thesis"):
+        self._start_time = self.clock()
+
+    def cumulative_joules(self) -> tuple[float, float] | None:
+        elapsed = self.clock() - self._start_time
+        return self.cpu_watts * elapsed, self.ram_watts * elapsed
+
+    def stop(self) -> EnergyReading:
+        duration = self.clock() - self._start_time
+        cpu_kwh = self.cpu_watts * duration / JOULES_PER_KWH
+        ram_kwh = self.ram_watts * duration / JOULES_PER_KWH
+        return EnergyReading(
+            energy_kwh=cpu_kwh + ram_kwh,
+            cpu_energy_kwh=cpu_kwh,
+            ram_energy_kwh=ram_kwh,
+            emissions_kg=(cpu_kwh + ram_kwh) * self.carbon_intensity,
+            duration=duration,
+        )
+
+
+_METERS: dict[str, type[EnergyMeter]] = {
+    CodeCarbonMeter.name: CodeCarbonMeter,
+    RaplMeter.name: RaplMeter,
+    FakeMeter.name: FakeMeter,
+}
+
+
+def get_energy_meter(name: str | None = None) -> EnergyMeter:
+    """Returns a new meter of the configured backend (ENERGY_METER, default 'codecarbon')."""
+    name = (name or ENERGY_METER).lower()
+    try:
+        meter_cls = _METERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown energy meter: {name}. Choose one of {sorted(_METERS)}")
+    return meter_cls()
@@ -0,0 +1,163 @@
+import io
+import os
+import csv
+import enum
+import json
+import logging
+import importlib.util
+from datetime import datetime
+from typing import AsyncIterator
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from backend.app.database.db import async_session_maker
+from backend.app.models.datasets import Dataset
+from backend.app.models.enums import ExportFormat
+from backend.app.models.experiments import Experiment
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the cursor and written out at a time (one Parquet row group each)
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+EXPORT_PARQUET_COMPRESSION = os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")
+
+# Every experiment column, then the metadata of its dataset
+EXPORT_COLUMNS = (
+    *Experiment.__table__.columns,
+    Dataset.filename.label("dataset_filename"),
+    Dataset.ai_model.label("ai_model"),
+    Dataset.description.label("dataset_description"),
+    Dataset.label_column.label("dataset_label_column"),
+)
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def export_query(filters: list):
+    """Oldest first, so a nightly pull can resume from the last created_at it has."""
+    return (
+        select(*EXPORT_COLUMNS)
+        .join(Dataset, Dataset.id == Experiment.dataset_id)
+        .where(*filters)
+        .order_by(Experiment.created_at, Experiment.id)
+        .execution_options(yield_per=EXPORT_CHUNK_ROWS)
+    )
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+async def _row_chunks(filters: list) -> AsyncIterator[list]:
+    """
+    Rows in chunks of EXPORT_CHUNK_ROWS, read from a server-side cursor (a
+    streaming fetch on SQLite). Opens its own session: the response body is
+    produced after the request's dependencies have been torn down.
+    """
+    async with async_session_maker() as session:
+        result = await session.stream(export_query(filters))
+        async for rows in result.partitions():
+            yield rows
+
+
+async def stream_csv(filters: list) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in export_query([]).selected_columns])
+    async for rows in _row_chunks(filters):
+        for row in rows:
+            writer.writerow([value.isoformat() if isinstance(value, datetime) else _plain(value) for value in row])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # No rows: just the header
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(pa):
+    types = {bool: pa.bool_(), int: pa.int64(), float: pa.float64(), datetime: pa.timestamp("us")}
+    fields = []
+    for column in export_query([]).selected_columns:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = str
+        # Enums and JSON are written as text
+        fields.append(pa.field(column.name, types.get(python_type, pa.string())))
+    return pa.schema(fields)
+
+
+async def stream_parquet(filters: list) -> AsyncIterator[bytes]:
+    """One row group per chunk, sent as soon as it is encoded; the footer comes last."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(pa)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=EXPORT_PARQUET_COMPRESSION)
+    try:
+        async for rows in _row_chunks(filters):
+            columns = zip(*rows)
+            arrays = [
+                pa.array([_plain(value) for value in values], type=field.type)
+                for values, field in zip(columns, schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+async def stream_export(export_format: ExportFormat, filters: list) -> AsyncIterator[bytes]:
+    stream = stream_parquet(filters) if export_format == ExportFormat.PARQUET else stream_csv(filters)
+    sent = 0
+    try:
+        async for chunk in stream:
+            sent += len(chunk)
+            yield chunk
+    except Exception as e:
+        # Headers are already out; the client sees a truncated body
+        logger.error(f"Experiment export ({export_format.value}) failed after {sent} bytes: {e}")
+        raise
+    logger.info(f"Exported experiments as {export_format.value}: {sent} bytes")
@@ -0,0 +1,111 @@
+import base64
+from datetime import datetime
+
+from sqlalchemy import desc, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from backend.app.models.enums import PrecisionType
+from backend.app.models.experiments import Experiment
+
+# Columns of the list view: everything but the large JSON columns (metrics, cpu_affinity)
+EXPERIMENT_LIST_COLUMNS = (
+    Experiment.id,
+    Experiment.dataset_id,
+    Experiment.precision,
+    Experiment.engine,
+    Experiment.batch_size,
+    Experiment.num_rows,
+    Experiment.latency_seconds,
+    Experiment.num_samples,
+    Experiment.throughput_samples_per_sec,
+    Experiment.emissions_kg,
+    Experiment.energy_consumed_kwh,
+    Experiment.net_energy_kwh,
+    Experiment.accuracy,
+    Experiment.energy_meter,
+    Experiment.created_at,
+)
+
+
+def encode_cursor(created_at: datetime, experiment_id: str) -> str:
+    """Opaque keyset cursor: the (created_at, id) of the last row of a page."""
+    raw = f"{created_at.isoformat()}|{experiment_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, experiment_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), experiment_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def experiment_filters(
+    dataset_id: str | None = None,
+    precision: PrecisionType | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None
+) -> list:
+    conditions = []
+    if dataset_id is not None:
+        conditions.append(Experiment.dataset_id == dataset_id)
+    if precision is not None:
+        conditions.append(Experiment.precision == precision)
+    if created_after is not None:
+        conditions.append(Experiment.created_at >= created_after)
+    if created_before is not None:
+        conditions.append(Experiment.created_at < created_before)
+    return conditions
+
+
+async def list_experiments_page(
+    session: AsyncSession,
+    limit: int,
+    cursor: str | None = None,
+    filters: list | None = None,
+    columns: tuple = EXPERIMENT_LIST_COLUMNS
+) -> tuple[list[dict], str | None]:
+    """
+    One page of experiments, newest first, as plain row mappings (no ORM objects).
+    Keyset pagination on (created_at, id): each page is an index range scan that
+    starts where the previous page ended, however deep the client pages.
+    Returns the rows and the cursor of the next page (None on the last page).
+    """
+    query = select(*columns).where(*(filters or []))
+    if cursor is not None:
+        created_at, experiment_id = decode_cursor(cursor)
+        query = query.where(tuple_(Experiment.created_at, Experiment.id) < tuple_(created_at, experiment_id))
+    # One extra row tells whether there is a next page
+    query = query.order_by(desc(Experiment.created_at), desc(Experiment.id)).limit(limit + 1)
+
+    rows = [dict(row) for row in (await session.execute(query)).mappings()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+async def latest_per_precision(session: AsyncSession, dataset_id: str) -> dict[str, Experiment]:
+    """
+    The newest experiment of every precision on a dataset, in a single query:
+    rows are ranked per precision with ROW_NUMBER() and only rank 1 is kept.
+    """
+    ranked = (
+        select(
+            Experiment,
+            func.row_number().over(
+                partition_by=Experiment.precision,
+                order_by=(desc(Experiment.created_at), desc(Experiment.id)),
+            ).label("rank"),
+        )
+        .where(Experiment.dataset_id == dataset_id)
+        .subquery()
+    )
+    latest = aliased(Experiment, ranked)
+    result = await session.execute(select(latest).where(ranked.c.rank == 1))
+    return {experiment.precision.value: experiment for experiment in result.scalars()}
@@ -1,74 +1,319 @@
+import os
+import math
+import time
+import uuid
+import asyncio
 import logging
-import pandas as pd
+from dataclasses import asdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from codecarbon import EmissionsTracker
 
+from backend.app.models.benchmarks import LatencyDistribution
 from backend.app.models.datasets import Dataset
-from backend.app.models.enums import PrecisionType
+from backend.app.models.enums import EngineType, PrecisionType
 from backend.app.models.experiments import Experiment
-from backend.app.services.base_model import BaseAIModel
+from backend.app.models.power_traces import PowerTrace
+from backend.app.services.benchmark import BenchmarkConfig
+from backend.app.services.calibration_service import get_idle_baseline, net_energy
+from backend.app.services.dataset_cache import DatasetArrays, load_dataset_arrays
+from backend.app.services.energy_meter import get_energy_meter
+from backend.app.services.power_trace import PowerSampler
+from backend.app.services.summary_service import record_experiment
+
+if TYPE_CHECKING:
+    # torch and the model services load in the worker, on first measurement
+    import torch
+    from backend.app.services.base_model import BaseAIModel
 
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class ExperimentSpec:
+    """
+    Everything a worker process needs to run one measurement.
+    Plain values only, so it can be pickled into the job worker pool.
+    """
+    dataset_id: str
+    filepath: str
+    ai_model: str
+    precision: str
+    batch_size: int | None = None
+    label_column: str | None = None
+    # Run on the first num_rows rows only; None = the whole dataset
+    num_rows: int | None = None
+    engine: str = EngineType.EAGER.value
+
+    @classmethod
+    def from_dataset(
+        cls,
+        dataset: Dataset,
+        precision: PrecisionType,
+        batch_size: int | None = None,
+        num_rows: int | None = None,
+        engine: EngineType = EngineType.EAGER
+    ) -> "ExperimentSpec":
+        return cls(
+            dataset_id=dataset.id,
+            filepath=dataset.filepath,
+            ai_model=dataset.ai_model.value,
+            precision=PrecisionType(precision).value,
+            batch_size=batch_size,
+            label_column=dataset.label_column,
+            num_rows=num_rows,
+            engine=EngineType(engine).value,
+        )
+
+
+def measure_experiment(
+    data: DatasetArrays,
+    model_service: "BaseAIModel",
+    precision: PrecisionType,
+    project_name: str,
+    batch_size: int | None = None,
+    input_tensor: "torch.Tensor | None" = None,
+    score: bool = True,
+    engine: EngineType = EngineType.EAGER
+) -> dict:
+    """
+    Runs inference under the configured energy meter (see energy_meter.ENERGY_METER)
+    and returns the raw metrics, gross and net of the host's idle baseline.
+    The model is resolved from the model cache before the meter starts.
+    Synchronous and CPU-bound: call it from a worker, never from the event loop.
+    """
+    import torch
+
+    # 1. Resolve the model before metering, so a cache miss (load, quantization,
+    # export, tracing) is not counted as inference energy
+    try:
+        model_service.check_input(data)
+        load_started = time.perf_counter()
+        model, cache_hit = model_service.resolve_model(precision, data, EngineType(engine).value)
+        model_load_seconds = time.perf_counter() - load_started
+    except Exception as e:
+        logger.error(f"Model setup failed: {e}")
+        raise RuntimeError(f"Model setup failed for {precision} on {EngineType(engine).value}: {e}") from e
+
+    # 2. Start Energy Meter (calibrating first if the idle baseline is stale)
+    meter = get_energy_meter()
+    baseline = get_idle_baseline(meter.name)
+    meter.start(project_name)
+    sampler = PowerSampler(meter).start()
+
+    # 3. Run Inference
+    try:
+        result = model_service.run_inference(
+            data, precision, batch_size, input_tensor=input_tensor, score=score,
+            engine=EngineType(engine).value, model=model
+        )
+    except Exception as e:
+        sampler.stop()
+        meter.stop()
+        logger.error(f"Inference failed: {e}")
+        raise RuntimeError(f"Inference failed for {precision} on {EngineType(engine).value}: {e}") from e
+
+    # 4. Collect Metrics
+    trace = sampler.stop()
+    reading = meter.stop()
+    net = net_energy(reading, baseline, meter.resolution_joules)
+    latency = result.latency
+    stats = asdict(result.latency_stats)
+    if math.isinf(stats["relative_standard_error"]):
+        stats["relative_standard_error"] = None
+
+    return {
+        "precision": PrecisionType(precision).value,
+        "engine": EngineType(engine).value,
+        "batch_size": batch_size,
+        "accuracy": result.accuracy,
+        "top_k_accuracy": result.top_k_accuracy,
+        "metrics": result.metrics,
+        "latency_seconds": latency,
+        "num_samples": result.processed_samples,
+        "throughput_samples_per_sec": data.num_samples / latency if latency > 0 else None,
+        "emissions_kg": reading.emissions_kg,
+        "energy_consumed_kwh": reading.energy_kwh,
+        "cpu_energy_kwh": reading.cpu_energy_kwh,
+        "ram_energy_kwh": reading.ram_energy_kwh,
+        "net_energy_kwh": net.energy_kwh,
+        "net_emissions_kg": net.emissions_kg,
+        "net_energy_delta_kwh": net.delta_kwh,
+        "net_energy_below_resolution": net.below_resolution,
+        "idle_power_watts": baseline.idle_power_watts,
+        "duration": reading.duration,
+        "energy_meter": meter.name,
+        "intra_op_threads": torch.get_num_threads(),
+        "inter_op_threads": torch.get_num_interop_threads(),
+        "cpu_affinity": sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None,
+        "latency_distribution": stats,
+        "power_trace": trace.encode() if trace is not None else None,
+        "model_cache_hit": cache_hit,
+        "model_load_seconds": model_load_seconds,
+    }
+
+
+def run_measurement(spec: ExperimentSpec, warm: bool = False) -> dict:
+    """
+    Worker-process entry point: loads the dataset and model service for `spec`
+    and measures one run.
+    warm: first build (or load) the model and run one untimed, unmetered pass, for
+    processes that start cold (e.g. one per thread-sweep point)
+    """
+    # Imported here so spawned workers do not pull the factory in at import time
+    from backend.app.services.model_factory import ModelFactory
+
+    logger.info(f"Starting Experiment Run: {spec.precision} on {spec.engine} for Dataset ID {spec.dataset_id}")
+    data = load_dataset_arrays(spec.filepath, spec.ai_model, spec.label_column)
+    if spec.num_rows is not None:
+        data = data.head(spec.num_rows)
+    model_service = ModelFactory.get_model_service(spec.ai_model)
+    if warm:
+        model_service.check_input(data)
+        model = model_service.get_model(spec.precision, data, spec.engine)
+        model_service.benchmark_passes(
+            model, data, spec.batch_size,
+            config=BenchmarkConfig(warmup_iterations=0, min_iterations=1, max_iterations=1),
+            precision=spec.precision,
+        )
+    measurement = measure_experiment(
+        data, model_service, spec.precision,
+        project_name=f"thesis_{spec.ai_model}_{spec.precision}",
+        batch_size=spec.batch_size,
+        engine=spec.engine,
+    )
+    measurement["num_rows"] = spec.num_rows
+    return measurement
+
+
+def build_experiment(dataset_id: str, measurement: dict) -> tuple[Experiment, list]:
+    """
+    Turns a measurement returned by `measure_experiment` into an Experiment row and
+    its dependent rows (latency distribution, power trace). Keys and timestamps are
+    assigned here rather than at flush, so the row can be returned before it is written.
+    """
+    measurement = dict(measurement)
+    distribution = measurement.pop("latency_distribution", None)
+    trace = measurement.pop("power_trace", None)
+    experiment = Experiment(
+        id=str(uuid.uuid4()), created_at=datetime.utcnow(), dataset_id=dataset_id, **measurement
+    )
+    children = []
+    if distribution is not None:
+        children.append(LatencyDistribution(experiment_id=experiment.id, **distribution))
+    if trace is not None:
+        children.append(PowerTrace(experiment_id=experiment.id, **trace))
+    return experiment, children
+
+
+async def persist_experiments(session: AsyncSession, rows: list[tuple[Experiment, list]]):
+    """
+    Adds built experiments to the session and folds them into the experiment
+    summaries, in the caller's transaction; the caller commits.
+    """
+    for experiment, children in rows:
+        session.add(experiment)
+        session.add_all(children)
+    await session.flush()
+    # Same transaction, so the summaries never count a run that was rolled back
+    for experiment, _ in rows:
+        await record_experiment(session, experiment)
+
+
+async def save_experiment(session: AsyncSession, dataset_id: str, measurement: dict) -> Experiment:
+    """
+    Persists a measurement returned by `measure_experiment` as an Experiment row,
+    plus its latency distribution and power trace, and folds it into the experiment summaries.
+    Job runners go through the batching result_sink instead.
+    """
+    new_experiment, children = build_experiment(dataset_id, measurement)
+    await persist_experiments(session, [(new_experiment, children)])
+
+    await session.commit()
+    await session.refresh(new_experiment)
+
+    logger.info(f"Experiment saved. Energy: {new_experiment.energy_consumed_kwh} kWh")
+    return new_experiment
+
+
+def _run_value(run: Experiment | dict, key: str):
+    return run.get(key) if isinstance(run, dict) else getattr(run, key)
+
+
+def has_net_energy(run: Experiment | dict) -> bool:
+    """
+    Whether a run (an Experiment or a measurement dict) has a usable net energy figure:
+    measured against an idle baseline, positive and above the meter's resolution.
+    """
+    net_kwh = _run_value(run, "net_energy_kwh")
+    return net_kwh is not None and net_kwh > 0 and not _run_value(run, "net_energy_below_resolution")
+
+
+def energy_basis(runs: list) -> str:
+    """
+    'net' if every run has usable net energy, else 'gross'. Runs compared with each
+    other share one basis, so no run is ranked on a floored or unresolved net figure.
+    """
+    return "net" if runs and all(has_net_energy(run) for run in runs) else "gross"
+
+
+def run_energy_kwh(run: Experiment | dict, basis: str) -> float:
+    """The run's energy on `basis` (see energy_basis)."""
+    return _run_value(run, "net_energy_kwh" if basis == "net" else "energy_consumed_kwh")
+
+
+def compute_improvement(baseline: Experiment, candidate: Experiment) -> dict:
+    """
+    Energy/latency savings and accuracy loss of `candidate` relative to `baseline`.
+    Energy is compared net of idle power when both runs have usable net figures, so
+    short runs are not credited with idle energy they merely avoided sitting through.
+    """
+    basis = energy_basis([baseline, candidate])
+    baseline_energy = run_energy_kwh(baseline, basis)
+    candidate_energy = run_energy_kwh(candidate, basis)
+
+    energy_saved_kwh = baseline_energy - candidate_energy
+    energy_saved_pct = (energy_saved_kwh / baseline_energy * 100) if baseline_energy > 0 else 0
+    latency_saved_sec = baseline.latency_seconds - candidate.latency_seconds
+    latency_saved_pct = (latency_saved_sec / baseline.latency_seconds * 100) if baseline.latency_seconds > 0 else 0
+    return {
+        "energy_basis": basis,
+        "energy_saved_kwh": energy_saved_kwh,
+        "energy_saved_percentage": round(energy_saved_pct, 2),
+        "gross_energy_saved_kwh": baseline.energy_consumed_kwh - candidate.energy_consumed_kwh,
+        "latency_reduced_percentage": round(latency_saved_pct, 2),
+        "accuracy_loss": (
+            round(baseline.accuracy - candidate.accuracy, 4)
+            if baseline.accuracy is not None and candidate.accuracy is not None else None
+        )
+    }
+
+
 async def execute_experiment(
-    session: AsyncSession, 
-    dataset: Dataset, 
-    df: pd.DataFrame, 
-    model_service: BaseAIModel, 
+    session: AsyncSession,
+    dataset: Dataset,
+    data: DatasetArrays,
+    model_service: "BaseAIModel",
     precision: PrecisionType
 ) -> Experiment:
     """
-    Orchestrates the full experiment: 
-    1. Starts Tracker
-    2. Runs Inference (FP32/INT8)
-    3. Stops Tracker
+    Orchestrates the full experiment in-process:
+    1. Starts the energy meter
+    2. Runs Inference (FP32/INT8) in a thread, off the event loop
+    3. Stops the energy meter
     4. Saves to Database
+    The API runs experiments through the job queue instead (see job_service).
     """
     try:
         logger.info(f"Starting Experiment Run: {precision} for Dataset ID {dataset.id}")
-        
-        # 1. Start Emissions Tracker
-        tracker = EmissionsTracker(
-            project_name=f"thesis_{dataset.ai_model}_{precision}",
-            measure_power_secs=0.1,
-            save_to_file=False
-        )
-        
-        tracker.start()
-        
-        # 2. Run Inference
-        try:
-            latency, accuracy = model_service.run_inference(df, precision)
-        except Exception as e:
-            tracker.stop()
-            logger.error(f"Inference failed: {e}")
-            raise HTTPException(status_code=500, detail=f"Inference failed for {precision}: {e}")
-        
-        # 3. Collect Metrics
-        tracker.stop()
-        data = tracker.final_emissions_data
-
-        # 4. Save to Database
-        new_experiment = Experiment(
-            dataset_id=dataset.id,
-            precision=precision,
-            accuracy=accuracy,
-            latency_seconds=latency,
-            emissions_kg=data.emissions,
-            energy_consumed_kwh=data.energy_consumed,
-            cpu_energy_kwh=data.cpu_energy,
-            ram_energy_kwh=data.ram_energy,
-            duration=data.duration
+        measurement = await asyncio.to_thread(
+            measure_experiment, data, model_service, precision, f"thesis_{dataset.ai_model}_{precision}"
         )
-        
-        session.add(new_experiment)
-        await session.commit()
-        await session.refresh(new_experiment)
-        
-        logger.info(f"Experiment saved. Energy: {data.energy_consumed} kWh")
-        return new_experiment
+        return await save_experiment(session, dataset.id, measurement)
     except Exception as e:
         logger.error(f"Error during experiment execution: {e}")
-        raise HTTPException(status_code=500, detail="Experiment execution failed")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Experiment execution failed")
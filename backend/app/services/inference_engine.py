@@ -0,0 +1,153 @@
+import os
+import logging
+import importlib.util
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from dotenv import load_dotenv
+
+from backend.app.models.enums import EngineType, PrecisionType
+
+if TYPE_CHECKING:
+    import torch
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ONNX_OPSET = int(os.getenv("ONNX_OPSET", "17"))
+# disable | basic | extended | all
+ORT_GRAPH_OPTIMIZATION = os.getenv("ORT_GRAPH_OPTIMIZATION", "all").lower()
+# 0 = as many threads as torch uses, so engines are compared on the same cores
+ORT_INTRA_OP_THREADS = int(os.getenv("ORT_INTRA_OP_THREADS", "0"))
+# ONNX Runtime's worker threads busy-wait between ops unless told otherwise, which burns
+# energy while idle and would be charged to the engine; off unless enabled here
+ORT_ALLOW_SPINNING = os.getenv("ORT_ALLOW_SPINNING", "False").lower() == "true"
+
+# Precisions each engine can run (the model has to support them too).
+# JIT_FROZEN is already a TorchScript graph, so it only runs eagerly.
+ENGINE_PRECISIONS = {
+    EngineType.EAGER: tuple(PrecisionType),
+    EngineType.TORCHSCRIPT: (
+        PrecisionType.FP32,
+        PrecisionType.INT8,
+        PrecisionType.BF16,
+        PrecisionType.INT8_STATIC,
+        PrecisionType.CHANNELS_LAST,
+    ),
+    EngineType.ONNXRUNTIME: (PrecisionType.FP32, PrecisionType.INT8, PrecisionType.INT8_STATIC),
+}
+
+
+def onnxruntime_available() -> bool:
+    return importlib.util.find_spec("onnxruntime") is not None and importlib.util.find_spec("onnx") is not None
+
+
+def check_engine(engine: EngineType, precision: PrecisionType):
+    """Raises ValueError if `engine` cannot run `precision` here."""
+    engine, precision = EngineType(engine), PrecisionType(precision)
+    if engine == EngineType.ONNXRUNTIME and not onnxruntime_available():
+        raise ValueError("The ONNXRUNTIME engine needs onnx and onnxruntime (uv sync --extra onnx)")
+    if precision not in ENGINE_PRECISIONS[engine]:
+        raise ValueError(f"{precision.value} is not supported by the {engine.value} engine")
+
+
+class OrtModel:
+    """
+    An ONNX Runtime session called like a torch module (tensor in, tensor out),
+    so the benchmark loop, input preparation and scoring are the same for every engine.
+    Inputs and outputs are shared with numpy without copies.
+    """
+
+    def __init__(self, session, artifact_bytes: int):
+        import torch
+
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+        self.artifact_bytes = artifact_bytes
+        self._to_tensor = torch.from_numpy
+
+    def __call__(self, x: "torch.Tensor") -> "torch.Tensor":
+        return self._to_tensor(self.session.run(None, {self.input_name: np.ascontiguousarray(x.numpy())})[0])
+
+    def eval(self):
+        return self
+
+
+def export_onnx(model: "torch.nn.Module", example_input: "torch.Tensor", path: Path):
+    """Exports an FP32 model with a dynamic batch dimension."""
+    import torch
+
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with torch.no_grad():
+        torch.onnx.export(
+            model, (example_input,), str(tmp_path),
+            input_names=["input"], output_names=["logits"],
+            dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=ONNX_OPSET, dynamo=False,
+        )
+    os.replace(tmp_path, path)
+    logger.info(f"Model exported to ONNX at '{path}'")
+
+
+def quantize_onnx(source: Path, target: Path, precision: PrecisionType, calibration_input: np.ndarray | None = None):
+    """
+    ONNX Runtime's own INT8 quantization: INT8 quantizes weights ahead of time and
+    activations on the fly; INT8_STATIC also fixes activation ranges, calibrated
+    on `calibration_input`.
+    """
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantType,
+        quant_pre_process,
+        quantize_dynamic,
+        quantize_static,
+    )
+
+    class CalibrationReader(CalibrationDataReader):
+        def __init__(self, batch_size: int = 32):
+            self.batches = iter(range(0, len(calibration_input), batch_size))
+            self.batch_size = batch_size
+
+        def get_next(self):
+            start = next(self.batches, None)
+            return None if start is None else {"input": calibration_input[start:start + self.batch_size]}
+
+    tmp_path = target.with_suffix(f".{os.getpid()}.tmp")
+    # Shape inference and graph cleanup first, as ONNX Runtime recommends for its quantizers
+    prepared_path = target.with_suffix(f".{os.getpid()}.pre.tmp")
+    try:
+        quant_pre_process(str(source), str(prepared_path), skip_symbolic_shape=True)
+        if PrecisionType(precision) == PrecisionType.INT8_STATIC:
+            quantize_static(
+                str(prepared_path), str(tmp_path), CalibrationReader(),
+                weight_type=QuantType.QInt8, activation_type=QuantType.QUInt8,
+            )
+        else:
+            quantize_dynamic(str(prepared_path), str(tmp_path), weight_type=QuantType.QInt8)
+    finally:
+        prepared_path.unlink(missing_ok=True)
+    os.replace(tmp_path, target)
+    logger.info(f"ONNX model quantized to {PrecisionType(precision).value} at '{target}'")
+
+
+def ort_session(path: Path) -> OrtModel:
+    import onnxruntime as ort
+    import torch
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = {
+        "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    }.get(ORT_GRAPH_OPTIMIZATION, ort.GraphOptimizationLevel.ORT_ENABLE_ALL)
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = ORT_INTRA_OP_THREADS or torch.get_num_threads()
+    options.inter_op_num_threads = 1
+    if not ORT_ALLOW_SPINNING:
+        options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        options.add_session_config_entry("session.inter_op.allow_spinning", "0")
+    session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+    logger.info(f"ONNX Runtime session ready for '{path.name}' ({options.intra_op_num_threads} threads)")
+    return OrtModel(session, path.stat().st_size)
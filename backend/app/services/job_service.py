@@ -0,0 +1,222 @@
+import os
+import uuid
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from dotenv import load_dotenv
+
+from backend.app.core.logging import setup_worker_logging, worker_log_queue
+from backend.app.models.enums import JobStatus
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", "200"))
+
+FINISHED_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    dataset_id: str | None
+    total_steps: int
+    status: JobStatus = JobStatus.PENDING
+    completed_steps: int = 0
+    result: Any = None
+    error: str | None = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    # Bumped on every state change; stream watchers wait for it to move
+    version: int = 0
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+
+class JobContext:
+    """Handed to a job's runner so it can use the worker pool and report progress."""
+
+    def __init__(self, manager: "JobManager", job: Job):
+        self._manager = manager
+        self.job = job
+
+    async def run_in_worker(self, fn: Callable, *args):
+        """Runs a picklable, module-level function in the worker process pool."""
+        return await self._manager._await_worker(self._manager.pool.submit(fn, *args))
+
+    async def run_in_fresh_process(self, fn: Callable, *args):
+        """
+        Runs `fn` in a new, single-use worker process, for settings that can only be
+        applied once per process (e.g. torch inter-op threads) or that must not leak
+        into the shared pool (e.g. CPU affinity).
+        """
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=setup_worker_logging,
+            initargs=(worker_log_queue(),),
+        )
+        try:
+            return await self._manager._await_worker(executor.submit(fn, *args))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def step_done(self, steps: int = 1):
+        self.job.completed_steps += steps
+        await self._manager._notify(self.job)
+
+
+JobRunner = Callable[[JobContext], Awaitable[Any]]
+
+
+class JobManager:
+    """
+    Runs experiments in a process pool so CPU-bound measurements never block the event loop.
+    Jobs are asyncio tasks orchestrating one or more worker steps; at most
+    JOB_WORKERS jobs run at once and the rest wait as PENDING.
+    Job state lives in memory; results are persisted as Experiment rows by the runners.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, history_limit: int = JOB_HISTORY_LIMIT):
+        self.max_workers = max_workers
+        self.history_limit = history_limit
+        self.pool: ProcessPoolExecutor | None = None
+        self._jobs: dict[str, Job] = {}
+        self._slots: asyncio.Semaphore | None = None
+        self._changed: asyncio.Condition | None = None
+        self._stopping = False
+
+    def start(self):
+        if self.pool is not None:
+            return
+        # 'spawn' keeps workers independent of the server's threads and torch state
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=setup_worker_logging,
+            initargs=(worker_log_queue(),),
+        )
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._changed = asyncio.Condition()
+        logger.info(f"Job manager started with {self.max_workers} worker process(es)")
+
+    async def shutdown(self):
+        self._stopping = True
+        for job in list(self._jobs.values()):
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        logger.info("Job manager stopped")
+
+    async def _await_worker(self, future: Future):
+        """
+        Awaits a step running in a worker process. A worker cannot be interrupted
+        mid-measurement, so when the job is cancelled a step that has not started is
+        dropped, and a running one is waited for before the cancellation goes on: the
+        job keeps its slot (and shows CANCELLING) until the worker is free, so the next
+        job never measures alongside it. Shutdown does not wait.
+        """
+        step = asyncio.wrap_future(future)
+        try:
+            return await asyncio.shield(step)
+        except asyncio.CancelledError:
+            if future.cancel() or self._stopping:
+                raise
+            await asyncio.gather(step, return_exceptions=True)
+            raise
+
+    async def _notify(self, job: Job):
+        job.version += 1
+        async with self._changed:
+            self._changed.notify_all()
+
+    def submit(self, kind: str, runner: JobRunner, dataset_id: str | None = None, total_steps: int = 1) -> Job:
+        if self.pool is None:
+            self.start()
+        job = Job(id=str(uuid.uuid4()), kind=kind, dataset_id=dataset_id, total_steps=total_steps)
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, runner))
+        self._prune()
+        logger.info(f"Job {job.id} ({kind}) queued")
+        return job
+
+    async def _run(self, job: Job, runner: JobRunner):
+        try:
+            async with self._slots:
+                job.status = JobStatus.RUNNING
+                job.started_at = datetime.utcnow()
+                await self._notify(job)
+                logger.info(f"Job {job.id} ({job.kind}) started")
+
+                job.result = await runner(JobContext(self, job))
+                job.status = JobStatus.SUCCEEDED
+                logger.info(f"Job {job.id} ({job.kind}) succeeded")
+        except asyncio.CancelledError:
+            job.status = JobStatus.CANCELLED
+            logger.info(f"Job {job.id} ({job.kind}) cancelled")
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+        finally:
+            job.finished_at = datetime.utcnow()
+            await self._notify(job)
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.is_finished]
+        excess = len(self._jobs) - self.history_limit
+        for job in sorted(finished, key=lambda j: j.created_at)[:max(excess, 0)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, status: JobStatus | None = None) -> list[Job]:
+        jobs = [job for job in self._jobs.values() if status is None or job.status == status]
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    async def cancel(self, job_id: str) -> Job | None:
+        """
+        Cancels a job. Pending jobs never start. Running jobs skip their remaining
+        steps; they are CANCELLING until the in-flight worker step returns (its result
+        is discarded), then CANCELLED.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.is_finished or job.status == JobStatus.CANCELLING or job.task is None:
+            return job
+        job.task.cancel()
+        if job.status == JobStatus.RUNNING:
+            job.status = JobStatus.CANCELLING
+            await self._notify(job)
+        return job
+
+    async def watch(self, job_id: str) -> AsyncIterator[Job]:
+        """Yields the job each time its state changes, until it finishes."""
+        job = self._jobs[job_id]
+        last_version = -1
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: job.version != last_version)
+            last_version = job.version
+            yield job
+            if job.is_finished:
+                return
+
+
+job_manager = JobManager()
@@ -0,0 +1,140 @@
+"""
+Measures what logging itself costs under each logging configuration: caller
+latency per record, CPU time and (net) energy, using the configured energy meter.
+
+    python -m backend.app.services.logging_benchmark --records 50000
+"""
+import os
+import json
+import time
+import queue
+import logging
+import argparse
+import logging.handlers
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from backend.app.core.logging import DroppingQueueHandler, build_file_handler, build_formatter
+from backend.app.services.calibration_service import get_idle_baseline, net_energy
+from backend.app.services.energy_meter import JOULES_PER_KWH, get_energy_meter
+
+load_dotenv()
+
+LOG_BENCH_RECORDS = int(os.getenv("LOG_BENCH_RECORDS", "20000"))
+
+
+@dataclass
+class LoggingConfig:
+    name: str
+    log_format: str
+    queued: bool
+    rotation: str = "none"
+
+
+BENCH_CONFIGS = [
+    LoggingConfig("sync-text", "text", queued=False),
+    LoggingConfig("sync-json", "json", queued=False),
+    LoggingConfig("queued-text", "text", queued=True),
+    LoggingConfig("queued-json", "json", queued=True),
+    LoggingConfig("queued-text-rotating", "text", queued=True, rotation="size"),
+]
+
+
+def benchmark_config(config: LoggingConfig, records: int, log_dir: Path, meter_name: str | None = None) -> dict:
+    """
+    Logs `records` INFO records through `config` into a file under `log_dir`.
+    Caller time stops when the last call returns; CPU time and energy also
+    cover the writer thread draining the queue, i.e. the whole cost.
+    """
+    handler = build_file_handler(log_dir / f"{config.name}.log", config.rotation)
+    handler.setFormatter(build_formatter(config.log_format))
+    bench_logger = logging.getLogger(f"logging_benchmark.{config.name}")
+    bench_logger.propagate = False
+    bench_logger.setLevel(logging.INFO)
+
+    listener = queue_handler = None
+    if config.queued:
+        queue_handler = DroppingQueueHandler(queue.Queue())
+        listener = logging.handlers.QueueListener(queue_handler.queue, handler)
+        listener.start()
+        bench_logger.addHandler(queue_handler)
+    else:
+        bench_logger.addHandler(handler)
+
+    meter = get_energy_meter(meter_name)
+    baseline = get_idle_baseline(meter.name)
+    cpu_start = time.process_time()
+    meter.start("logging_benchmark")
+    start = time.perf_counter()
+    for i in range(records):
+        bench_logger.info(f"Benchmark record {i} of {records} for configuration {config.name}")
+    caller_seconds = time.perf_counter() - start
+    if listener is not None:
+        # Returns once the queue is drained
+        listener.stop()
+    handler.flush()
+    wall_seconds = time.perf_counter() - start
+    reading = meter.stop()
+    cpu_seconds = time.process_time() - cpu_start
+
+    bench_logger.handlers.clear()
+    handler.close()
+
+    net_kwh = net_energy(reading, baseline, meter.resolution_joules).energy_kwh
+    return {
+        "config": config.name,
+        "records": records,
+        "caller_us_per_record": caller_seconds / records * 1e6,
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,
+        "cpu_us_per_record": cpu_seconds / records * 1e6,
+        "energy_joules": reading.energy_kwh * JOULES_PER_KWH,
+        "net_energy_joules": net_kwh * JOULES_PER_KWH,
+        "net_uj_per_record": net_kwh * JOULES_PER_KWH / records * 1e6,
+        "energy_meter": meter.name,
+        "dropped": queue_handler.dropped if queue_handler is not None else 0,
+    }
+
+
+def run_benchmark(
+    records: int = LOG_BENCH_RECORDS,
+    configs: list[LoggingConfig] = BENCH_CONFIGS,
+    meter_name: str | None = None
+) -> list[dict]:
+    with tempfile.TemporaryDirectory(prefix="logging_benchmark_") as log_dir:
+        return [benchmark_config(config, records, Path(log_dir), meter_name) for config in configs]
+
+
+def _print_table(results: list[dict]):
+    columns = [
+        ("config", "{}"),
+        ("caller_us_per_record", "{:.2f}"),
+        ("cpu_us_per_record", "{:.2f}"),
+        ("wall_seconds", "{:.3f}"),
+        ("net_uj_per_record", "{:.2f}"),
+        ("dropped", "{}"),
+    ]
+    rows = [[fmt.format(result[key]) for key, fmt in columns] for result in results]
+    widths = [max(len(key), *(len(row[i]) for row in rows)) for i, (key, _) in enumerate(columns)]
+    print("  ".join(key.ljust(width) for (key, _), width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU time and energy cost of each logging configuration")
+    parser.add_argument("--records", type=int, default=LOG_BENCH_RECORDS)
+    parser.add_argument("--configs", nargs="+", choices=[c.name for c in BENCH_CONFIGS], help="Subset to run")
+    parser.add_argument("--meter", help="Energy meter (default: ENERGY_METER)")
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+    args = parser.parse_args()
+
+    selected = [c for c in BENCH_CONFIGS if not args.configs or c.name in args.configs]
+    results = run_benchmark(args.records, selected, args.meter)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
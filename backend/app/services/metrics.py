@@ -0,0 +1,75 @@
+import os
+
+import torch
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TOP_K = int(os.getenv("METRICS_TOP_K", "5"))
+
+
+class ClassificationMetrics:
+    """
+    Streaming classification metrics.
+    Each batch of logits is reduced to counts right away (argmax, top-k hits,
+    confusion matrix), so memory stays O(num_classes^2) whatever the dataset size.
+    Top-k is left out (None) when k >= num_classes, where every sample is a hit.
+    """
+
+    def __init__(self, num_classes: int, top_k: int = TOP_K):
+        self.num_classes = num_classes
+        self.top_k = max(1, top_k) if top_k < num_classes else None
+        self.samples = 0
+        self.ignored = 0
+        self.correct = 0
+        self.top_k_correct = 0
+        self.confusion = torch.zeros(num_classes * num_classes, dtype=torch.int64)
+
+    def update(self, logits: torch.Tensor, labels: torch.Tensor):
+        logits = logits.float()
+        labels = labels.long()
+
+        # Labels outside the model's class range cannot be scored
+        valid = (labels >= 0) & (labels < self.num_classes)
+        if not bool(valid.all()):
+            self.ignored += int((~valid).sum())
+            logits, labels = logits[valid], labels[valid]
+
+        predictions = logits.argmax(dim=1)
+        self.samples += labels.numel()
+        self.correct += int((predictions == labels).sum())
+        if self.top_k is not None:
+            top_k = logits.topk(self.top_k, dim=1).indices
+            self.top_k_correct += int((top_k == labels.unsqueeze(1)).any(dim=1).sum())
+        self.confusion += torch.bincount(
+            labels * self.num_classes + predictions, minlength=self.num_classes * self.num_classes
+        )
+
+    @property
+    def accuracy(self) -> float | None:
+        return self.correct / self.samples if self.samples else None
+
+    @property
+    def top_k_accuracy(self) -> float | None:
+        return self.top_k_correct / self.samples if self.samples and self.top_k is not None else None
+
+    def result(self) -> dict:
+        """
+        JSON-friendly summary. Rows of the confusion matrix are true classes, columns predictions.
+        Per-class accuracy is None for classes with no samples.
+        """
+        confusion = self.confusion.view(self.num_classes, self.num_classes)
+        per_class_total = confusion.sum(dim=1)
+        per_class_accuracy = [
+            (int(confusion[c, c]) / int(per_class_total[c])) if per_class_total[c] > 0 else None
+            for c in range(self.num_classes)
+        ]
+        return {
+            "samples": self.samples,
+            "ignored_samples": self.ignored,
+            "accuracy": self.accuracy,
+            "top_k": self.top_k,
+            "top_k_accuracy": self.top_k_accuracy,
+            "per_class_accuracy": per_class_accuracy,
+            "confusion_matrix": confusion.tolist(),
+        }
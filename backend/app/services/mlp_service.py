@@ -1,27 +1,27 @@
 import os
-import time
-import pandas as pd
-import numpy as np
 import torch
 import logging
 from dotenv import load_dotenv
 
 
-from backend.app.core.logging import setup_logging
 from backend.ai_models.mlp import MaintenanceMLP
 from backend.app.services.base_model import BaseAIModel
-from backend.app.models.enums import PrecisionType
+from backend.app.services.dataset_cache import MODEL_INPUT_FEATURES, DatasetArrays
+from backend.app.models.enums import ModelType, PrecisionType
 
 load_dotenv()
 
-setup_logging()
 logger = logging.getLogger(__name__)
 
 MLP_MODEL_PATH = os.getenv("MLP_MODEL_PATH", "trained_models/mlp_maintenance_v1.pth")
 
 class MLPModelService(BaseAIModel):
+    model_type = ModelType.MLP
+    model_path = MLP_MODEL_PATH
+    repetitions = 10
+
     def __init__(self):
-        self.input_size = 512
+        self.input_size = MODEL_INPUT_FEATURES[ModelType.MLP]
         self.hidden_size = 1024
         self.num_classes = 2
         
@@ -35,36 +35,17 @@ class MLPModelService(BaseAIModel):
         model.load_state_dict(torch.load(MLP_MODEL_PATH))
         model.eval()
         return model
-    
-    def run_inference(self, df: pd.DataFrame, precision: str) -> tuple[float, float]:
-        # 1. Prepare Data
-        # Ensure we only take numbers and convert to Float32 Tensor
-        data_values = df.select_dtypes(include=[np.number]).values
-        input_tensor = torch.tensor(data_values, dtype=torch.float32)
-        
-        model = self.load_model()
-        
+
+    def prepare_model(self, model, precision: str, example_input: torch.Tensor | None = None):
         if precision == PrecisionType.INT8.value:
             model = torch.quantization.quantize_dynamic(
                 model, {torch.nn.Linear}, dtype=torch.qint8
             )
             logger.info("Model quantized to INT8")
-        elif precision == PrecisionType.FP32.value:
-            logger.info("Using FP32 model")
-            
-
-        
-        start_time = time.time()
-
-        with torch.no_grad():
-            for _ in range(10): 
-                output = model(input_tensor)
-
-
-        end_time = time.time()
-        latency = end_time - start_time
-
-        # Dummy accuracy values for illustration
-        accuracy = 0.95 if precision == "fp32" else 0.92 
-
-        return latency, accuracy
\ No newline at end of file
+            return model
+        return super().prepare_model(model, precision, example_input)
+    
+    def check_input(self, data: DatasetArrays):
+        # Features are already a float32 memory-mapped matrix; prepare_input wraps it without a copy
+        if data.features.shape[1] != self.input_size:
+            raise ValueError(f"Shape mismatch! Expected {self.input_size} features per row, got {data.features.shape[1]}")
@@ -0,0 +1,216 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+import torch
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_DIR = Path(os.getenv("MODEL_CACHE_DIR", "./model_cache"))
+MODEL_CACHE_MAX_MB = float(os.getenv("MODEL_CACHE_MAX_MB", "512"))
+
+# (path, size, mtime_ns) -> sha256, so the weights file is only hashed when it changes
+_fingerprints: dict[tuple[str, int, int], str] = {}
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    Returns the SHA-256 of a weights file.
+    The digest is memoized on (path, size, mtime) so repeated lookups cost one stat().
+    """
+    stat = os.stat(path)
+    stat_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _fingerprints.get(stat_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        _fingerprints[stat_key] = digest
+    return digest
+
+
+def _estimate_nbytes(obj) -> int:
+    """Walks a state_dict value (tensors, packed-param tuples) and sums the tensor sizes."""
+    if isinstance(obj, torch.Tensor):
+        return obj.numel() * obj.element_size()
+    if isinstance(obj, (tuple, list)):
+        return sum(_estimate_nbytes(o) for o in obj)
+    return 0
+
+
+def estimate_model_bytes(model: torch.nn.Module) -> int:
+    # Models of other runtimes (e.g. ONNX Runtime sessions) report their artifact size
+    if hasattr(model, "artifact_bytes"):
+        return model.artifact_bytes
+    try:
+        return sum(_estimate_nbytes(v) for v in model.state_dict().values())
+    except Exception:
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+
+
+class ModelCache:
+    """
+    Two-tier cache for ready-to-run models.
+
+    Tier 1 keeps deserialized (and possibly quantized) models in memory with LRU
+    eviction, bounded by an estimated byte budget.
+    Tier 2 stores the serialized artifacts on disk, so after a restart an INT8
+    model is loaded instead of quantized again. TorchScript modules are stored
+    with torch.jit.save, everything else with torch.save.
+
+    Keys are (model type, weights-file hash, ..., precision).
+
+    Builds run under a per-key lock, not the cache lock: a thread building (or
+    quantizing) one model never blocks lookups of others, and concurrent requests
+    for the same key wait for the one build instead of repeating it.
+    """
+
+    def __init__(self, max_bytes: int, cache_dir: Path):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries: OrderedDict[tuple, tuple[torch.nn.Module, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple, threading.Lock] = {}
+
+    def _disk_path(self, key: tuple, suffix: str = ".pt") -> Path:
+        name = "_".join(str(part) for part in key)
+        # Keep file names short; the weights hash is the long part of the key
+        name = hashlib.sha256(name.encode()).hexdigest()[:32]
+        return self.cache_dir / f"{key[0]}_{key[-1]}_{name}{suffix}"
+
+    def artifact_path(self, key: tuple, suffix: str) -> Path:
+        """Where to keep an artifact for `key` that the caller serializes itself (e.g. .onnx)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        return self._disk_path(key, suffix)
+
+    def _load_from_disk(self, key: tuple) -> torch.nn.Module | None:
+        for suffix, load in ((".pt", lambda p: torch.load(p, weights_only=False)), (".ts", torch.jit.load)):
+            path = self._disk_path(key, suffix)
+            if not path.exists():
+                continue
+            try:
+                model = load(path)
+                model.eval()
+                logger.info(f"Loaded cached model artifact from '{path}'")
+                return model
+            except Exception as e:
+                logger.warning(f"Discarding unreadable model artifact '{path}': {e}")
+                path.unlink(missing_ok=True)
+        return None
+
+    def _save_to_disk(self, key: tuple, model: torch.nn.Module):
+        is_script = isinstance(model, torch.jit.ScriptModule)
+        path = self._disk_path(key, ".ts" if is_script else ".pt")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            if is_script:
+                torch.jit.save(model, tmp_path)
+            else:
+                torch.save(model, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist model artifact '{path}': {e}")
+
+    def _insert(self, key: tuple, model: torch.nn.Module):
+        nbytes = estimate_model_bytes(model)
+        self._entries[key] = (model, nbytes)
+        self._total_bytes += nbytes
+        # Evict least recently used entries, but never the one just inserted
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            old_key, (_, old_bytes) = self._entries.popitem(last=False)
+            self._total_bytes -= old_bytes
+            logger.info(f"Evicted model {old_key[0]}/{old_key[-1]} from memory cache")
+
+    def get_or_build(
+        self,
+        key: tuple,
+        build: Callable[[], torch.nn.Module],
+        finalize: Callable[[torch.nn.Module], torch.nn.Module] | None = None,
+        persist: bool = True
+    ) -> torch.nn.Module:
+        """
+        Returns the model for `key`, looking in memory, then on disk, and
+        finally calling `build()` and storing the result in both tiers.
+        finalize: turns the stored artifact into the runnable model (applied after
+        build or load, for steps whose output cannot be serialized).
+        persist: False keeps the model in memory only.
+        """
+        return self.fetch(key, build, finalize, persist)[0]
+
+    def fetch(
+        self,
+        key: tuple,
+        build: Callable[[], torch.nn.Module],
+        finalize: Callable[[torch.nn.Module], torch.nn.Module] | None = None,
+        persist: bool = True
+    ) -> tuple[torch.nn.Module, bool]:
+        """
+        Like get_or_build, plus whether the model was cached (in memory or on disk, or
+        built meanwhile by a concurrent caller) rather than built by this call.
+        """
+        model = self._lookup(key)
+        if model is not None:
+            return model, True
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another caller may have built it while this one waited
+            model = self._lookup(key)
+            if model is not None:
+                return model, True
+
+            model = self._load_from_disk(key) if persist else None
+            hit = model is not None
+            if model is None:
+                model = build()
+                if persist:
+                    self._save_to_disk(key, model)
+            if finalize is not None:
+                model = finalize(model)
+
+            with self._lock:
+                self._insert(key, model)
+            return model, hit
+
+    def _lookup(self, key: tuple) -> torch.nn.Module | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def clear(self, disk: bool = False):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            if disk and self.cache_dir.exists():
+                for pattern in ("*.pt", "*.ts", "*.onnx"):
+                    for path in self.cache_dir.glob(pattern):
+                        path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+model_cache = ModelCache(
+    max_bytes=int(MODEL_CACHE_MAX_MB * 1024 * 1024),
+    cache_dir=MODEL_CACHE_DIR,
+)
@@ -1,26 +1,62 @@
+import importlib
+import logging
+from typing import TYPE_CHECKING
+
 from backend.app.models.enums import ModelType
-from backend.app.services.base_model import BaseAIModel
-from backend.app.services.cnn_service import CNNModelService
-from backend.app.services.mlp_service import MLPModelService
+
+if TYPE_CHECKING:
+    from backend.app.services.base_model import BaseAIModel
+
+logger = logging.getLogger(__name__)
+
 
 class ModelFactory:
+    """
+    Registry of model services by model type. Services are registered by import
+    path and imported on first use, so torch and the model code only load in the
+    processes (and on the requests) that actually run a model.
+    """
+
+    _registry: dict[ModelType, str] = {
+        ModelType.MLP: "backend.app.services.mlp_service:MLPModelService",
+        ModelType.CNN: "backend.app.services.cnn_service:CNNModelService",
+    }
+    _classes: dict[ModelType, type] = {}
+
     @staticmethod
-    def get_model_service(model_type: str | ModelType) -> BaseAIModel:
+    def _model_type(model_type: str | ModelType) -> ModelType:
+        if isinstance(model_type, ModelType):
+            return model_type
+        try:
+            # Convert string "mlp" -> ModelType.MLP
+            # We use .upper() because our Enum values are "MLP", "CNN"
+            return ModelType(model_type.upper())
+        except ValueError:
+            raise ValueError(f"Unknown model type: {model_type}")
+
+    @classmethod
+    def register(cls, model_type: ModelType, path: str):
+        """Registers a service as 'package.module:ClassName'."""
+        cls._registry[model_type] = path
+        cls._classes.pop(model_type, None)
+
+    @classmethod
+    def get_service_class(cls, model_type: str | ModelType) -> type:
+        model_type_enum = cls._model_type(model_type)
+        service_cls = cls._classes.get(model_type_enum)
+        if service_cls is None:
+            try:
+                module_name, class_name = cls._registry[model_type_enum].split(":")
+            except KeyError:
+                raise ValueError(f"Unknown model type: {model_type}")
+            service_cls = getattr(importlib.import_module(module_name), class_name)
+            cls._classes[model_type_enum] = service_cls
+            logger.info(f"Loaded model service {class_name} for {model_type_enum.value}")
+        return service_cls
+
+    @classmethod
+    def get_model_service(cls, model_type: str | ModelType) -> "BaseAIModel":
         """
         Returns the specific service class based on the input string.
         """
-        if isinstance(model_type, str):
-            try:
-                # Convert string "mlp" -> ModelType.MLP
-                # We use .upper() because our Enum values are "MLP", "CNN"
-                model_type_enum = ModelType(model_type.upper())
-            except ValueError:
-                raise ValueError(f"Unknown model type: {model_type}")
-        else:
-            model_type_enum = model_type
-        if model_type_enum == ModelType.MLP:
-            return MLPModelService()
-        elif model_type_enum == ModelType.CNN:
-            return CNNModelService()
-        else:
-            raise ValueError(f"Unknown model type: {model_type}")
\ No newline at end of file
+        return cls.get_service_class(model_type)()
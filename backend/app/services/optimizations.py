@@ -0,0 +1,88 @@
+import os
+import copy
+import hashlib
+import logging
+
+import numpy as np
+import torch
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Rows of the dataset used to calibrate static INT8 activation ranges
+STATIC_QUANT_CALIBRATION_ROWS = int(os.getenv("STATIC_QUANT_CALIBRATION_ROWS", "256"))
+# Example rows used to trace TorchScript graphs
+JIT_TRACE_ROWS = int(os.getenv("JIT_TRACE_ROWS", "8"))
+
+
+class AutocastModule(torch.nn.Module):
+    """Runs the wrapped model under CPU autocast (mixed precision, e.g. BF16)."""
+
+    def __init__(self, model: torch.nn.Module, dtype: torch.dtype = torch.bfloat16):
+        super().__init__()
+        self.model = model
+        self.dtype = dtype
+
+    def forward(self, x):
+        with torch.autocast("cpu", dtype=self.dtype):
+            return self.model(x)
+
+
+def sample_rows(features: np.ndarray, rows: int) -> np.ndarray:
+    """
+    Evenly spaced rows of the feature matrix (deterministic, so the same dataset
+    always gives the same sample and the same cache key).
+    """
+    total = features.shape[0]
+    if total <= rows:
+        return np.ascontiguousarray(features)
+    index = np.linspace(0, total - 1, rows).astype(np.int64)
+    return np.ascontiguousarray(features[index])
+
+
+def array_fingerprint(array: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(array).tobytes()).hexdigest()
+
+
+def quantize_static(model: torch.nn.Module, calibration_input: torch.Tensor) -> torch.nn.Module:
+    """
+    Static post-training INT8 quantization (FX graph mode): fuses conv/linear + relu,
+    observes activation ranges on `calibration_input`, then converts weights and
+    activations to INT8. Unlike quantize_dynamic this also quantizes Conv2d.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    engine = torch.backends.quantized.engine
+    prepared = prepare_fx(
+        copy.deepcopy(model), get_default_qconfig_mapping(engine), (calibration_input[:1],)
+    )
+    with torch.no_grad():
+        prepared(calibration_input)
+    quantized = convert_fx(prepared)
+    quantized.eval()
+    logger.info(f"Model statically quantized to INT8 ({engine}) on {calibration_input.shape[0]} calibration rows")
+    return quantized
+
+
+def freeze_jit(model: torch.nn.Module, example_input: torch.Tensor) -> torch.jit.ScriptModule:
+    """
+    Traces the model and freezes it (weights inlined as constants).
+    The result is serializable with torch.jit.save; call optimize_jit after loading.
+    """
+    # Freezing needs eval mode, including on wrappers such as AutocastModule
+    model.eval()
+    with torch.no_grad():
+        frozen = torch.jit.freeze(torch.jit.trace(model, example_input))
+    logger.info("Model traced and frozen with TorchScript")
+    return frozen
+
+
+def optimize_jit(frozen: torch.jit.ScriptModule) -> torch.jit.ScriptModule:
+    """
+    Applies optimize_for_inference (op fusion, MKLDNN layouts). Its output cannot be
+    saved and reloaded, so it is applied to every loaded frozen graph instead.
+    """
+    return torch.jit.optimize_for_inference(frozen)
@@ -0,0 +1,177 @@
+import os
+import time
+import zlib
+import logging
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from dotenv import load_dotenv
+
+from backend.app.services.energy_meter import EnergyMeter
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds between power samples; 0 (the default) disables tracing. The sampling thread
+# wakes the CPU during the measured run, so traces are opt-in (e.g. 0.1)
+POWER_TRACE_INTERVAL_SECS = float(os.getenv("POWER_TRACE_INTERVAL_SECS", "0"))
+# Past this many samples the trace is thinned 2:1 and the interval doubled, bounding long runs
+POWER_TRACE_MAX_SAMPLES = int(os.getenv("POWER_TRACE_MAX_SAMPLES", "20000"))
+
+# float32 bit patterns, delta-encoded as int32, zlib-compressed
+TRACE_ENCODING = "f32-delta-zlib"
+
+
+def encode_series(values: np.ndarray) -> bytes:
+    """
+    Lossless compact encoding of a float series: consecutive float32 bit patterns
+    are delta-encoded as (wrapping) int32, which turns slowly varying signals into
+    small, repetitive integers that zlib compresses well.
+    """
+    bits = np.ascontiguousarray(values, dtype="<f4").view("<i4")
+    deltas = np.diff(bits, prepend=np.int32(0))
+    return zlib.compress(deltas.tobytes())
+
+
+def decode_series(blob: bytes) -> np.ndarray:
+    deltas = np.frombuffer(zlib.decompress(blob), dtype="<i4")
+    return np.cumsum(deltas, dtype="<i4").view("<f4")
+
+
+@dataclass
+class PowerSamples:
+    """Power over a run: sample end times (s since start) and mean CPU/RAM watts over each interval."""
+    timestamps: np.ndarray
+    cpu_watts: np.ndarray
+    ram_watts: np.ndarray
+    interval_seconds: float
+
+    def encode(self) -> dict:
+        """Plain, picklable column values of a PowerTrace row."""
+        total = self.cpu_watts + self.ram_watts
+        return {
+            "sample_count": int(len(self.timestamps)),
+            "interval_seconds": self.interval_seconds,
+            "encoding": TRACE_ENCODING,
+            "mean_watts": float(total.mean()) if len(total) else None,
+            "peak_watts": float(total.max()) if len(total) else None,
+            "timestamps": encode_series(self.timestamps),
+            "cpu_watts": encode_series(self.cpu_watts),
+            "ram_watts": encode_series(self.ram_watts),
+        }
+
+
+class PowerSampler:
+    """
+    Polls a running meter's cumulative energy from a background thread and turns
+    it into a power trace. Only counters are read while the work runs; watts are
+    derived once at stop().
+    """
+
+    def __init__(
+        self,
+        meter: EnergyMeter,
+        interval: float = POWER_TRACE_INTERVAL_SECS,
+        max_samples: int = POWER_TRACE_MAX_SAMPLES
+    ):
+        self.meter = meter
+        self.interval = interval
+        self.max_samples = max_samples
+        self._samples: list[tuple[float, float, float]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._start_time = 0.0
+
+    def start(self) -> "PowerSampler":
+        """Call right after meter.start(). Does nothing if tracing is off or unsupported."""
+        if self.interval <= 0 or self.meter.cumulative_joules() is None:
+            return self
+        self._start_time = time.perf_counter()
+        self._samples = [(0.0, 0.0, 0.0)]
+        self._thread = threading.Thread(target=self._run, name="power-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._record()
+
+    def _record(self):
+        joules = self.meter.cumulative_joules()
+        if joules is None:
+            return
+        cpu_j, ram_j = joules
+        _, last_cpu, last_ram = self._samples[-1]
+        # Meters that update in steps (CodeCarbon) would otherwise give 0 W / 2x W pairs
+        if cpu_j == last_cpu and ram_j == last_ram:
+            return
+        self._samples.append((time.perf_counter() - self._start_time, cpu_j, ram_j))
+        if len(self._samples) > self.max_samples:
+            self._samples = self._samples[:1] + self._samples[2::2]
+            self.interval *= 2
+
+    def stop(self) -> PowerSamples | None:
+        """Call right before meter.stop(). Returns None when no trace was taken."""
+        if self._thread is None:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._record()
+
+        samples = np.asarray(self._samples, dtype=np.float64)
+        if len(samples) < 2:
+            return None
+        elapsed = np.diff(samples[:, 0])
+        keep = elapsed > 0
+        return PowerSamples(
+            timestamps=samples[1:, 0][keep].astype(np.float32),
+            cpu_watts=(np.diff(samples[:, 1])[keep] / elapsed[keep]).astype(np.float32),
+            ram_watts=(np.diff(samples[:, 2])[keep] / elapsed[keep]).astype(np.float32),
+            interval_seconds=self.interval,
+        )
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: picks `points` samples that keep the visual
+    shape of the series (peaks and ramps included). First and last samples are kept.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+    # Inner samples split into points - 2 buckets
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    selected = [0]
+    for i in range(points - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        a = selected[-1]
+        # Twice the triangle area (previous point, candidate, next bucket's mean)
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        selected.append(start + int(np.argmax(area)))
+    selected.append(n - 1)
+    return np.asarray(selected)
+
+
+def minmax_indices(y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Keeps the minimum and maximum of each of (points - 2) / 2 buckets, so every spike
+    and dip survives downsampling. First and last samples are kept.
+    """
+    n = len(y)
+    if points >= n or points < 4:
+        return np.arange(n)
+    edges = np.linspace(0, n, (points - 2) // 2 + 1).astype(np.int64)
+    selected = {0, n - 1}
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            selected.add(start + int(np.argmin(y[start:end])))
+            selected.add(start + int(np.argmax(y[start:end])))
+    return np.asarray(sorted(selected))
@@ -0,0 +1,59 @@
+import os
+import logging
+
+from dotenv import load_dotenv
+
+from backend.app.models.enums import EngineType, ModelType, PrecisionType
+from backend.app.services.job_service import Job, JobContext, job_manager
+from backend.app.services.model_factory import ModelFactory
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Models to load (and quantize) at startup, e.g. "CNN/FP32,CNN/INT8,MLP/INT8/ONNXRUNTIME"
+# (engine optional, default eager); empty = off
+MODEL_PREWARM = os.getenv("MODEL_PREWARM", "")
+
+
+def parse_prewarm(text: str) -> list[tuple[str, str, str]]:
+    """Parses 'MODEL/PRECISION[/ENGINE],...' into (model type, precision, engine) triples. Raises ValueError."""
+    targets = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        model_type, _, rest = part.partition("/")
+        precision, _, engine = rest.partition("/")
+        targets.append((
+            ModelType(model_type.strip().upper()).value,
+            PrecisionType(precision.strip().upper()).value,
+            EngineType(engine.strip().upper() or EngineType.EAGER.value).value,
+        ))
+    return targets
+
+
+def prewarm_models(targets: list[tuple[str, str, str]]) -> list[str]:
+    """
+    Worker entry point: imports torch and the model services and builds each model,
+    which fills this worker's in-memory model cache and the on-disk one shared by
+    all workers (for ONNX Runtime, the exported .onnx files). Precisions and engines
+    that calibrate or trace on a dataset (INT8_STATIC, JIT_FROZEN, TORCHSCRIPT) are skipped.
+    """
+    warmed = []
+    for model_type, precision, engine in targets:
+        try:
+            ModelFactory.get_model_service(model_type).get_model(precision, engine=engine)
+        except ValueError as e:
+            logger.warning(f"Skipping prewarm of {model_type}/{precision}/{engine}: {e}")
+            continue
+        warmed.append(f"{model_type}/{precision}/{engine}")
+    logger.info(f"Prewarmed models: {warmed}")
+    return warmed
+
+
+def submit_prewarm(targets: list[tuple[str, str, str]]) -> Job:
+    """Runs the prewarm as a job, so it happens in a worker and ahead of queued experiments."""
+    async def runner(ctx: JobContext):
+        warmed = await ctx.run_in_worker(prewarm_models, targets)
+        await ctx.step_done()
+        return {"warmed": warmed}
+
+    return job_manager.submit("prewarm", runner)
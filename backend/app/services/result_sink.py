@@ -0,0 +1,169 @@
+import os
+import asyncio
+import logging
+
+from dotenv import load_dotenv
+
+from backend.app.database.db import async_session_maker
+from backend.app.models.experiments import Experiment
+from backend.app.services.experiment_service import build_experiment, persist_experiments
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# A batch is written once this many results are buffered...
+RESULT_SINK_BATCH_SIZE = int(os.getenv("RESULT_SINK_BATCH_SIZE", "64"))
+# ...or once the oldest buffered result has waited this long
+RESULT_SINK_FLUSH_SECS = float(os.getenv("RESULT_SINK_FLUSH_SECS", "0.5"))
+# Writes a row gets before it is given up on and kept as a dead letter
+RESULT_SINK_MAX_ATTEMPTS = int(os.getenv("RESULT_SINK_MAX_ATTEMPTS", "3"))
+
+
+class ResultSinkError(Exception):
+    def __init__(self, failed: dict[str, str]):
+        super().__init__(f"Could not save experiment(s) {list(failed)}: {next(iter(failed.values()))}")
+        self.failed = failed
+
+
+class ResultSink:
+    """
+    Write-behind buffer for experiment results. Job runners submit measurements and
+    get the (not yet written) Experiment back at once; a background task writes the
+    buffer in one transaction per batch, so sweeps and concurrent jobs no longer
+    take the database lock once per run. Callers that need their rows committed
+    (e.g. before reporting a job as done) await flush(), which raises if any of
+    them could not be saved. Rows that fail to write are retried with the next
+    batch, and after RESULT_SINK_MAX_ATTEMPTS writes are kept in dead_letters
+    instead of being dropped. close() writes whatever is left, and is called from
+    the app's lifespan on shutdown.
+    """
+
+    def __init__(
+        self,
+        session_maker=async_session_maker,
+        batch_size: int = RESULT_SINK_BATCH_SIZE,
+        flush_interval: float = RESULT_SINK_FLUSH_SECS,
+        max_attempts: int = RESULT_SINK_MAX_ATTEMPTS
+    ):
+        self.session_maker = session_maker
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        # Rows given up on, by experiment id: (experiment, children) and the last error
+        self.dead_letters: dict[str, tuple[tuple, str]] = {}
+        self._pending: list[tuple] = []
+        # Ids submitted but neither committed nor given up on yet
+        self._unsaved: set[str] = set()
+        self._attempts: dict[str, int] = {}
+        self._wake: asyncio.Event | None = None
+        self._write_lock: asyncio.Lock | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Result sink started (batch size {self.batch_size}, flush every {self.flush_interval}s)")
+
+    async def close(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        try:
+            await self._drain(set(self._unsaved))
+        except ResultSinkError as e:
+            logger.error(f"Result sink stopped with unsaved results: {e}")
+            return
+        logger.info("Result sink stopped")
+
+    def submit(self, dataset_id: str, measurement: dict) -> Experiment:
+        """Buffers a measurement and returns its Experiment, with id and created_at already set."""
+        if self._task is None:
+            self.start()
+        experiment, children = build_experiment(dataset_id, measurement)
+        self._pending.append((experiment, children))
+        self._unsaved.add(experiment.id)
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+        return experiment
+
+    async def flush(self, experiments: list[Experiment] | None = None):
+        """
+        Returns once the given experiments (default: every result submitted before the
+        call) are committed, retrying failed rows right away. Raises ResultSinkError
+        naming those that could not be saved; they stay in dead_letters.
+        """
+        if self._task is None:
+            return
+        ids = set(self._unsaved) if experiments is None else {e.id for e in experiments}
+        await self._drain(ids)
+
+    async def _drain(self, ids: set[str]):
+        # Every pass retries failed rows once, so this ends within max_attempts passes
+        while ids & self._unsaved and self._pending:
+            await self._write()
+        failed = {i: self.dead_letters[i][1] for i in ids if i in self.dead_letters}
+        if failed:
+            raise ResultSinkError(failed)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._write()
+
+    async def _write(self):
+        # One writer at a time: a flush() during a background write waits for it,
+        # so results in the batch being written are covered too
+        async with self._write_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                async with self.session_maker() as session:
+                    await persist_experiments(session, batch)
+                    await session.commit()
+                self._saved(batch)
+                logger.info(f"Result sink wrote {len(batch)} experiment(s)")
+                return
+            except Exception as e:
+                logger.error(f"Result sink failed to write a batch of {len(batch)}, retrying row by row: {e}")
+
+            # One bad row must not lose the rest of the batch
+            for row in batch:
+                try:
+                    async with self.session_maker() as session:
+                        await persist_experiments(session, [row])
+                        await session.commit()
+                    self._saved([row])
+                except Exception as e:
+                    self._failed(row, e)
+
+    def _saved(self, rows: list[tuple]):
+        for experiment, _ in rows:
+            self._unsaved.discard(experiment.id)
+            self._attempts.pop(experiment.id, None)
+
+    def _failed(self, row: tuple, error: Exception):
+        experiment_id = row[0].id
+        attempts = self._attempts.get(experiment_id, 0) + 1
+        if attempts < self.max_attempts:
+            self._attempts[experiment_id] = attempts
+            self._pending.append(row)
+            logger.warning(f"Result sink could not save experiment {experiment_id} (attempt {attempts}), will retry: {error}")
+            return
+        self._attempts.pop(experiment_id, None)
+        self._unsaved.discard(experiment_id)
+        self.dead_letters[experiment_id] = (row, str(error))
+        logger.error(f"Result sink gave up on experiment {experiment_id} after {attempts} attempts: {error}")
+
+
+result_sink = ResultSink()
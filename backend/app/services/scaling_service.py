@@ -0,0 +1,117 @@
+import os
+import logging
+
+import numpy as np
+from dotenv import load_dotenv
+
+from backend.app.models.experiments import Experiment
+from backend.app.services.energy_meter import JOULES_PER_KWH
+from backend.app.services.experiment_service import energy_basis, run_energy_kwh
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Row counts x trials per scaling-curve job; every point is a full measurement
+SCALING_MAX_POINTS = int(os.getenv("SCALING_MAX_POINTS", "64"))
+
+
+def parse_row_counts(texts: list[str]) -> list[int]:
+    """
+    Parses row counts such as '1000', '10k' or '1m' (k = 1e3, m = 1e6) into
+    sorted, distinct positive integers. Raises ValueError.
+    """
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    counts = set()
+    for text in texts:
+        for part in filter(None, (p.strip().lower() for p in text.split(","))):
+            multiplier = multipliers.get(part[-1], 1)
+            number = part[:-1] if part[-1] in multipliers else part
+            try:
+                value = float(number) * multiplier
+            except ValueError:
+                raise ValueError(f"Invalid row count '{part}'")
+            if value < 1 or value != int(value):
+                raise ValueError(f"Row counts must be positive integers, got '{part}'")
+            counts.add(int(value))
+    return sorted(counts)
+
+
+def pass_cost(experiment: Experiment, num_rows: int, basis: str) -> tuple[float, float]:
+    """
+    Seconds and joules of one pass over `num_rows` rows, energy on `basis` (see
+    energy_basis). Energy is metered over warmup and timed passes together, so it is
+    divided by the number of whole passes: samples processed / rows per pass.
+    """
+    passes = round(experiment.num_samples / num_rows) if experiment.num_samples else 1
+    return experiment.latency_seconds, run_energy_kwh(experiment, basis) * JOULES_PER_KWH / max(passes, 1)
+
+
+def fit_linear(rows: np.ndarray, values: np.ndarray) -> dict:
+    """
+    Least-squares fit of value = fixed + per_sample * rows, plus the exponent of
+    value ~ rows^k from a log-log fit (left out if any value is not positive).
+    """
+    per_sample, fixed = np.polyfit(rows, values, 1)
+    residual = float(np.sum((values - (fixed + per_sample * rows)) ** 2))
+    total = float(np.sum((values - values.mean()) ** 2))
+    exponent = None
+    if np.all(values > 0):
+        exponent = float(np.polyfit(np.log(rows), np.log(values), 1)[0])
+    return {
+        "fixed": float(fixed),
+        "per_sample": float(per_sample),
+        "r_squared": 1 - residual / total if total > 0 else None,
+        "exponent": exponent,
+    }
+
+
+def summarize_scaling(trials: dict[int, list[Experiment]], predict_rows: list[int] = ()) -> dict:
+    """
+    Per row count means of the per-pass latency and energy, and linear fits of both
+    over every trial, so the fixed cost (model setup, warm caches) is separated from
+    the marginal cost per sample. `predict_rows` are extrapolated from the fits.
+    """
+    # Net only if every trial has usable net energy; a floored or unresolved net
+    # figure would fit as zero cost
+    basis = energy_basis([e for runs in trials.values() for e in runs])
+
+    rows, latencies, energies, points = [], [], [], []
+    for num_rows, runs in sorted(trials.items()):
+        costs = [pass_cost(e, num_rows, basis) for e in runs]
+        for latency, energy in costs:
+            rows.append(num_rows)
+            latencies.append(latency)
+            energies.append(energy)
+        latency_mean = float(np.mean([c[0] for c in costs]))
+        energy_mean = float(np.mean([c[1] for c in costs]))
+        points.append({
+            "num_rows": num_rows,
+            "trials": len(runs),
+            "latency_seconds": latency_mean,
+            "energy_joules": energy_mean,
+            "latency_per_sample_seconds": latency_mean / num_rows,
+            "energy_per_sample_joules": energy_mean / num_rows,
+            "experiment_ids": [e.id for e in runs],
+        })
+
+    rows = np.asarray(rows, dtype=np.float64)
+    latency_fit = fit_linear(rows, np.asarray(latencies))
+    energy_fit = fit_linear(rows, np.asarray(energies))
+    predictions = [
+        {
+            "num_rows": n,
+            "latency_seconds": latency_fit["fixed"] + latency_fit["per_sample"] * n,
+            "energy_joules": energy_fit["fixed"] + energy_fit["per_sample"] * n,
+        }
+        for n in predict_rows
+    ]
+    if energy_fit["r_squared"] is not None and energy_fit["r_squared"] < 0.9:
+        logger.warning(f"Energy scaling fit is poor (r^2={energy_fit['r_squared']:.3f}); more trials may help")
+    return {
+        "energy_basis": basis,
+        "points": points,
+        "latency": {"metric": "latency_seconds", **latency_fit},
+        "energy": {"metric": "energy_joules", **energy_fit},
+        "predictions": predictions,
+    }
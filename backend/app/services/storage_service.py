@@ -0,0 +1,229 @@
+import os
+import json
+import uuid
+import asyncio
+import hashlib
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "4096")) * 1024 * 1024)
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(8 * 1024 * 1024)))
+
+BLOB_DIR = UPLOAD_DIR / "blobs"
+PARTIAL_DIR = UPLOAD_DIR / "partial"
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UploadOffsetMismatch(Exception):
+    def __init__(self, expected: int):
+        super().__init__(f"Expected chunk at offset {expected}")
+        self.expected = expected
+
+
+class UploadBusy(Exception):
+    def __init__(self, upload_id: str):
+        super().__init__(f"Upload {upload_id} has another request in flight")
+
+
+@dataclass
+class StoredBlob:
+    digest: str
+    size: int
+    path: str
+
+
+def blob_path(digest: str, suffix: str) -> Path:
+    # Two-level fan-out keeps directories small
+    return BLOB_DIR / digest[:2] / f"{digest}{suffix}"
+
+
+def _file_suffix(filename: str) -> str:
+    return Path(filename or "").suffix.lower() or ".csv"
+
+
+def _promote(tmp_path: Path, digest: str, suffix: str) -> Path:
+    """
+    Moves a finished upload into the content-addressed store.
+    If an identical blob already exists the upload is discarded and the existing blob is shared.
+    """
+    target = blob_path(digest, suffix)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        tmp_path.unlink(missing_ok=True)
+        logger.info(f"Upload deduplicated against existing blob '{target}'")
+    else:
+        os.replace(tmp_path, target)
+    return target
+
+
+async def store_stream(chunks: AsyncIterator[bytes], filename: str) -> StoredBlob:
+    """
+    Streams chunks to disk while hashing them, enforcing MAX_UPLOAD_BYTES,
+    then stores the file under its SHA-256.
+    Disk writes run in a thread so the event loop is never blocked.
+    """
+    PARTIAL_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = PARTIAL_DIR / f"{uuid.uuid4()}.part"
+    sha = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge(f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit")
+                sha.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    digest = sha.hexdigest()
+    path = await asyncio.to_thread(_promote, tmp_path, digest, _file_suffix(filename))
+    return StoredBlob(digest=digest, size=size, path=str(path))
+
+
+async def iter_upload_file(file, chunk_size: int = UPLOAD_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Reads a FastAPI UploadFile in chunks."""
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+# --- Resumable chunked uploads ---
+# Each session is a '<id>.part' file plus a '<id>.json' sidecar, so uploads survive a restart.
+# The running SHA-256 is kept in memory and recomputed from the part file if it was lost.
+
+_hashers: dict[str, "hashlib._Hash"] = {}
+# Sessions with a chunk, completion or abort in progress
+_busy: set[str] = set()
+
+
+@contextmanager
+def _exclusive(upload_id: str):
+    """
+    Claims the session for one request from its offset check to its last write.
+    A second request while one is in flight is rejected rather than queued: two
+    appends at the same offset would both pass the check and both write.
+    """
+    if upload_id in _busy:
+        raise UploadBusy(upload_id)
+    _busy.add(upload_id)
+    try:
+        yield
+    finally:
+        _busy.discard(upload_id)
+
+
+def _session_paths(upload_id: str) -> tuple[Path, Path]:
+    # upload_id is used in a path: only accept the UUIDs we hand out
+    uuid.UUID(upload_id)
+    return PARTIAL_DIR / f"{upload_id}.part", PARTIAL_DIR / f"{upload_id}.json"
+
+
+def create_upload_session(filename: str, total_size: int | None) -> dict:
+    if total_size is not None and total_size > MAX_UPLOAD_BYTES:
+        raise UploadTooLarge(f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit")
+    PARTIAL_DIR.mkdir(parents=True, exist_ok=True)
+    upload_id = str(uuid.uuid4())
+    part_path, meta_path = _session_paths(upload_id)
+    part_path.touch()
+    meta = {"upload_id": upload_id, "filename": filename, "total_size": total_size}
+    meta_path.write_text(json.dumps(meta))
+    _hashers[upload_id] = hashlib.sha256()
+    return get_upload_session(upload_id)
+
+
+def get_upload_session(upload_id: str) -> dict | None:
+    try:
+        part_path, meta_path = _session_paths(upload_id)
+        meta = json.loads(meta_path.read_text())
+    except (ValueError, OSError):
+        return None
+    return {**meta, "offset": part_path.stat().st_size, "chunk_size": UPLOAD_CHUNK_BYTES}
+
+
+def _rehash(part_path: Path) -> "hashlib._Hash":
+    sha = hashlib.sha256()
+    with open(part_path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_BYTES), b""):
+            sha.update(chunk)
+    return sha
+
+
+async def append_upload_chunk(upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> dict:
+    """
+    Appends a chunk at `offset`. The offset must equal the bytes received so far,
+    so a client that lost a response can ask for the session and resume from there.
+    Raises UploadBusy while another request on the session is in flight.
+    """
+    with _exclusive(upload_id):
+        session = get_upload_session(upload_id)
+        if session is None:
+            raise FileNotFoundError(upload_id)
+        if offset != session["offset"]:
+            raise UploadOffsetMismatch(session["offset"])
+
+        part_path, _ = _session_paths(upload_id)
+        sha = _hashers.get(upload_id)
+        if sha is None:
+            sha = _hashers[upload_id] = await asyncio.to_thread(_rehash, part_path)
+
+        size = offset
+        with open(part_path, "ab") as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    # Drop the partial chunk; the session stays at its last good offset
+                    await asyncio.to_thread(out.truncate, offset)
+                    _hashers.pop(upload_id, None)
+                    raise UploadTooLarge(f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit")
+                sha.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+        return get_upload_session(upload_id)
+
+
+async def complete_upload_session(upload_id: str) -> tuple[StoredBlob, str]:
+    """
+    Moves a finished session into the content-addressed store. Returns (blob, original filename).
+    Raises UploadBusy while a chunk is still being written.
+    """
+    with _exclusive(upload_id):
+        session = get_upload_session(upload_id)
+        if session is None:
+            raise FileNotFoundError(upload_id)
+        if session["total_size"] is not None and session["offset"] != session["total_size"]:
+            raise UploadOffsetMismatch(session["offset"])
+
+        part_path, meta_path = _session_paths(upload_id)
+        sha = _hashers.pop(upload_id, None)
+        if sha is None:
+            sha = await asyncio.to_thread(_rehash, part_path)
+        digest = sha.hexdigest()
+        path = await asyncio.to_thread(_promote, part_path, digest, _file_suffix(session["filename"]))
+        meta_path.unlink(missing_ok=True)
+        return StoredBlob(digest=digest, size=session["offset"], path=str(path)), session["filename"]
+
+
+def abort_upload_session(upload_id: str) -> bool:
+    """Deletes the session; raises UploadBusy while a chunk is still being written."""
+    with _exclusive(upload_id):
+        session = get_upload_session(upload_id)
+        if session is None:
+            return False
+        _hashers.pop(upload_id, None)
+        for path in _session_paths(upload_id):
+            path.unlink(missing_ok=True)
+        return True
@@ -0,0 +1,248 @@
+import math
+import uuid
+import logging
+
+from sqlalchemy import case, delete, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.models.datasets import Dataset
+from backend.app.models.enums import EngineType
+from backend.app.models.experiments import Experiment
+from backend.app.models.summaries import SUMMARY_METRICS, ExperimentSummary
+
+logger = logging.getLogger(__name__)
+
+
+def cpu_set_label(cpus: list[int] | None) -> str:
+    """Sorted, range-compressed CPU list such as '0-3,8'; 'none' if the affinity is unknown."""
+    if not cpus:
+        return "none"
+    runs = []
+    for cpu in sorted(set(cpus)):
+        if runs and cpu == runs[-1][1] + 1:
+            runs[-1][1] = cpu
+        else:
+            runs.append([cpu, cpu])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in runs)
+
+
+def config_key(
+    batch_size: int | None,
+    intra_op_threads: int | None,
+    inter_op_threads: int | None,
+    num_rows: int | None = None,
+    engine: EngineType | None = None,
+    cpu_affinity: list[int] | None = None
+) -> str:
+    def part(value):
+        return "all" if value is None else str(value)
+    key = f"batch={part(batch_size)};intra={part(intra_op_threads)};inter={part(inter_op_threads)}"
+    # Only subset and non-eager runs carry these, so keys of plain eager runs are unchanged
+    if num_rows is not None:
+        key += f";rows={num_rows}"
+    if engine is not None and EngineType(engine) != EngineType.EAGER:
+        key += f";engine={EngineType(engine).value}"
+    # Runs pinned to different cores are different configurations
+    return key + f";cpus={cpu_set_label(cpu_affinity)}"
+
+
+def _group_conditions(dataset_id: str, precision, key: str) -> list:
+    return [
+        ExperimentSummary.dataset_id == dataset_id,
+        ExperimentSummary.precision == precision,
+        ExperimentSummary.config_key == key,
+    ]
+
+
+def _welford_update(prefix: str, value: float) -> dict:
+    """
+    SET clauses adding `value` to the running statistics of one metric.
+    All right-hand sides see the pre-update row, so the whole update is one
+    atomic statement and concurrent inserts cannot lose each other's values.
+    """
+    count = getattr(ExperimentSummary, f"{prefix}_count")
+    mean = getattr(ExperimentSummary, f"{prefix}_mean")
+    m2 = getattr(ExperimentSummary, f"{prefix}_m2")
+    minimum = getattr(ExperimentSummary, f"{prefix}_min")
+    maximum = getattr(ExperimentSummary, f"{prefix}_max")
+
+    x = literal(value)
+    old_mean = case((mean.is_(None), 0.0), else_=mean)
+    old_m2 = case((m2.is_(None), 0.0), else_=m2)
+    delta = x - old_mean
+    new_mean = old_mean + delta / ((count + 1) * 1.0)
+    return {
+        f"{prefix}_count": count + 1,
+        f"{prefix}_mean": new_mean,
+        f"{prefix}_m2": old_m2 + delta * (x - new_mean),
+        f"{prefix}_min": case((minimum.is_(None) | (x < minimum), x), else_=minimum),
+        f"{prefix}_max": case((maximum.is_(None) | (x > maximum), x), else_=maximum),
+    }
+
+
+def _insert_ignoring_conflicts(session: AsyncSession, values: dict):
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(ExperimentSummary).values(**values).on_conflict_do_nothing(
+        index_elements=["dataset_id", "precision", "config_key"]
+    )
+
+
+async def record_experiment(session: AsyncSession, experiment: Experiment):
+    """
+    Folds a newly inserted experiment into its group's summary row (creating the
+    row if needed). Runs in the caller's transaction; the caller commits.
+    """
+    ai_model = await session.scalar(select(Dataset.ai_model).where(Dataset.id == experiment.dataset_id))
+    key = config_key(
+        experiment.batch_size, experiment.intra_op_threads, experiment.inter_op_threads,
+        experiment.num_rows, experiment.engine, experiment.cpu_affinity
+    )
+
+    await session.execute(_insert_ignoring_conflicts(session, {
+        "id": str(uuid.uuid4()),
+        "dataset_id": experiment.dataset_id,
+        "ai_model": ai_model,
+        "precision": experiment.precision,
+        "config_key": key,
+        "batch_size": experiment.batch_size,
+        "num_rows": experiment.num_rows,
+        "engine": experiment.engine,
+        "intra_op_threads": experiment.intra_op_threads,
+        "inter_op_threads": experiment.inter_op_threads,
+        "cpu_affinity": sorted(set(experiment.cpu_affinity)) if experiment.cpu_affinity else None,
+    }))
+
+    values = {
+        "runs": ExperimentSummary.runs + 1,
+        "last_experiment_id": experiment.id,
+        "last_seen_at": experiment.created_at,
+    }
+    for prefix, column in SUMMARY_METRICS.items():
+        value = getattr(experiment, column)
+        if value is not None:
+            values.update(_welford_update(prefix, float(value)))
+    await session.execute(
+        update(ExperimentSummary)
+        .where(*_group_conditions(experiment.dataset_id, experiment.precision, key))
+        .values(**values)
+    )
+
+
+class _RunningStats:
+    """Python-side Welford accumulator, used when rebuilding summaries from raw rows."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+        self.min = None
+        self.max = None
+
+    def add(self, x: float):
+        self.count += 1
+        if self.count == 1:
+            self.mean, self.m2, self.min, self.max = x, 0.0, x, x
+            return
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+
+async def rebuild_summaries(session: AsyncSession, dataset_id: str | None = None) -> int:
+    """
+    Recomputes the summaries (of one dataset, or all) from the raw experiments,
+    streaming them in insertion order. Needed after deletions, which running
+    statistics cannot undo (min/max). Returns the number of groups; the caller commits.
+    """
+    delete_query = delete(ExperimentSummary)
+    query = (
+        select(
+            Experiment.id, Experiment.dataset_id, Dataset.ai_model, Experiment.precision,
+            Experiment.batch_size, Experiment.num_rows, Experiment.engine, Experiment.intra_op_threads, Experiment.inter_op_threads,
+            Experiment.cpu_affinity, Experiment.created_at, *(getattr(Experiment, column) for column in SUMMARY_METRICS.values()),
+        )
+        .join(Dataset, Dataset.id == Experiment.dataset_id)
+        .order_by(Experiment.created_at, Experiment.id)
+    )
+    if dataset_id is not None:
+        delete_query = delete_query.where(ExperimentSummary.dataset_id == dataset_id)
+        query = query.where(Experiment.dataset_id == dataset_id)
+    await session.execute(delete_query)
+
+    groups: dict[tuple, dict] = {}
+    stream = await session.stream(query.execution_options(yield_per=1000))
+    async for row in stream.mappings():
+        key = config_key(
+            row["batch_size"], row["intra_op_threads"], row["inter_op_threads"], row["num_rows"], row["engine"],
+            row["cpu_affinity"]
+        )
+        group = groups.get((row["dataset_id"], row["precision"], key))
+        if group is None:
+            group = groups[(row["dataset_id"], row["precision"], key)] = {
+                "row": ExperimentSummary(
+                    dataset_id=row["dataset_id"], ai_model=row["ai_model"], precision=row["precision"],
+                    config_key=key, batch_size=row["batch_size"], num_rows=row["num_rows"], engine=row["engine"],
+                    intra_op_threads=row["intra_op_threads"], inter_op_threads=row["inter_op_threads"],
+                    cpu_affinity=sorted(set(row["cpu_affinity"])) if row["cpu_affinity"] else None,
+                    runs=0,
+                ),
+                "stats": {prefix: _RunningStats() for prefix in SUMMARY_METRICS},
+            }
+        summary = group["row"]
+        summary.runs += 1
+        summary.last_experiment_id = row["id"]
+        summary.last_seen_at = row["created_at"]
+        for prefix, column in SUMMARY_METRICS.items():
+            if row[column] is not None:
+                group["stats"][prefix].add(float(row[column]))
+
+    for group in groups.values():
+        summary = group["row"]
+        for prefix, stats in group["stats"].items():
+            setattr(summary, f"{prefix}_count", stats.count)
+            setattr(summary, f"{prefix}_mean", stats.mean)
+            setattr(summary, f"{prefix}_m2", stats.m2)
+            setattr(summary, f"{prefix}_min", stats.min)
+            setattr(summary, f"{prefix}_max", stats.max)
+        session.add(summary)
+
+    logger.info(f"Rebuilt {len(groups)} experiment summaries" + (f" for dataset {dataset_id}" if dataset_id else ""))
+    return len(groups)
+
+
+def summary_payload(summary: ExperimentSummary) -> dict:
+    """The summary row with per-metric count/mean/variance/stddev/min/max."""
+    payload = {
+        "dataset_id": summary.dataset_id,
+        "ai_model": summary.ai_model,
+        "precision": summary.precision,
+        "config_key": summary.config_key,
+        "batch_size": summary.batch_size,
+        "num_rows": summary.num_rows,
+        "engine": summary.engine,
+        "intra_op_threads": summary.intra_op_threads,
+        "inter_op_threads": summary.inter_op_threads,
+        "cpu_affinity": summary.cpu_affinity,
+        "runs": summary.runs,
+        "last_experiment_id": summary.last_experiment_id,
+        "last_seen_at": summary.last_seen_at,
+    }
+    for prefix in SUMMARY_METRICS:
+        count = getattr(summary, f"{prefix}_count")
+        m2 = getattr(summary, f"{prefix}_m2")
+        variance = m2 / (count - 1) if count > 1 and m2 is not None else None
+        payload[prefix] = {
+            "count": count,
+            "mean": getattr(summary, f"{prefix}_mean"),
+            "variance": variance,
+            # Rounding can leave m2 a hair below zero for identical values
+            "stddev": math.sqrt(max(variance, 0.0)) if variance is not None else None,
+            "min": getattr(summary, f"{prefix}_min"),
+            "max": getattr(summary, f"{prefix}_max"),
+        }
+    return payload
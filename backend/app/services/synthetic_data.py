@@ -0,0 +1,122 @@
+import io
+import os
+import uuid
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+from backend.app.models.enums import ModelType
+from backend.app.services.dataset_cache import MODEL_INPUT_FEATURES
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Rows generated and written at a time; memory use is this times the row width
+SYNTHETIC_CHUNK_ROWS = int(os.getenv("SYNTHETIC_CHUNK_ROWS", "65536"))
+# Classes of the bundled models (MaintenanceMLP: 2, SimpleCNN: 10)
+SYNTHETIC_CLASSES = {ModelType.MLP: 2, ModelType.CNN: 10}
+
+
+@dataclass
+class SyntheticDataset:
+    path: str
+    rows: int
+    columns: int
+    # Column the labels are in (the first one), None if generated without labels
+    label_column: str | None
+    digest: str
+    size: int
+
+
+def _feature_chunk(rng: np.random.Generator, ai_model: ModelType, rows: int) -> np.ndarray:
+    features = MODEL_INPUT_FEATURES[ai_model]
+    if ai_model == ModelType.CNN:
+        # Raw 0-255 pixel values, like the MNIST-style CSVs the CNN service scales itself
+        return rng.integers(0, 256, size=(rows, features)).astype("<f4")
+    return rng.standard_normal((rows, features), dtype=np.float32)
+
+
+def _chunks(ai_model: ModelType, rows: int, labels: bool, seed: int | None, chunk_rows: int):
+    """Row blocks of the dataset, the label (if any) as the first column."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunk_rows):
+        count = min(chunk_rows, rows - start)
+        block = _feature_chunk(rng, ai_model, count)
+        if labels:
+            classes = rng.integers(0, SYNTHETIC_CLASSES[ai_model], size=(count, 1)).astype("<f4")
+            block = np.hstack([classes, block])
+        yield block
+
+
+def generate_dataset(
+    path: str,
+    ai_model: ModelType,
+    rows: int,
+    labels: bool = False,
+    seed: int | None = None,
+    chunk_rows: int = SYNTHETIC_CHUNK_ROWS
+) -> SyntheticDataset:
+    """
+    Writes a random dataset the model can run on, SYNTHETIC_CHUNK_ROWS rows at a
+    time, so its size is bounded by the disk rather than memory. A .npy path gets
+    a float32 matrix, the format experiments load: without labels it is used in
+    place, with no conversion. Any other path gets a CSV. The file is written
+    under a temporary name and renamed when complete.
+    """
+    ai_model = ModelType(ai_model)
+    if rows <= 0:
+        raise ValueError("rows must be positive")
+    target = Path(path)
+    columns = MODEL_INPUT_FEATURES[ai_model] + labels
+    is_npy = target.suffix.lower() == ".npy"
+    tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:12]}.tmp")
+    sha = hashlib.sha256()
+
+    logger.info(f"Generating {rows} x {columns} {ai_model.value} dataset at '{target}'")
+    try:
+        with open(tmp_path, "wb") as out:
+            def write(data: bytes):
+                sha.update(data)
+                out.write(data)
+
+            if is_npy:
+                # The header only needs the final shape, so it goes first and rows are appended
+                header = io.BytesIO()
+                np.lib.format.write_array_header_1_0(
+                    header, {"descr": "<f4", "fortran_order": False, "shape": (rows, columns)}
+                )
+                write(header.getvalue())
+            else:
+                names = (["label"] if labels else []) + [f"feature_{i}" for i in range(MODEL_INPUT_FEATURES[ai_model])]
+                write((",".join(names) + "\n").encode())
+                # Pixels and labels are whole numbers
+                fmt = "%d" if ai_model == ModelType.CNN else ["%d"] * labels + ["%.7g"] * MODEL_INPUT_FEATURES[ai_model]
+
+            for block in _chunks(ai_model, rows, labels, seed, chunk_rows):
+                if is_npy:
+                    write(np.ascontiguousarray(block).tobytes())
+                else:
+                    text = io.StringIO()
+                    np.savetxt(text, block, fmt=fmt, delimiter=",")
+                    write(text.getvalue().encode())
+        os.replace(tmp_path, target)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    size = target.stat().st_size
+    logger.info(f"Generated '{target}': {rows} rows, {size / 1024 ** 2:.1f} MB")
+    return SyntheticDataset(
+        path=str(target),
+        rows=rows,
+        columns=columns,
+        label_column=("0" if is_npy else "label") if labels else None,
+        digest=sha.hexdigest(),
+        size=size,
+    )
+
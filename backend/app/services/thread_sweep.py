@@ -0,0 +1,106 @@
+import os
+import logging
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+from backend.app.services.experiment_service import ExperimentSpec, run_measurement
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Each point costs a process start plus a model load, so sweeps are capped
+THREAD_SWEEP_MAX_POINTS = int(os.getenv("THREAD_SWEEP_MAX_POINTS", "64"))
+# Guards against ranges like '0-1000000000' being expanded
+MAX_CPU_RANGE = 4096
+
+
+@dataclass
+class ThreadSetting:
+    """One point of a thread sweep. cpus=None leaves the process affinity unchanged."""
+    intra_op_threads: int
+    inter_op_threads: int
+    cpus: list[int] | None = None
+
+
+def parse_cpu_set(text: str) -> list[int] | None:
+    """
+    Parses a Linux-style CPU list such as '0-3,8,10-11'.
+    'all' (or an empty string) means no affinity restriction.
+    """
+    text = text.strip().lower()
+    if text in ("", "all"):
+        return None
+    cpus = set()
+    for part in text.split(","):
+        if "-" in part:
+            first, last = part.split("-", 1)
+            first, last = int(first), int(last)
+            if first > last or last - first > MAX_CPU_RANGE:
+                raise ValueError(f"Invalid CPU range '{part}'")
+            cpus.update(range(first, last + 1))
+        else:
+            cpus.add(int(part))
+    if any(cpu < 0 for cpu in cpus):
+        raise ValueError(f"Invalid CPU set '{text}'")
+    return sorted(cpus)
+
+
+def available_cpus() -> set[int] | None:
+    """The cores this process may run on, or None where affinity is unsupported."""
+    if not hasattr(os, "sched_getaffinity"):
+        return None
+    return os.sched_getaffinity(0)
+
+
+def apply_thread_setting(setting: ThreadSetting):
+    """
+    Pins the current process and sizes torch's thread pools. Call it in a new
+    process, before any torch work: torch only accepts the inter-op thread count
+    before its first parallel work.
+    """
+    import torch
+
+    if setting.cpus is not None:
+        os.sched_setaffinity(0, setting.cpus)
+    torch.set_num_threads(setting.intra_op_threads)
+    torch.set_num_interop_threads(setting.inter_op_threads)
+    logger.info(
+        f"Thread setting: intra={setting.intra_op_threads} inter={setting.inter_op_threads} "
+        f"cpus={setting.cpus if setting.cpus is not None else 'all'}"
+    )
+
+
+def run_thread_point(spec: ExperimentSpec, setting: ThreadSetting) -> dict:
+    """
+    Fresh-process entry point: applies the thread setting, then measures one run.
+    The process starts with an empty model cache, so the model is built (INT8_STATIC
+    recalibrated) and run once before the meter starts; no point is charged for setup.
+    """
+    apply_thread_setting(setting)
+    return run_measurement(spec, warm=True)
+
+
+def pareto_front(points: list[dict], minimize: tuple[str, ...], maximize: tuple[str, ...] = ()) -> list[int]:
+    """
+    Indices of the points no other point dominates, i.e. is at least as good on
+    every objective and strictly better on one. Points missing an objective are skipped.
+    """
+    def objectives(point: dict) -> tuple[float, ...] | None:
+        values = [point.get(key) for key in minimize]
+        # Negated, so every objective is minimized
+        values += [None if point.get(key) is None else -point[key] for key in maximize]
+        return None if any(v is None for v in values) else tuple(values)
+
+    scored = [(i, objectives(p)) for i, p in enumerate(points)]
+    scored = [(i, o) for i, o in scored if o is not None]
+    front = []
+    for i, a in scored:
+        dominated = any(
+            all(x <= y for x, y in zip(b, a)) and any(x < y for x, y in zip(b, a))
+            for j, b in scored if j != i
+        )
+        if not dominated:
+            front.append(i)
+    return front
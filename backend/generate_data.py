@@ -0,0 +1,91 @@
+"""
+Generates synthetic datasets of any size for the MLP or CNN, chunk by chunk.
+
+    python -m backend.generate_data mlp_1m.npy --model MLP --rows 1m
+    python -m backend.generate_data cnn.csv --model CNN --rows 10000 --labels
+    python -m backend.generate_data mlp_10m.npy --rows 10m --register "10M random rows"
+
+A .npy file is written in the binary format experiments load; without --labels
+it is used in place, so even very large files need no conversion. --register
+adds the file as a dataset in the configured database without uploading it
+(the dataset then refers to the file where it is; keep it there).
+"""
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from backend.app.core.logging import setup_logging, shutdown_logging
+from backend.app.models.enums import ModelType
+from backend.app.services.scaling_service import parse_row_counts
+from backend.app.services.synthetic_data import SYNTHETIC_CHUNK_ROWS, SyntheticDataset, generate_dataset
+
+load_dotenv()
+
+logger = logging.getLogger("backend.generate_data")
+
+
+async def register_dataset(generated: SyntheticDataset, ai_model: ModelType, description: str) -> str:
+    """Profiles the file (building its cache) and adds it as a dataset. Returns the dataset ID."""
+    from backend.app.database.db import async_session_maker, create_db_and_tables, engine
+    from backend.app.models.datasets import Dataset
+    from backend.app.services.dataset_cache import build_dataset_cache, dataset_profile_values
+
+    meta = await asyncio.to_thread(build_dataset_cache, generated.path, ai_model, generated.label_column)
+    try:
+        await create_db_and_tables()
+        async with async_session_maker() as session:
+            dataset = Dataset(
+                filename=Path(generated.path).name,
+                filepath=generated.path,
+                content_hash=generated.digest,
+                size_bytes=generated.size,
+                description=description,
+                ai_model=ai_model,
+                label_column=generated.label_column,
+                **dataset_profile_values(meta)
+            )
+            session.add(dataset)
+            await session.commit()
+            return dataset.id
+    finally:
+        await engine.dispose()
+
+
+def main(args) -> int:
+    try:
+        rows = parse_row_counts([args.rows])
+        if len(rows) != 1:
+            raise ValueError("--rows takes a single row count")
+        ai_model = ModelType(args.model.upper())
+        generated = generate_dataset(
+            str(args.output.resolve()), ai_model, rows[0], labels=args.labels, seed=args.seed, chunk_rows=args.chunk_rows
+        )
+    except ValueError as e:
+        logger.error(f"Invalid arguments: {e}")
+        return 2
+    if args.register is not None:
+        dataset_id = asyncio.run(register_dataset(generated, ai_model, args.register))
+        logger.info(f"Registered '{generated.path}' as dataset {dataset_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic MLP or CNN dataset")
+    parser.add_argument("output", type=Path, help="File to write: .npy (binary) or .csv")
+    parser.add_argument("--model", default=ModelType.MLP.value, help="MLP (512 features) or CNN (784 pixels)")
+    parser.add_argument("--rows", default="5000", help="Row count, e.g. 5000, 100k or 1m")
+    parser.add_argument("--labels", action="store_true", help="Add random class labels as the first column")
+    parser.add_argument("--seed", type=int, help="Seed, for reproducible data")
+    parser.add_argument("--chunk-rows", type=int, default=SYNTHETIC_CHUNK_ROWS, help="Rows generated at a time")
+    parser.add_argument("--register", metavar="DESCRIPTION", help="Also add the file as a dataset")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        exit_code = main(args)
+    finally:
+        shutdown_logging()
+    raise SystemExit(exit_code)
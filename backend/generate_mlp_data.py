@@ -1,22 +1,15 @@
-import pandas as pd
-import numpy as np
+from backend.app.models.enums import ModelType
+from backend.app.services.synthetic_data import generate_dataset
 
 def create_mlp_dataset():
     print("Generating MLP-compatible dataset...")
-    rows = 5000  
-    cols = 512   
-    
-    
-    data = np.random.randn(rows, cols).astype(np.float32)
-    
-    
-    col_names = [f"feature_{i}" for i in range(cols)]
-    
-    df = pd.DataFrame(data, columns=col_names)
-    
+    rows = 5000
+    cols = 512
+
+    # Written in chunks; see backend/generate_data.py for larger or binary datasets
     filename = "maintenance_data.csv"
-    df.to_csv(filename, index=False)
+    generate_dataset(filename, ModelType.MLP, rows)
     print(f"Created '{filename}' with shape ({rows}, {cols})")
 
 if __name__ == "__main__":
-    create_mlp_dataset()
\ No newline at end of file
+    create_mlp_dataset()
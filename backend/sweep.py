@@ -0,0 +1,279 @@
+"""
+Headless grid sweeps: runs every (dataset, precision, batch size, thread setting,
+repetition) point of a sweep spec through the experiment measurement path and
+writes each result straight to the database, without the HTTP layer.
+
+    python -m backend.sweep sweep.json            # run, or resume an interrupted run
+    python -m backend.sweep sweep.json --dry-run  # count points and what is left
+
+Progress is checkpointed after every saved point, in <spec>.progress.jsonl by
+default; re-running the same command skips completed points and retries failed ones.
+
+Spec (JSON):
+    {
+        "name": "overnight",
+        "datasets": ["<dataset id>", ...] or "all",
+        "models": ["CNN", "MLP"],                  # optional, filters the datasets
+        "precisions": ["FP32", "INT8"],
+        "engines": ["EAGER", "ONNXRUNTIME"],       # optional, default eager only
+        "batch_sizes": [null, 64, 256],            # null = whole dataset at once
+        "intra_op_threads": [1, 4],                # optional; with inter_op_threads and
+        "inter_op_threads": [1],                   # cpu_sets, each setting runs in its own
+        "cpu_sets": ["all", "0-3"],                # worker process
+        "repetitions": 3
+    }
+"""
+import os
+import json
+import asyncio
+import logging
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from backend.app.core.logging import setup_logging, setup_worker_logging, shutdown_logging, worker_log_queue
+from backend.app.database.db import async_session_maker, create_db_and_tables, engine
+from backend.app.models.datasets import Dataset
+from backend.app.models.enums import EngineType, ModelType, PrecisionType
+from backend.app.services.experiment_service import ExperimentSpec, run_measurement, save_experiment
+from backend.app.services.inference_engine import ENGINE_PRECISIONS, check_engine
+from backend.app.services.model_factory import ModelFactory
+from backend.app.services.thread_sweep import ThreadSetting, apply_thread_setting, available_cpus, parse_cpu_set
+
+load_dotenv()
+
+logger = logging.getLogger("backend.sweep")
+
+
+@dataclass
+class SweepPoint:
+    dataset_id: str
+    precision: str
+    batch_size: int | None
+    setting: ThreadSetting | None
+    repetition: int
+    engine: str = EngineType.EAGER.value
+
+    @property
+    def setting_key(self) -> str:
+        if self.setting is None:
+            return "default"
+        cpus = "all" if self.setting.cpus is None else ",".join(map(str, self.setting.cpus))
+        return f"intra={self.setting.intra_op_threads};inter={self.setting.inter_op_threads};cpus={cpus}"
+
+    @property
+    def key(self) -> str:
+        batch = "all" if self.batch_size is None else self.batch_size
+        # Eager keys carry no engine, so checkpoints written before engines existed still match
+        precision = self.precision if self.engine == EngineType.EAGER.value else f"{self.engine}:{self.precision}"
+        return f"{self.dataset_id}|{precision}|batch={batch}|{self.setting_key}|rep={self.repetition}"
+
+
+def load_sweep_spec(path: Path) -> dict:
+    """Reads and validates a sweep spec. Raises ValueError."""
+    spec = json.loads(path.read_text())
+    if not spec.get("datasets"):
+        raise ValueError("'datasets' must list dataset IDs or be 'all'")
+    if not spec.get("precisions"):
+        raise ValueError("'precisions' must list at least one precision")
+    spec["precisions"] = [PrecisionType(p.upper()).value for p in spec["precisions"]]
+    spec["models"] = [ModelType(m.upper()).value for m in spec.get("models") or []]
+    spec["engines"] = [EngineType(e.upper()).value for e in spec.get("engines") or [EngineType.EAGER.value]]
+    for engine in spec["engines"]:
+        # Fails early if the engine is not installed
+        check_engine(engine, PrecisionType.FP32)
+    spec["batch_sizes"] = spec.get("batch_sizes") or [None]
+    if any(size is not None and size <= 0 for size in spec["batch_sizes"]):
+        raise ValueError("Batch sizes must be positive (or null for the whole dataset)")
+    spec["repetitions"] = int(spec.get("repetitions", 1))
+    if spec["repetitions"] < 1:
+        raise ValueError("'repetitions' must be at least 1")
+
+    if spec.get("intra_op_threads"):
+        threads = spec["intra_op_threads"] + spec.get("inter_op_threads", [1])
+        if any(n <= 0 for n in threads):
+            raise ValueError("Thread counts must be positive")
+        cpu_choices = [parse_cpu_set(text) for text in spec.get("cpu_sets", ["all"])]
+        allowed = available_cpus()
+        for cpus in cpu_choices:
+            if cpus is not None and (allowed is None or not set(cpus) <= allowed):
+                raise ValueError(f"CPU set {cpus[:16]} is not available on this machine")
+        spec["settings"] = [
+            ThreadSetting(intra, inter, cpus)
+            for cpus in cpu_choices
+            for intra in spec["intra_op_threads"]
+            for inter in spec.get("inter_op_threads", [1])
+        ]
+    else:
+        spec["settings"] = [None]
+    return spec
+
+
+def build_points(spec: dict, datasets: list[Dataset]) -> list[SweepPoint]:
+    """
+    Expands the grid. Thread settings are outermost, so each worker process serves
+    one contiguous block; within a block repetitions are interleaved (every point
+    once, then again) so slow drift does not bias one configuration.
+    Precisions a dataset's model or an engine does not support are skipped.
+    """
+    points = []
+    for setting in spec["settings"]:
+        for repetition in range(spec["repetitions"]):
+            for dataset in datasets:
+                supported = ModelFactory.get_service_class(dataset.ai_model).supported_precisions
+                for engine in spec["engines"]:
+                    runnable = set(supported) & set(ENGINE_PRECISIONS[EngineType(engine)])
+                    for precision in spec["precisions"]:
+                        if PrecisionType(precision) not in runnable:
+                            continue
+                        for batch_size in spec["batch_sizes"]:
+                            points.append(SweepPoint(dataset.id, precision, batch_size, setting, repetition, engine))
+    return points
+
+
+def load_checkpoint(path: Path) -> set[str]:
+    """Keys of the points already saved."""
+    done = set()
+    if path.exists():
+        for line in path.read_text().splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn last line from a hard kill
+                continue
+            if entry.get("status") == "done":
+                done.add(entry["key"])
+    return done
+
+
+def _record(progress, point: SweepPoint, status: str, **extra):
+    progress.write(json.dumps({"key": point.key, "status": status, "at": datetime.utcnow().isoformat(), **extra}) + "\n")
+    progress.flush()
+    os.fsync(progress.fileno())
+
+
+def _init_worker(log_queue, setting: ThreadSetting | None):
+    setup_worker_logging(log_queue)
+    if setting is not None:
+        apply_thread_setting(setting)
+
+
+def _new_worker(setting: ThreadSetting | None) -> ProcessPoolExecutor:
+    # One process per thread setting: torch's inter-op pool size is fixed once set
+    return ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(worker_log_queue(), setting),
+    )
+
+
+async def _select_datasets(spec: dict) -> list[Dataset]:
+    async with async_session_maker() as session:
+        query = select(Dataset).order_by(Dataset.created_at)
+        if spec["datasets"] != "all":
+            query = query.where(Dataset.id.in_(spec["datasets"]))
+        datasets = list((await session.execute(query)).scalars())
+    if spec["datasets"] != "all":
+        missing = set(spec["datasets"]) - {d.id for d in datasets}
+        if missing:
+            raise ValueError(f"Unknown dataset ID(s): {sorted(missing)}")
+    if spec["models"]:
+        datasets = [d for d in datasets if d.ai_model.value in spec["models"]]
+    for dataset in datasets:
+        if dataset.validation_error:
+            logger.warning(f"Skipping dataset {dataset.id}: {dataset.validation_error}")
+    return [d for d in datasets if not d.validation_error]
+
+
+async def run_sweep(spec: dict, checkpoint: Path, dry_run: bool = False) -> int:
+    """Runs the points not yet in `checkpoint`. Returns the number of failed points."""
+    await create_db_and_tables()
+    datasets = {dataset.id: dataset for dataset in await _select_datasets(spec)}
+    points = build_points(spec, list(datasets.values()))
+    done = load_checkpoint(checkpoint)
+    remaining = [point for point in points if point.key not in done]
+    logger.info(
+        f"Sweep '{spec.get('name', checkpoint.stem)}': {len(points)} points over {len(datasets)} dataset(s), "
+        f"{len(points) - len(remaining)} already done, {len(remaining)} to run"
+    )
+    if dry_run or not remaining:
+        return 0
+
+    loop = asyncio.get_running_loop()
+    failures = 0
+    completed = len(points) - len(remaining)
+    with open(checkpoint, "a") as progress:
+        for _, block in itertools.groupby(remaining, key=lambda p: p.setting_key):
+            block = list(block)
+            worker = _new_worker(block[0].setting)
+            try:
+                for point in block:
+                    completed += 1
+                    dataset = datasets[point.dataset_id]
+                    experiment_spec = ExperimentSpec.from_dataset(
+                        dataset, point.precision, point.batch_size, engine=point.engine
+                    )
+                    try:
+                        measurement = await loop.run_in_executor(worker, run_measurement, experiment_spec)
+                        async with async_session_maker() as session:
+                            experiment = await save_experiment(session, point.dataset_id, measurement)
+                    except Exception as e:
+                        failures += 1
+                        logger.error(f"[{completed}/{len(points)}] {point.key} failed: {e}")
+                        _record(progress, point, "failed", error=str(e))
+                        if isinstance(e, BrokenProcessPool):
+                            worker.shutdown(wait=False, cancel_futures=True)
+                            worker = _new_worker(point.setting)
+                        continue
+                    # Saved before checkpointed: an interruption in between re-runs the point
+                    _record(progress, point, "done", experiment_id=experiment.id)
+                    logger.info(
+                        f"[{completed}/{len(points)}] {dataset.ai_model.value} {point.key}: "
+                        f"{experiment.latency_seconds:.6f} s, {experiment.energy_consumed_kwh:.3e} kWh"
+                    )
+            finally:
+                worker.shutdown(wait=False, cancel_futures=True)
+    logger.info(f"Sweep finished: {len(points) - failures} of {len(points)} points saved, {failures} failed")
+    return failures
+
+
+async def _main(args) -> int:
+    try:
+        spec = load_sweep_spec(args.spec)
+        checkpoint = args.checkpoint or args.spec.with_name(args.spec.name + ".progress.jsonl")
+        if args.fresh and checkpoint.exists():
+            checkpoint.unlink()
+        return await run_sweep(spec, checkpoint, args.dry_run)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a resumable grid sweep of experiments")
+    parser.add_argument("spec", type=Path, help="Sweep spec (JSON)")
+    parser.add_argument("--checkpoint", type=Path, help="Progress file (default: <spec>.progress.jsonl)")
+    parser.add_argument("--fresh", action="store_true", help="Ignore earlier progress and start over")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the points and what is left")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        exit_code = 1 if asyncio.run(_main(args)) else 0
+    except KeyboardInterrupt:
+        logger.warning("Sweep interrupted; run the same command again to resume")
+        exit_code = 130
+    except ValueError as e:
+        logger.error(f"Invalid sweep: {e}")
+        exit_code = 2
+    finally:
+        shutdown_logging()
+    raise SystemExit(exit_code)
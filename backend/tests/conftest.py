@@ -0,0 +1,29 @@
+import os
+import logging
+import tempfile
+
+import pytest
+
+# The app reads its settings at import time; point it at a scratch directory
+# before any test module imports it
+_scratch = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_scratch}/test.db")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_scratch, "uploads"))
+os.environ.setdefault("LOG_DIR", os.path.join(_scratch, "logs"))
+os.environ.setdefault("MODEL_CACHE_DIR", os.path.join(_scratch, "model_cache"))
+os.environ.setdefault("CALIBRATION_FILE", os.path.join(_scratch, "calibration.json"))
+
+
+@pytest.fixture
+def app_log_writer():
+    """For tests that start the app's log writer (e.g. through a worker pool); stops it afterwards."""
+    from backend.app.core import logging as app_logging
+
+    yield
+    app_logging.shutdown_logging()
+    # Detach the sinks, whose stdout is pytest's capture and closes with the session
+    root = logging.getLogger()
+    for handler in app_logging._handlers:
+        root.removeHandler(handler)
+        handler.close()
+    app_logging._handlers.clear()
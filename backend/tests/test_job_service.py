@@ -0,0 +1,42 @@
+import time
+import asyncio
+from pathlib import Path
+
+from backend.app.models.enums import JobStatus
+from backend.app.services.job_service import JobContext, JobManager
+
+
+def slow_step(marker: str, seconds: float) -> str:
+    Path(marker + ".started").touch()
+    time.sleep(seconds)
+    Path(marker + ".finished").touch()
+    return "done"
+
+
+def test_cancel_waits_for_the_running_worker(tmp_path, app_log_writer):
+    marker = str(tmp_path / "step")
+
+    async def main():
+        manager = JobManager(max_workers=1)
+        manager.start()
+        try:
+            async def runner(ctx: JobContext):
+                await ctx.run_in_worker(slow_step, marker, 1.0)
+                await ctx.run_in_worker(slow_step, marker + "-never", 0)
+
+            job = manager.submit("slow", runner)
+            while not Path(marker + ".started").exists():
+                await asyncio.sleep(0.05)
+
+            await manager.cancel(job.id)
+            # The worker cannot be stopped mid-step: the job says so until it is free
+            assert job.status == JobStatus.CANCELLING
+            await job.task
+            return job
+        finally:
+            await manager.shutdown()
+
+    job = asyncio.run(main())
+    assert job.status == JobStatus.CANCELLED
+    assert Path(marker + ".finished").exists()
+    assert not Path(marker + "-never.started").exists()
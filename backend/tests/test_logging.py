@@ -0,0 +1,33 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.app.core import logging as app_logging
+
+WORKER_LOGGER = "tests.worker"
+RECORDS = 500
+
+
+def emit_records(count: int) -> int:
+    logger = logging.getLogger(WORKER_LOGGER)
+    for i in range(count):
+        logger.info(f"record {i}")
+    return count
+
+
+def test_worker_records_go_through_the_budget(app_log_writer):
+    log_queue = app_logging.worker_log_queue()
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=app_logging.setup_worker_logging,
+        initargs=(log_queue,),
+    ) as pool:
+        assert pool.submit(emit_records, RECORDS).result() == RECORDS
+    # Stops the listeners once they have written out everything queued
+    app_logging.shutdown_logging()
+
+    counters = app_logging.log_stats()["loggers"][WORKER_LOGGER]
+    assert counters.passed + counters.dropped_sampled + counters.dropped_over_budget == RECORDS
+    # A burst well past LOG_BUDGET_BURST within a second is mostly over budget
+    assert counters.dropped_over_budget > 0
@@ -0,0 +1,70 @@
+import numpy as np
+import torch
+
+from backend.app.models.enums import ModelType
+from backend.app.services.base_model import BaseAIModel
+from backend.app.services.benchmark import BenchmarkConfig
+from backend.app.services.dataset_cache import DatasetArrays
+from backend.app.services.metrics import ClassificationMetrics
+
+
+class TinyModelService(BaseAIModel):
+    model_type = ModelType.MLP
+    model_path = ""
+    num_classes = 3
+
+    def load_model(self):
+        raise NotImplementedError
+
+
+def test_top_k_is_left_out_when_it_covers_every_class():
+    logits = torch.tensor([[0.1, 0.9], [0.8, 0.2]])
+    labels = torch.tensor([0, 0])
+
+    metrics = ClassificationMetrics(num_classes=2, top_k=2)
+    metrics.update(logits, labels)
+    assert metrics.accuracy == 0.5
+    assert metrics.top_k is None and metrics.top_k_accuracy is None
+    assert metrics.result()["top_k_accuracy"] is None
+
+    metrics = ClassificationMetrics(num_classes=3, top_k=2)
+    metrics.update(torch.tensor([[0.5, 0.3, 0.2], [0.1, 0.3, 0.6]]), torch.tensor([1, 1]))
+    assert metrics.top_k_accuracy == 1.0
+
+
+class SpyMetrics(ClassificationMetrics):
+    """Records how many forward passes had run whenever a batch was scored."""
+
+    def __init__(self, num_classes: int, calls: list):
+        super().__init__(num_classes)
+        self.calls = calls
+        self.calls_when_scored = []
+
+    def update(self, logits, labels):
+        self.calls_when_scored.append(len(self.calls))
+        super().update(logits, labels)
+
+
+def test_scoring_happens_after_the_timed_passes():
+    rows = 10
+    labels = np.arange(rows, dtype=np.int64) % 3
+    # One-hot rows, so an identity "model" predicts every label
+    data = DatasetArrays(features=np.eye(3, dtype=np.float32)[labels], labels=labels)
+    calls = []
+
+    def model(x):
+        calls.append(len(x))
+        return x
+
+    service = TinyModelService()
+    config = BenchmarkConfig(warmup_iterations=1, min_iterations=3, max_iterations=3)
+    for batch_size in (None, 4):
+        calls.clear()
+        metrics = SpyMetrics(service.num_classes, calls)
+        service.benchmark_passes(model, data, batch_size, metrics, config)
+
+        # Every forward pass ran before the first batch was scored
+        assert metrics.calls_when_scored and set(metrics.calls_when_scored) == {len(calls)}
+        # One timed pass was scored, batch by batch, against the matching labels
+        assert metrics.samples == rows
+        assert metrics.accuracy == 1.0
@@ -0,0 +1,45 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+from backend.app.services.model_cache import ModelCache
+
+
+def test_build_does_not_block_other_keys(tmp_path):
+    cache = ModelCache(max_bytes=1 << 30, cache_dir=tmp_path)
+    release = threading.Event()
+
+    def slow_build():
+        release.wait(timeout=10)
+        return torch.nn.Linear(4, 2)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        slow = pool.submit(cache.fetch, ("MLP", "a", "FP32"), slow_build, None, False)
+        # Built and returned while the other key's build is still in progress
+        model, hit = cache.fetch(("MLP", "b", "FP32"), lambda: torch.nn.Linear(4, 2), persist=False)
+        assert isinstance(model, torch.nn.Linear) and not hit
+        assert not slow.done()
+        release.set()
+        slow.result()
+
+
+def test_concurrent_requests_for_one_key_build_once(tmp_path):
+    cache = ModelCache(max_bytes=1 << 30, cache_dir=tmp_path)
+    builds = []
+    start = threading.Barrier(4)
+
+    def build():
+        builds.append(1)
+        return torch.nn.Linear(4, 2)
+
+    def fetch():
+        start.wait()
+        return cache.fetch(("MLP", "a", "INT8"), build, persist=False)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = [f.result() for f in [pool.submit(fetch) for _ in range(4)]]
+
+    assert len(builds) == 1
+    assert len({id(model) for model, _ in results}) == 1
+    assert sorted(hit for _, hit in results) == [False, True, True, True]
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from backend.app.services import result_sink as sink_module
+from backend.app.services.result_sink import ResultSink, ResultSinkError
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+
+def _measurement() -> dict:
+    return {"precision": "FP32", "energy_consumed_kwh": 1e-6, "latency_seconds": 0.1, "num_samples": 10}
+
+
+def _run_with_persist(monkeypatch, persist, scenario):
+    monkeypatch.setattr(sink_module, "persist_experiments", persist)
+
+    async def main():
+        sink = ResultSink(session_maker=FakeSession, batch_size=100, flush_interval=60)
+        sink.start()
+        try:
+            return await scenario(sink)
+        finally:
+            await sink.close()
+
+    return asyncio.run(main())
+
+
+def test_flush_retries_a_row_that_failed_once(monkeypatch):
+    saved, failures = [], {"left": 1}
+
+    async def persist(session, rows):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise RuntimeError("database is locked")
+        saved.extend(experiment.id for experiment, _ in rows)
+
+    async def scenario(sink):
+        experiment = sink.submit("dataset", _measurement())
+        await sink.flush([experiment])
+        return experiment
+
+    experiment = _run_with_persist(monkeypatch, persist, scenario)
+    assert saved == [experiment.id]
+
+
+def test_flush_raises_and_keeps_rows_that_never_save(monkeypatch):
+    saved = []
+
+    async def persist(session, rows):
+        if any(experiment.num_samples < 0 for experiment, _ in rows):
+            raise RuntimeError("constraint failed")
+        saved.extend(experiment.id for experiment, _ in rows)
+
+    async def scenario(sink):
+        good = sink.submit("dataset", _measurement())
+        bad = sink.submit("dataset", {**_measurement(), "num_samples": -1})
+        with pytest.raises(ResultSinkError) as error:
+            await sink.flush([good, bad])
+        # Another job's flush does not fail for rows it did not submit
+        await sink.flush([good])
+        return good, bad, error.value, dict(sink.dead_letters)
+
+    good, bad, error, dead_letters = _run_with_persist(monkeypatch, persist, scenario)
+    assert saved == [good.id]
+    assert list(error.failed) == [bad.id]
+    assert list(dead_letters) == [bad.id]
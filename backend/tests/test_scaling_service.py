@@ -0,0 +1,52 @@
+import pytest
+
+from backend.app.models.experiments import Experiment
+from backend.app.services.energy_meter import JOULES_PER_KWH
+from backend.app.services.scaling_service import pass_cost, summarize_scaling
+
+# Warmup plus timed passes the meter covers in every run below
+PASSES = 4
+
+
+def _run(num_rows: int, gross_joules: float, net_joules: float, below_resolution: bool = False) -> Experiment:
+    return Experiment(
+        id=f"run-{num_rows}-{gross_joules}",
+        num_rows=num_rows,
+        num_samples=num_rows * PASSES,
+        latency_seconds=1e-3 + 1e-6 * num_rows,
+        energy_consumed_kwh=gross_joules / JOULES_PER_KWH,
+        net_energy_kwh=net_joules / JOULES_PER_KWH,
+        net_energy_below_resolution=below_resolution,
+    )
+
+
+def test_pass_cost_divides_by_the_passes_metered():
+    _, joules = pass_cost(_run(1000, 8.0, 4.0), 1000, "gross")
+    assert joules == pytest.approx(8.0 / PASSES)
+    assert pass_cost(_run(1000, 8.0, 4.0), 1000, "net")[1] == pytest.approx(4.0 / PASSES)
+
+
+def test_zero_net_energy_falls_back_to_gross():
+    # Net energy floored at zero (e.g. short runs, or the fake meter) must not fit as zero cost
+    trials = {
+        n: [_run(n, PASSES * (0.5 + 0.002 * n), 0.0, below_resolution=True)]
+        for n in (1000, 10_000, 100_000)
+    }
+    summary = summarize_scaling(trials, predict_rows=[1_000_000])
+
+    assert summary["energy_basis"] == "gross"
+    assert summary["energy"]["fixed"] == pytest.approx(0.5)
+    assert summary["energy"]["per_sample"] == pytest.approx(0.002)
+    assert summary["energy"]["r_squared"] == pytest.approx(1.0)
+    assert summary["predictions"][0]["energy_joules"] == pytest.approx(0.5 + 0.002 * 1_000_000)
+
+
+def test_one_unusable_net_figure_moves_every_trial_to_gross():
+    trials = {
+        1000: [_run(1000, 8.0, 4.0)],
+        10_000: [_run(10_000, 40.0, 0.0)],
+    }
+    assert summarize_scaling(trials)["energy_basis"] == "gross"
+
+    trials[10_000] = [_run(10_000, 40.0, 20.0)]
+    assert summarize_scaling(trials)["energy_basis"] == "net"
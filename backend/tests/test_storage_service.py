@@ -0,0 +1,43 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from backend.app.services.storage_service import (
+    UploadBusy,
+    append_upload_chunk,
+    complete_upload_session,
+    create_upload_session,
+)
+
+
+def test_second_chunk_in_flight_is_rejected():
+    async def main():
+        upload_id = create_upload_session("data.csv", 6)["upload_id"]
+        release = asyncio.Event()
+
+        async def slow_chunk():
+            yield b"abc"
+            await release.wait()
+            yield b"def"
+
+        async def duplicate_chunk():
+            yield b"abcdef"
+
+        first = asyncio.create_task(append_upload_chunk(upload_id, 0, slow_chunk()))
+        await asyncio.sleep(0)
+        # Same offset while the first request is still writing
+        with pytest.raises(UploadBusy):
+            await append_upload_chunk(upload_id, 0, duplicate_chunk())
+        with pytest.raises(UploadBusy):
+            await complete_upload_session(upload_id)
+        release.set()
+        session = await first
+
+        blob, _ = await complete_upload_session(upload_id)
+        return session, blob
+
+    session, blob = asyncio.run(main())
+    assert session["offset"] == 6
+    assert blob.size == 6
+    assert blob.digest == hashlib.sha256(b"abcdef").hexdigest()
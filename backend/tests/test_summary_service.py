@@ -0,0 +1,14 @@
+from backend.app.services.summary_service import config_key, cpu_set_label
+
+
+def test_cpu_set_label_is_sorted_and_compressed():
+    assert cpu_set_label([3, 0, 2, 1, 8, 11, 10]) == "0-3,8,10-11"
+    assert cpu_set_label([5]) == "5"
+    assert cpu_set_label(None) == "none"
+
+
+def test_runs_pinned_to_different_cores_get_different_keys():
+    pinned = config_key(None, 4, 1, cpu_affinity=[0, 1, 2, 3])
+    assert pinned == config_key(None, 4, 1, cpu_affinity=[3, 2, 1, 0])
+    assert pinned != config_key(None, 4, 1, cpu_affinity=[4, 5, 6, 7])
+    assert config_key(None, 4, 1).endswith(";cpus=none")
@@ -1,17 +1,11 @@
-import os
 import streamlit as st
-import requests
 import pandas as pd
-from dotenv import load_dotenv
 
-load_dotenv()
+from api_client import fetch_datasets
 
 st.header("Energy-Aware Logging Mechanism")
 st.subheader("Monitor and Analyze Energy Consumption Data")
 
-API_URL = os.getenv("BACKEND_URL")
-
-
 st.divider()
 
 st.subheader("🚀 What would you like to do?")
@@ -31,12 +25,8 @@ with action_col2:
     
 
 try:
-    datasets_resp = requests.get(f"{API_URL}/datasets")
-    if datasets_resp.status_code == 200:
-        datasets = datasets_resp.json().get("datasets", [])
-        dataset_count = len(datasets)
-    else:
-        dataset_count = 0
+    datasets = fetch_datasets()
+    dataset_count = len(datasets)
 except Exception as e:
     dataset_count = f"Error: {e}"
 
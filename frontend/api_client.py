@@ -0,0 +1,155 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import requests
+import streamlit as st
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+load_dotenv()
+
+API_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000")
+API_TIMEOUT_SECS = float(os.getenv("API_TIMEOUT_SECS", "10"))
+# Connections kept open to the backend, shared by every dashboard session
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "16"))
+# How long dataset lists and results are served from cache before re-fetching
+API_CACHE_TTL_SECS = int(os.getenv("API_CACHE_TTL_SECS", "30"))
+# Minimum time between two incremental history fetches of one session
+HISTORY_REFRESH_SECS = float(os.getenv("HISTORY_REFRESH_SECS", "5"))
+# Rows saved with an older created_at than the newest seen (batched writes, several
+# writers) are caught by re-reading this window; duplicates are dropped by ID
+HISTORY_OVERLAP_SECS = float(os.getenv("HISTORY_OVERLAP_SECS", "10"))
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "500"))
+JOB_POLL_SECS = float(os.getenv("JOB_POLL_SECS", "1.5"))
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled session per Streamlit server, so reruns reuse open connections."""
+    session = requests.Session()
+    # Only failed connects are retried: nothing reached the backend, so even a
+    # request that queues a job (GET /compare) cannot run twice
+    retries = Retry(connect=2, read=0, status=0, other=0, backoff_factor=0.3, allowed_methods=None)
+    adapter = HTTPAdapter(pool_connections=API_POOL_SIZE, pool_maxsize=API_POOL_SIZE, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def api_request(method: str, path: str, timeout: float = API_TIMEOUT_SECS, **kwargs) -> requests.Response:
+    return get_session().request(method, f"{API_URL}{path}", timeout=timeout, **kwargs)
+
+
+def api_get(path: str, **params) -> requests.Response:
+    return api_request("GET", path, params=params)
+
+
+# --- Cached reads, shared by all sessions. Errors raise and are not cached. ---
+
+@st.cache_data(ttl=API_CACHE_TTL_SECS, show_spinner=False)
+def fetch_datasets() -> list[dict]:
+    resp = api_get("/datasets")
+    resp.raise_for_status()
+    return resp.json().get("datasets", [])
+
+
+@st.cache_data(ttl=API_CACHE_TTL_SECS, show_spinner=False)
+def fetch_latest_results(dataset_id: str) -> dict | None:
+    """Newest experiment of every precision, or None if the dataset has no runs yet."""
+    resp = api_get(f"/experiments/{dataset_id}")
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return resp.json()
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def fetch_power_trace(experiment_id: str, points: int) -> dict | None:
+    # A stored trace never changes, so it can be cached for long
+    resp = api_get(f"/experiments/{experiment_id}/power", points=points)
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return resp.json()
+
+
+def invalidate_cache():
+    """Drops the cached reads, e.g. after an upload or a finished run."""
+    fetch_datasets.clear()
+    fetch_latest_results.clear()
+
+
+# --- Incremental history, kept per session ---
+
+def fetch_experiment_history(dataset_id: str, force: bool = False) -> list[dict]:
+    """
+    All experiments of a dataset, newest first. The first call pages through
+    the whole history; later calls only ask for rows created since the newest
+    one already seen (minus HISTORY_OVERLAP_SECS) and merge them in.
+    """
+    key = f"experiment_history:{dataset_id}"
+    history = st.session_state.get(key)
+    if history is None:
+        history = st.session_state[key] = {"rows": {}, "newest": None, "fetched_at": None}
+    now = time.monotonic()
+    if not force and history["fetched_at"] is not None and now - history["fetched_at"] < HISTORY_REFRESH_SECS:
+        return _sorted_rows(history)
+
+    params = {"dataset_id": dataset_id, "limit": HISTORY_PAGE_SIZE}
+    if history["newest"] is not None:
+        since = datetime.fromisoformat(history["newest"]) - timedelta(seconds=HISTORY_OVERLAP_SECS)
+        params["created_after"] = since.isoformat()
+    while True:
+        resp = api_get("/experiments/", **params)
+        resp.raise_for_status()
+        page = resp.json()
+        for row in page["experiments"]:
+            history["rows"][row["id"]] = row
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    if history["rows"]:
+        history["newest"] = max(row["created_at"] for row in history["rows"].values())
+    history["fetched_at"] = now
+    return _sorted_rows(history)
+
+
+def reset_experiment_history(dataset_id: str | None = None):
+    """
+    Forgets the rows seen so far, for one dataset or all of them. Deleted
+    experiments only disappear from the history this way.
+    """
+    for key in list(st.session_state.keys()):
+        if key == f"experiment_history:{dataset_id}" or (dataset_id is None and key.startswith("experiment_history:")):
+            del st.session_state[key]
+
+
+def _sorted_rows(history: dict) -> list[dict]:
+    return sorted(history["rows"].values(), key=lambda row: (row["created_at"], row["id"]), reverse=True)
+
+
+# --- Jobs ---
+
+def submit_comparison(
+    dataset_id: str, precisions: list[str], trials: int, order: str, engines: list[str] | None = None
+) -> dict:
+    """Queues a comparison job and returns it without waiting for the result."""
+    params = {"trials": trials, "order": order, "precisions": precisions, "engines": engines or ["EAGER"]}
+    resp = api_request("GET", f"/compare/{dataset_id}", params=params)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def fetch_job(job_id: str) -> dict:
+    resp = api_get(f"/jobs/{job_id}")
+    resp.raise_for_status()
+    return resp.json()
+
+
+def cancel_job(job_id: str) -> dict:
+    resp = api_request("POST", f"/jobs/{job_id}/cancel")
+    resp.raise_for_status()
+    return resp.json()
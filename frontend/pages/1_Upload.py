@@ -3,15 +3,18 @@ import requests
 import os
 from dotenv import load_dotenv
 
+from api_client import API_URL, api_request, invalidate_cache
+
 # Load environment variables
 load_dotenv()
-API_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000")
+# Chunk uploads and the final hashing step take longer than a normal API call
+UPLOAD_TIMEOUT_SECS = float(os.getenv("UPLOAD_TIMEOUT_SECS", "120"))
 
 st.set_page_config(page_title="Upload Dataset")
 
 st.header("📂 Upload New Dataset")
 st.markdown("""
-    Here you can upload `.csv` files to be processed by the backend.
+    Here you can upload `.csv` files (or `.npy` float matrices) to be processed by the backend.
     Please ensure your dataset format matches the model you select (e.g., flattened pixels for CNN).
 """)
 with st.sidebar:
@@ -25,7 +28,7 @@ st.divider()
 # --- UPLOAD FORM ---
 with st.form("upload_form", clear_on_submit=True):
     # 1. File Input
-    uploaded_file = st.file_uploader("Choose a CSV file", type=["csv"])
+    uploaded_file = st.file_uploader("Choose a CSV or .npy file", type=["csv", "npy"])
     
     # 2. Model Selection (Matches your Backend Enum)
     # We use specific values "MLP" and "CNN" to match the backend expectations
@@ -43,37 +46,72 @@ with st.form("upload_form", clear_on_submit=True):
 
     if submitted:
         if uploaded_file is not None:
-            # Prepare the payload
-            # 'file' matches the @UploadFile parameter in FastAPI
-            files = {"file": (uploaded_file.name, uploaded_file.getvalue(), "text/csv")}
-            
             # 'params' matches the query parameters in FastAPI
             params = {
                 "ai_model": ai_model_type, 
                 "description": description
             }
             
-            with st.spinner("Uploading to Backend..."):
-                try:
-                    # 
-                    response = requests.post(f"{API_URL}/datasets", files=files, params=params)
+            progress = st.progress(0, text="Uploading to Backend...")
+            try:
+                # Resumable chunked upload: the file is sent piece by piece instead of
+                # being copied into one request body with getvalue()
+                response = api_request(
+                    "POST", "/datasets/uploads",
+                    params={"filename": uploaded_file.name, "total_size": uploaded_file.size}
+                )
+                response.raise_for_status()
+                upload = response.json()
+
+                uploaded_file.seek(0)
+                offset = 0
+                while offset < uploaded_file.size:
+                    uploaded_file.seek(offset)
+                    chunk = uploaded_file.read(upload["chunk_size"])
+                    for attempt in range(3):
+                        try:
+                            chunk_resp = api_request(
+                                "PUT", f"/datasets/uploads/{upload['upload_id']}",
+                                params={"offset": offset}, data=chunk, timeout=UPLOAD_TIMEOUT_SECS
+                            )
+                            break
+                        except requests.exceptions.ConnectionError:
+                            if attempt == 2:
+                                raise
+                    if chunk_resp.status_code == 409:
+                        # The backend already has more (or less) than we think: resume from its offset
+                        offset = chunk_resp.json()["detail"]["offset"]
+                        continue
+                    chunk_resp.raise_for_status()
+                    offset = chunk_resp.json()["offset"]
+                    progress.progress(offset / max(uploaded_file.size, 1), text="Uploading to Backend...")
+
+                response = api_request(
+                    "POST", f"/datasets/uploads/{upload['upload_id']}/complete",
+                    params=params, timeout=UPLOAD_TIMEOUT_SECS
+                )
+                progress.empty()
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    # The cached dataset list would not show the new file yet
+                    invalidate_cache()
+                    st.success(f"✅ Upload Successful!")
+                    st.json({
+                        "ID": data['id'],
+                        "Filename": data['filename'],
+                        "Model": data['ai_model']
+                    })
+                    st.info("You can now go to the **Experiments** page to run tests on this file.")
+                    st.page_link("pages/2_Experiments.py", label="Start Experiments", icon="🧪")
+                else:
+                    st.error(f"❌ Upload Failed: {response.text}")
                     
-                    if response.status_code == 200:
-                        data = response.json()
-                        st.success(f"✅ Upload Successful!")
-                        st.json({
-                            "ID": data['id'],
-                            "Filename": data['filename'],
-                            "Model": data['ai_model']
-                        })
-                        st.info("You can now go to the **Experiments** page to run tests on this file.")
-                        st.page_link("pages/2_Experiments.py", label="Start Experiments", icon="🧪")
-                    else:
-                        st.error(f"❌ Upload Failed: {response.text}")
-                        
-                except requests.exceptions.ConnectionError:
-                    st.error("❌ Could not connect to the Backend. Is it running?")
-                except Exception as e:
-                    st.error(f"❌ An unexpected error occurred: {e}")
+            except requests.exceptions.ConnectionError:
+                progress.empty()
+                st.error("❌ Could not connect to the Backend. Is it running?")
+            except Exception as e:
+                progress.empty()
+                st.error(f"❌ An unexpected error occurred: {e}")
         else:
-            st.warning("⚠️ Please select a file first.")
\ No newline at end of file
+            st.warning("⚠️ Please select a file first.")
@@ -1,19 +1,16 @@
 import streamlit as st
 import altair as alt
-import requests
 import pandas as pd
-import time
-import os
-from dotenv import load_dotenv
 
-# Load Config
-load_dotenv()
-API_URL = os.getenv("BACKEND_URL")
+from api_client import (
+    API_URL, JOB_POLL_SECS, cancel_job, fetch_datasets, fetch_experiment_history, fetch_job,
+    fetch_latest_results, fetch_power_trace, invalidate_cache, reset_experiment_history, submit_comparison
+)
 
 st.set_page_config(page_title="Run Experiments", layout="wide")
 
 st.title("⚡ Experiment Runner")
-st.markdown("Compare the **Energy Consumption** between FP32 and INT8 models.")
+st.markdown("Compare the **Energy Consumption** of model precisions (FP32, INT8, ...).")
 
 # --- SIDEBAR: CONFIGURATION ---
 with st.sidebar:
@@ -21,35 +18,35 @@ with st.sidebar:
     st.write("Current Backend:")
     st.code(API_URL, language="text")
     if st.button("🔄 Refresh Datasets"):
+        # Lists and results are cached for everyone; this forces a fresh read
+        invalidate_cache()
+        reset_experiment_history()
         st.rerun()
 
 # --- HELPER FUNCTION: PLOT CHART ---
-def display_charts(fp32_data, int8_data):
+def display_charts(results):
     """
     Renders stacked charts for Energy and Emissions.
+    results: {label: experiment} for every configuration to show.
     """
     st.subheader("📊 Visual Analysis")
 
     # 1. Extract Data
-    e_fp32 = fp32_data.get('energy_consumed_kwh', 0)
-    e_int8 = int8_data.get('energy_consumed_kwh', 0)
-    
-    c_fp32 = fp32_data.get('emissions_kg', 0)
-    c_int8 = int8_data.get('emissions_kg', 0)
+    labels = list(results.keys())
+    energy = [results[l].get('energy_consumed_kwh') or 0 for l in labels]
+    emissions = [results[l].get('emissions_kg') or 0 for l in labels]
 
     # --- CHART 1: ENERGY (kWh) ---
     st.markdown("#### ⚡ Energy Consumption (kWh)")
     df_energy = pd.DataFrame({
-        "Precision": ["FP32", "INT8"],
-        "Value": [e_fp32, e_int8]
+        "Precision": labels,
+        "Value": energy
     })
     
     chart_energy = alt.Chart(df_energy).mark_bar().encode(
         x=alt.X('Precision', title=None),
         y=alt.Y('Value', title='kWh'),
-        color=alt.Color('Precision', 
-                        scale=alt.Scale(range=['#FF4B4B', '#00CC96']), # Red vs Green
-                        legend=None),
+        color=alt.Color('Precision', legend=None),
         tooltip=['Precision', 'Value']
     ).properties(
         height=300 # Slightly shorter since it's full width now
@@ -62,16 +59,14 @@ def display_charts(fp32_data, int8_data):
     # --- CHART 2: EMISSIONS (kgCO2eq) ---
     st.markdown("#### 🌍 Carbon Emissions (kg)")
     df_emissions = pd.DataFrame({
-        "Precision": ["FP32", "INT8"],
-        "Value": [c_fp32, c_int8]
+        "Precision": labels,
+        "Value": emissions
     })
     
     chart_emissions = alt.Chart(df_emissions).mark_bar().encode(
         x=alt.X('Precision', title=None),
         y=alt.Y('Value', title='kg CO2'),
-        color=alt.Color('Precision', 
-                        scale=alt.Scale(range=['#FF4B4B', '#00CC96']), 
-                        legend=None),
+        color=alt.Color('Precision', legend=None),
         tooltip=['Precision', 'Value']
     ).properties(
         height=300
@@ -80,16 +75,131 @@ def display_charts(fp32_data, int8_data):
     st.altair_chart(chart_emissions, use_container_width=True)
 
 
+def display_power_traces(results, points=300):
+    """
+    Plots the downsampled power trace of each experiment, to show ramps,
+    throttling and tail effects. results: {label: experiment}.
+    """
+    frames = []
+    for label, experiment in results.items():
+        try:
+            trace = fetch_power_trace(experiment['id'], points)
+        except Exception:
+            trace = None
+        if trace is None:
+            continue
+        frames.append(pd.DataFrame({
+            "Precision": label,
+            "Time (s)": trace["timestamps"],
+            "Watts": trace["total_watts"],
+        }))
+    if not frames:
+        return
+
+    st.markdown("#### 🔌 Power over the Run (W)")
+    chart_power = alt.Chart(pd.concat(frames)).mark_line().encode(
+        x=alt.X('Time (s)'),
+        y=alt.Y('Watts', title='W'),
+        color='Precision',
+        tooltip=['Precision', 'Time (s)', 'Watts']
+    ).properties(height=300)
+    st.altair_chart(chart_power, use_container_width=True)
+
+
+def display_comparison(result):
+    """
+    Renders the per-configuration means of a repeated-trial comparison and the
+    savings over the baseline with their confidence intervals.
+    """
+    st.subheader("📊 Visual Analysis")
+    df_configs = pd.DataFrame(result["configs"])
+
+    st.markdown("#### ⚡ Net Energy per Pass (J)")
+    chart_energy = alt.Chart(df_configs).mark_bar().encode(
+        x=alt.X('label', title=None),
+        y=alt.Y('energy_per_pass_joules', title='J'),
+        color=alt.Color('label', legend=None),
+        tooltip=['label', 'energy_per_pass_joules', 'trials']
+    ).properties(height=300)
+    st.altair_chart(chart_energy, use_container_width=True)
+
+    st.markdown("#### ⏱️ Mean Latency per Pass (s)")
+    chart_latency = alt.Chart(df_configs).mark_bar().encode(
+        x=alt.X('label', title=None),
+        y=alt.Y('latency_mean_seconds', title='s'),
+        color=alt.Color('label', legend=None),
+        tooltip=['label', 'latency_mean_seconds', 'latency_stddev_seconds']
+    ).properties(height=300)
+    st.altair_chart(chart_latency, use_container_width=True)
+
+    st.markdown(f"#### 📉 Savings vs baseline ({int(result['confidence'] * 100)}% bootstrap CI, "
+                f"{result['trials_per_config']} {result['order']} trials each)")
+    rows = []
+    for saving in result["savings"]:
+        for metric in ("energy", "latency"):
+            estimate = saving[metric]
+            rows.append({
+                "Candidate": saving["candidate"],
+                "Metric": metric,
+                "Saving %": estimate["percentage"],
+                "CI low %": estimate["ci_low"],
+                "CI high %": estimate["ci_high"],
+                "Significant": "✅" if estimate["significant"] else "—",
+                "Accuracy loss": saving["accuracy_loss"],
+            })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+
+def display_history(dataset_id):
+    """Every run on the dataset, newest first; only new rows are fetched on reruns."""
+    try:
+        rows = fetch_experiment_history(dataset_id)
+    except Exception as e:
+        st.error(f"Could not load the run history: {e}")
+        return
+    if not rows:
+        return
+    with st.expander(f"🗂️ All runs ({len(rows)})"):
+        columns = ['created_at', 'precision', 'engine', 'batch_size', 'latency_seconds',
+                   'energy_consumed_kwh', 'net_energy_kwh', 'accuracy', 'id']
+        st.dataframe(pd.DataFrame(rows)[columns], use_container_width=True, hide_index=True)
+
+
+@st.fragment(run_every=JOB_POLL_SECS)
+def comparison_progress():
+    """
+    Polls the queued comparison job. Only this fragment reruns while the job is
+    going, so the rest of the page stays usable; the whole page reruns once it ends.
+    """
+    running = st.session_state["comparison_job"]
+    try:
+        job = fetch_job(running["id"])
+    except Exception as e:
+        st.warning(f"Could not reach the backend, retrying: {e}")
+        return
+
+    if job["status"] in ("PENDING", "RUNNING"):
+        done = job["completed_steps"] / max(job["total_steps"], 1)
+        label = "Waiting for a free worker..." if job["status"] == "PENDING" else (
+            f"Measuring... {job['completed_steps']}/{job['total_steps']} trials"
+        )
+        st.progress(done, text=label)
+        if st.button("✖️ Cancel Comparison"):
+            cancel_job(job["id"])
+        return
+
+    del st.session_state["comparison_job"]
+    st.session_state["comparison_outcome"] = {"dataset_id": running["dataset_id"], "job": job}
+    # New experiment rows exist now
+    fetch_latest_results.clear()
+    st.rerun()
+
+
 # --- STEP 1: SELECT DATASET ---
 st.subheader("1. Select a Dataset")
 
 try:
-    response = requests.get(f"{API_URL}/datasets")
-    if response.status_code == 200:
-        datasets = response.json().get("datasets", [])
-    else:
-        st.error(f"Backend Error: {response.status_code}")
-        datasets = []
+    datasets = fetch_datasets()
 except Exception as e:
     st.error(f"Connection Failed: {e}")
     datasets = []
@@ -107,67 +217,72 @@ if datasets:
     # --- STEP 2: CHECK FOR EXISTING HISTORY ---
     history_found = False
     
-    # Try to fetch history using your NEW endpoint
     try:
-        hist_resp = requests.get(f"{API_URL}/experiments/{selected_id}")
-        if hist_resp.status_code == 200:
-            hist_data = hist_resp.json()
-            st.success("📅 **Found existing results** for this dataset:")
-            
-            # Show the chart immediately using existing data
-            display_charts(hist_data['fp32'], hist_data['int8'])
-            history_found = True
-            
-            st.divider()
+        hist_data = fetch_latest_results(selected_id)
     except Exception:
-        pass # If fails, we just show the "Run" button normally
+        hist_data = None # If fails, we just show the "Run" button normally
+
+    if hist_data:
+        st.success("📅 **Found existing results** for this dataset:")
+
+        # Show the chart immediately using existing data
+        display_charts(hist_data['results'])
+        display_power_traces(hist_data['results'])
+        display_history(selected_id)
+        history_found = True
+
+        st.divider()
 
     # --- STEP 3: RUN NEW EXPERIMENT ---
     st.subheader("2. Run Comparison" if not history_found else "3. Re-Run Comparison")
     
+    precision_options = ["FP32", "INT8", "INT8_STATIC", "BF16", "JIT_FROZEN"]
+    if selected_data['ai_model'] == "CNN":
+        precision_options.append("CHANNELS_LAST")
+    precisions = st.multiselect(
+        "Precisions to compare (the first is the baseline)",
+        precision_options,
+        default=["FP32", "INT8"]
+    )
+    engines = st.multiselect(
+        "Engines to run them on",
+        ["EAGER", "TORCHSCRIPT", "ONNXRUNTIME"],
+        default=["EAGER"],
+        help="Eager PyTorch, a frozen TorchScript graph or ONNX Runtime; every engine gets the same input."
+    )
+
+    col_trials, col_order = st.columns(2)
+    with col_trials:
+        trials = st.slider("Trials per precision", min_value=1, max_value=20, value=5)
+    with col_order:
+        order = st.selectbox("Trial order", ["interleaved", "randomized"])
+
     btn_label = "🚀 Start Comparison Experiment" if not history_found else "🔄 Run New Comparison"
+    running = "comparison_job" in st.session_state
     
-    if st.button(btn_label, type="primary"):
-        
-        progress_text = "Operation in progress. Please wait..."
-        my_bar = st.progress(0, text=progress_text)
-        
+    if st.button(btn_label, type="primary", disabled=running):
         try:
-            my_bar.progress(10, text="Initializing Models...")
-            
-            # Call the RUN endpoint
-            resp = requests.get(f"{API_URL}/compare/{selected_id}")
-            
-            my_bar.progress(80, text="Processing Results...")
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                
-                # The response structure from /compare/ usually contains
-                # 'fp32_results' and 'int8_results' based on your previous code.
-                # Adjust keys if your /compare endpoint returns something else.
-                fp32_res = data.get('fp32_results') or data.get('fp32')
-                int8_res = data.get('int8_results') or data.get('int8')
-
-                my_bar.progress(100, text="Done!")
-                time.sleep(0.5)
-                my_bar.empty()
-
-                st.success("✅ New Experiment Completed Successfully!")
-                
-                # Render the Chart with NEW data
-                display_charts(fp32_res, int8_res)
-                
-                # Optional: Rerun to update the "History" view automatically
-                # st.rerun() 
-
-            else:
-                my_bar.empty()
-                st.error(f"Experiment Failed: {resp.text}")
-
+            # The compare endpoint queues a background job and returns its ID immediately
+            job = submit_comparison(selected_id, precisions, trials, order, engines)
+            st.session_state["comparison_job"] = {"id": job["id"], "dataset_id": selected_id}
+            st.session_state.pop("comparison_outcome", None)
+            running = True
         except Exception as e:
-            my_bar.empty()
             st.error(f"Error connecting to backend: {e}")
 
+    if running:
+        comparison_progress()
+
+    outcome = st.session_state.get("comparison_outcome")
+    if outcome and outcome["dataset_id"] == selected_id:
+        job = outcome["job"]
+        if job["status"] == "SUCCEEDED":
+            st.success("✅ New Experiment Completed Successfully!")
+
+            # Render the Chart with NEW data
+            display_comparison(job["result"])
+        else:
+            st.error(f"Experiment {job['status'].lower()}: {job.get('error')}")
+
 else:
-    st.warning("⚠️ No datasets found. Please go to the 'Upload' page first.")
\ No newline at end of file
+    st.warning("⚠️ No datasets found. Please go to the 'Upload' page first.")